@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .plans import QueryPlans
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator which takes the count of large querysets from the PostgreSQL planner.
+
+    An exact ``COUNT(*)`` scans the whole table, so above ``ADMIN_EXACT_COUNT_LIMIT`` estimated
+    rows the planner's estimate, based on the table statistics, is shown instead.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet) and connections[self.object_list.db].vendor == 'postgresql':
+            estimate = self.get_estimate(self.object_list)
+            if estimate > settings.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def get_estimate(queryset: QuerySet) -> int:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+        return int(QueryPlans.explain(sql, params, queryset.db)['Plan Rows'])
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables of millions of rows: estimated counts and bounded pages."""
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered count shown next to filtered results.
+    show_full_result_count = False
+    list_per_page = 50
+    list_max_show_all = 200
@@ -0,0 +1,11 @@
+from django.apps import AppConfig, apps
+
+
+class CommonConfig(AppConfig):
+    name = 'common'
+
+    def ready(self) -> None:
+        from . import tracing  # noqa: F401
+        # Profiles without the API, like the Celery worker, neither authenticate nor cache users.
+        if apps.is_installed('rest_framework'):
+            from . import authentication  # noqa: F401
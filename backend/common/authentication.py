@@ -0,0 +1,131 @@
+from typing import Any, Optional, Set, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AbstractBaseUser, Group, Permission
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpRequest
+from django.utils.crypto import salted_hmac
+from rest_framework.authentication import BasicAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+User = get_user_model()
+
+
+class AuthCache:
+    """Caches authenticated users together with their resolved permissions.
+
+    Entries are keyed by a global auth version and a version of the user. Changes of a user or of
+    their groups and permissions bump the user's version; changes of the permissions of a group, or
+    deleted groups and permissions, bump the global version, which retires every cached user at once.
+    """
+    version_key = 'auth-version'
+
+    @classmethod
+    def get_user_version_key(cls, user_id: Any) -> str:
+        return f'{cls.version_key}:{user_id}'
+
+    @classmethod
+    def get_version(cls, *keys: str) -> str:
+        versions = cache.get_many(keys)
+        return ':'.join(str(versions.get(key) or cache.get_or_set(key, 1, None)) for key in keys)
+
+    @classmethod
+    def invalidate(cls, user_id: Optional[Any] = None) -> None:
+        key = cls.version_key if user_id is None else cls.get_user_version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+    @classmethod
+    def get_user_key(cls, user_id: Any) -> str:
+        return f'auth-user:{cls.get_version(cls.version_key, cls.get_user_version_key(user_id))}:{user_id}'
+
+    @classmethod
+    def get_user(cls, user_id: Any) -> Optional[AbstractBaseUser]:
+        return cache.get(cls.get_user_key(user_id))
+
+    @classmethod
+    def set_user(cls, user: AbstractBaseUser) -> None:
+        # Resolving the permissions fills ModelBackend's per-instance cache, which is pickled
+        # along with the user, so DjangoModelPermissions checks need no queries on a cache hit.
+        user.get_all_permissions()
+        cache.set(cls.get_user_key(user.pk), user, settings.AUTH_CACHE_TIMEOUT)
+
+    @classmethod
+    def get_credentials_key(cls, userid: str, password: str) -> str:
+        digest = salted_hmac('common.authentication.AuthCache', f'{userid}:{password}').hexdigest()
+        return f'auth-credentials:{digest}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token: Token) -> AbstractBaseUser:
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = AuthCache.get_user(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            AuthCache.set_user(user)
+        return user
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """Basic authentication which skips the password hasher for recently verified credentials.
+
+    Verified credentials are remembered under an HMAC of the username and password, never the
+    password itself, for at most ``AUTH_CACHE_TIMEOUT`` seconds.
+    """
+
+    def authenticate_credentials(self, userid: str, password: str,
+                                 request: Optional[HttpRequest] = None) -> Tuple[AbstractBaseUser, None]:
+        key = AuthCache.get_credentials_key(userid, password)
+        verified = cache.get(key)
+        user = None
+        if verified is not None:
+            user_id, user_key = verified
+            # Credentials verified before the user last changed, e.g. their password, are verified again.
+            if user_key == AuthCache.get_user_key(user_id):
+                user = cache.get(user_key)
+        if user is None:
+            user, _ = super().authenticate_credentials(userid, password, request)
+            AuthCache.set_user(user)
+            cache.set(key, (user.pk, AuthCache.get_user_key(user.pk)), settings.AUTH_CACHE_TIMEOUT)
+        return user, None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_auth_cache(instance: AbstractBaseUser, update_fields: Optional[Any] = None,
+                               **kwargs: Any) -> None:
+    # Every login saves last_login, which changes nothing cached authentication relies on.
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    AuthCache.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_relations_auth_cache(instance: Any, action: str, reverse: bool, pk_set: Optional[Set[Any]],
+                                         **kwargs: Any) -> None:
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        AuthCache.invalidate(instance.pk)
+    elif pk_set is None:
+        # A group or permission cleared of all its users: which ones is no longer known.
+        AuthCache.invalidate()
+    else:
+        for user_id in pk_set:
+            AuthCache.invalidate(user_id)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_auth_cache(**kwargs: Any) -> None:
+    if kwargs.get('action', 'post_').startswith('post_'):
+        AuthCache.invalidate()
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Encodings the server can produce, in order of preference between equally accepted ones.
+encodings = ('br', 'gzip')
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map the codings of an Accept-Encoding header to their q-values, 0 for a malformed one."""
+    qualities = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+class Compressor:
+    """Compresses response bodies, once per distinct body for precompressed responses.
+
+    Precompressed variants are stored in the cache under a digest of the uncompressed body, so a
+    representation is compressed, at the highest level, once per change of its content instead
+    of once per request. Other bodies are compressed on the fly at a cheaper level.
+    """
+
+    @staticmethod
+    def get_encoding(request: HttpRequest, available: Optional[Sequence[str]] = None) -> Optional[str]:
+        """Return the encoding of ``available`` the client accepts with the highest q-value, if any."""
+        qualities = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if available is None:
+            available = [encoding for encoding in encodings if encoding != 'br' or brotli is not None]
+        accepted = [
+            (qualities.get(encoding, qualities.get('*', 0.0)), -rank, encoding)
+            for rank, encoding in enumerate(available)
+        ]
+        quality, _, encoding = max(accepted, default=(0.0, 0, None))
+        return encoding if quality > 0 else None
+
+    @staticmethod
+    def compress(content: bytes, encoding: str, best: bool = False) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(content, quality=11 if best else 5)
+        return gzip.compress(content, compresslevel=9 if best else 6, mtime=0)
+
+    @classmethod
+    def get_precompressed(cls, content: bytes, encoding: str) -> bytes:
+        key = f'compressed:{encoding}:{hashlib.sha1(content).hexdigest()}'
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = cls.compress(content, encoding, best=True)
+            cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+        return compressed
+
+
+class CompressionMiddleware:
+    """Compresses responses of at least ``COMPRESSION_MIN_SIZE`` bytes with brotli or gzip.
+
+    Streaming responses, like media files, are left alone.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if (response.streaming or response.has_header('Content-Encoding')
+                or len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = Compressor.get_encoding(request)
+        if encoding is None:
+            return response
+
+        if getattr(response, 'precompress', False):
+            content = Compressor.get_precompressed(response.content, encoding)
+        else:
+            content = Compressor.compress(response.content, encoding)
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class PrecompressedResponseMixin:
+    """Marks successful responses of a view for ``CompressionMiddleware``'s precompressed variants."""
+
+    def finalize_response(self, request: Request, response: Response, *args: Any, **kwargs: Any) -> Response:
+        response = super().finalize_response(request, response, *args, **kwargs)  # type: ignore
+        response.precompress = request.method in ('GET', 'HEAD') and response.status_code == 200
+        return response
@@ -0,0 +1,145 @@
+import hashlib
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse
+
+# Kept local rather than imported from DRF, so Celery workers using replica_reads() don't load it.
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads: ContextVar[bool] = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Route ORM reads made inside the block to one of ``DATABASE_REPLICAS``."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Sends reads inside ``replica_reads()`` to a replica and everything else to ``default``."""
+
+    def db_for_read(self, model: Model, **hints: Any) -> Optional[str]:
+        if _replica_reads.get():
+            return self.get_replica()
+        return None
+
+    def db_for_write(self, model: Model, **hints: Any) -> Optional[str]:
+        return 'default'
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints: Any) -> bool:
+        return db not in settings.DATABASE_REPLICAS
+
+    @staticmethod
+    def get_replica() -> Optional[str]:
+        if not settings.DATABASE_REPLICAS:
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaPinning:
+    """Keeps a client on the primary for ``DATABASE_REPLICA_PIN_SECONDS`` after it wrote.
+
+    The write response sets a cookie expiring then, so reads sent with it, authenticated or
+    not, see the write even while replicas lag behind. Clients without a cookie jar are also
+    pinned by their Authorization header.
+    """
+
+    @staticmethod
+    def get_cache_key(authorization: str) -> str:
+        return f'db-pin:{hashlib.sha1(authorization.encode()).hexdigest()}'
+
+    @classmethod
+    def pin(cls, request: HttpRequest, response: HttpResponse) -> None:
+        response.set_cookie(
+            settings.DATABASE_REPLICA_PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+            httponly=True, samesite='Lax'
+        )
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if authorization:
+            cache.set(cls.get_cache_key(authorization), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+    @classmethod
+    def is_pinned(cls, request: HttpRequest) -> bool:
+        if settings.DATABASE_REPLICA_PIN_COOKIE in request.COOKIES:
+            return True
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        return bool(authorization and cache.get(cls.get_cache_key(authorization)))
+
+
+class ReplicaPinningMiddleware:
+    """Pins clients to the primary after any successful write request, API or admin."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400:
+            ReplicaPinning.pin(request, response)
+        return response
+
+
+class ReplicaReadsMixin:
+    """Runs a read-only view with replica reads unless the client is pinned to the primary."""
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if not settings.DATABASE_REPLICAS or ReplicaPinning.is_pinned(request):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+
+def advisory_lock(key: str) -> None:
+    """Hold a PostgreSQL advisory lock on ``key`` until the current transaction ends; a no-op on other databases."""
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        raise transaction.TransactionManagementError('advisory_lock() must be called inside atomic().')
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [key])
+
+
+class CommitBatch:
+    """Collects keys during a transaction and passes them to ``callback`` once, after it commits.
+
+    Outside a transaction the callback runs right away. Keys of a rolled back transaction are
+    passed along with those of the next one, so callbacks must tolerate keys nothing changed.
+    """
+
+    def __init__(self, callback: Callable[[List[Any]], None]) -> None:
+        self.callback = callback
+        self.local = threading.local()
+
+    def add(self, *keys: Any) -> None:
+        if not keys:
+            return
+        pending: Optional[Dict[Any, None]] = getattr(self.local, 'keys', None)
+        if pending is not None and self.is_registered():
+            pending.update(dict.fromkeys(keys))
+            return
+        self.local.keys = {**(pending or {}), **dict.fromkeys(keys)}
+        transaction.on_commit(self.flush)
+
+    def is_registered(self) -> bool:
+        # A rollback drops the callback registered by the transaction, or a savepoint of it.
+        return any(callback == self.flush for _, callback in transaction.get_connection().run_on_commit)
+
+    def flush(self) -> None:
+        keys, self.local.keys = getattr(self.local, 'keys', None), None
+        if keys:
+            self.callback(list(keys))
@@ -0,0 +1,212 @@
+import asyncio
+import re
+import ssl
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Combined log format of nginx and Apache: address - user [time] "METHOD path protocol" status size ...
+log_line_pattern = re.compile(r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+) [^"]*"')
+
+
+class Request(NamedTuple):
+    label: str
+    method: str
+    path: str
+    headers: Dict[str, str] = {}
+    body: bytes = b''
+    # Seconds after the start of a replay at which the request was recorded.
+    offset: float = 0.0
+
+
+class Response(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class HttpConnection:
+    """A keep-alive HTTP/1.1 connection on asyncio streams, so load tests need no client libraries."""
+
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.host_header = parts.netloc
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, request: Request) -> Response:
+        reused = self.writer is not None
+        try:
+            response = await self.send(request)
+        except ConnectionResetError:
+            await self.close()
+            if not reused:
+                raise
+            # The server closed the idle connection before this request, send it once more on a new one.
+            return await self.request(request)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            await self.close()
+            raise
+        if response.headers.get('connection', '').lower() == 'close' or 'content-length' not in response.headers \
+                and response.headers.get('transfer-encoding') != 'chunked':
+            await self.close()
+        return response
+
+    async def send(self, request: Request) -> Response:
+        if self.reader is None or self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        headers = {'Host': self.host_header, 'Content-Length': str(len(request.body)), **request.headers}
+        head = ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+        self.writer.write(f'{request.method} {request.path} HTTP/1.1\r\n{head}\r\n'.encode('latin-1') + request.body)
+        return await self.read_response(self.reader, request.method)
+
+    @staticmethod
+    async def read_response(reader: asyncio.StreamReader, method: str) -> Response:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed by the server')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304):
+            body = b''
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                chunks.append(await reader.readexactly(size + 2))
+                if size == 0:
+                    break
+            body = b''.join(chunk[:-2] for chunk in chunks)
+        else:
+            body = await reader.read()
+        return Response(status, headers, body)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class LoadTest:
+    """Sends requests concurrently from ``concurrency`` connections and records their latencies.
+
+    Replays are open loop: every request is due at its recorded ``offset`` divided by ``speed``
+    whether or not earlier ones have completed, and its latency counts from then, so time spent
+    waiting for a free connection while the server falls behind is part of it. Synthetic loads are
+    closed loop, every connection sends its next request when the previous one completed.
+    """
+
+    def __init__(self, url: str, concurrency: int) -> None:
+        self.url = url
+        self.concurrency = concurrency
+        # Label to (latency seconds, status), status 0 for connection errors.
+        self.results: Dict[str, List[Tuple[float, int]]] = {}
+        self.elapsed = 0.0
+
+    async def replay(self, requests: Iterable[Request], speed: float = 1.0) -> None:
+        queue: 'asyncio.Queue[Optional[Request]]' = asyncio.Queue(maxsize=self.concurrency * 10)
+        started = time.perf_counter()
+
+        async def schedule() -> None:
+            for request in requests:
+                delay = started + request.offset / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await queue.put(request)
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def send() -> None:
+            connection = HttpConnection(self.url)
+            while True:
+                request = await queue.get()
+                if request is None:
+                    break
+                await self.send(connection, request, started + request.offset / speed)
+            await connection.close()
+
+        await asyncio.gather(schedule(), *(send() for _ in range(self.concurrency)))
+        self.elapsed = time.perf_counter() - started
+
+    async def run(self, next_request: Callable[[], Request], duration: float,
+                  on_response: Optional[Callable[[Request, Optional[Response]], None]] = None) -> None:
+        started = time.perf_counter()
+
+        async def send() -> None:
+            connection = HttpConnection(self.url)
+            while time.perf_counter() - started < duration:
+                request = next_request()
+                response = await self.send(connection, request)
+                if on_response is not None:
+                    on_response(request, response)
+            await connection.close()
+
+        await asyncio.gather(*(send() for _ in range(self.concurrency)))
+        self.elapsed = time.perf_counter() - started
+
+    async def send(self, connection: HttpConnection, request: Request,
+                   due: Optional[float] = None) -> Optional[Response]:
+        """Send the request, timing it from when it was ``due`` or else from now."""
+        started = time.perf_counter() if due is None else due
+        try:
+            response: Optional[Response] = await connection.request(request)
+        except (OSError, asyncio.IncompleteReadError):
+            response = None
+        latency = time.perf_counter() - started
+        self.results.setdefault(request.label, []).append((latency, response.status if response else 0))
+        return response
+
+    def get_report(self) -> List[Dict[str, Any]]:
+        """Throughput, statuses and latency percentiles in milliseconds of every label and in total."""
+        rows = []
+        groups = sorted(self.results.items())
+        groups.append(('total', [result for _, results in groups for result in results]))
+        for label, results in groups:
+            latencies = sorted(latency * 1000 for latency, _ in results)
+            statuses: Dict[int, int] = {}
+            for _, status in results:
+                statuses[status] = statuses.get(status, 0) + 1
+            rows.append({
+                'label': label,
+                'requests': len(results),
+                'throughput': len(results) / self.elapsed if self.elapsed else 0.0,
+                'statuses': dict(sorted(statuses.items())),
+                **{f'p{percentile}': get_percentile(latencies, percentile) for percentile in (50, 90, 99)},
+                'max': latencies[-1] if latencies else 0.0,
+            })
+        return rows
+
+
+def get_percentile(values: List[float], percentile: int) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(len(values) * percentile / 100) - 1))]
+
+
+def read_log(lines: Iterable[str], methods: Iterable[str] = ('GET', 'HEAD')) -> Iterable[Request]:
+    """Parse combined format access log lines into requests timed by their recorded offsets.
+
+    Logs hold no request bodies, so only requests of ``methods`` are replayed.
+    """
+    first: Optional[datetime] = None
+    for line in lines:
+        match = log_line_pattern.match(line)
+        if not match or match['method'] not in methods:
+            continue
+        recorded = datetime.strptime(match['time'], '%d/%b/%Y:%H:%M:%S %z')
+        first = first or recorded
+        label = f'{match["method"]} {re.sub(r"/[0-9]+(?=/|$)", "/{id}", match["path"].split("?")[0])}'
+        yield Request(label, match['method'], match['path'], offset=(recorded - first).total_seconds())
@@ -0,0 +1,108 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from celery import task
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from restaurant_website.celery import app
+
+from .run_worker import Command as RunWorkerCommand
+
+DIGEST_TASK = 'menu.tasks.notify_about_new_and_modified_dishes.send_emails'
+PROBE_TASKS = {
+    'picture variants': 'menu.tasks.generate_dish_picture_variants.generate_dish_picture_variants',
+    'static rebuild': 'menu.tasks.build_static_menus.build_static_menus',
+}
+
+
+@task(name='benchmark_queues.simulate')
+def simulate(seconds: float, published: float) -> float:
+    """Stand in for a task taking ``seconds``, return how long it waited in the queue."""
+    waited = time.time() - published
+    time.sleep(seconds)
+    return waited
+
+
+class Command(BaseCommand):
+    help = 'Measure queueing latency of picture and rebuild tasks while a large digest is being sent.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--chunks', type=int, default=200, help='send_emails chunks in the digest.')
+        parser.add_argument('--chunk-seconds', type=float, default=0.2, help='Simulated SMTP time of a chunk.')
+        parser.add_argument('--probes', type=int, default=20, help='Tasks of each other kind sent meanwhile.')
+        parser.add_argument('--probe-seconds', type=float, default=0.02, help='Simulated time of other tasks.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        pools = settings.WORKER_POOLS
+        shared = {
+            'queues': [queue for pool in pools.values() for queue in pool['queues']],
+            'concurrency': sum(pool['concurrency'] for pool in pools.values()),
+            'prefetch_multiplier': 4,
+        }
+        scenarios = {
+            # The previous setup: one worker with Celery's defaults, every task in one queue.
+            'single queue and worker': ({'shared': shared}, False),
+            'routed queues and pools': (pools, True),
+        }
+        for name, (worker_pools, routed) in scenarios.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            workers = self.start_workers(worker_pools)
+            try:
+                self.run_scenario(routed, options)
+            finally:
+                for worker in workers:
+                    worker.terminate()
+                for worker in workers:
+                    worker.wait()
+
+    def start_workers(self, pools: Dict[str, Dict[str, Any]]) -> List[subprocess.Popen]:
+        with app.connection_for_write() as connection:
+            for queue in {queue for pool in settings.WORKER_POOLS.values() for queue in pool['queues']}:
+                connection.default_channel.queue_purge(queue)
+
+        workers = []
+        for name, pool in pools.items():
+            argv = RunWorkerCommand.get_argv(name, pool, loglevel='warning')
+            workers.append(subprocess.Popen(
+                [sys.executable, '-m', 'celery', '-A', 'restaurant_website', *argv,
+                 f'--include={__name__}', '--without-gossip', '--without-mingle', '--without-heartbeat'],
+                cwd=settings.BASE_DIR, env=os.environ.copy(), stdout=subprocess.DEVNULL
+            ))
+
+        deadline = time.time() + 60
+        while len(app.control.ping(timeout=0.5)) < len(pools):
+            if time.time() > deadline or any(worker.poll() is not None for worker in workers):
+                raise CommandError('Workers did not start')
+        return workers
+
+    def run_scenario(self, routed: bool, options: Dict[str, Any]) -> None:
+        started = time.time()
+        digest = [
+            self.send(DIGEST_TASK, options['chunk_seconds'], routed)
+            for _ in range(options['chunks'])
+        ]
+        probes: Dict[str, List[Any]] = {name: [] for name in PROBE_TASKS}
+        for _ in range(options['probes']):
+            for name, task_name in PROBE_TASKS.items():
+                probes[name].append(self.send(task_name, options['probe_seconds'], routed))
+            time.sleep(options['chunk_seconds'] / 2)
+
+        for name, results in probes.items():
+            waits = sorted(result.get(timeout=600) * 1000 for result in results)
+            self.stdout.write(
+                f'  {name:<18} queue wait p50 {statistics.median(waits):8.1f} ms  '
+                f'p95 {waits[int(len(waits) * 0.95) - 1]:8.1f} ms  max {waits[-1]:8.1f} ms'
+            )
+        for result in digest:
+            result.get(timeout=600)
+        self.stdout.write(f'  digest of {len(digest)} chunks sent in {time.time() - started:.1f} s')
+
+    @staticmethod
+    def send(task_name: str, seconds: float, routed: bool) -> Any:
+        route = settings.CELERY_TASK_ROUTES[task_name] if routed else {'queue': settings.CELERY_TASK_DEFAULT_QUEUE}
+        return simulate.apply_async((seconds, time.time()), **route)
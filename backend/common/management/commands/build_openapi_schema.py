@@ -0,0 +1,25 @@
+import glob
+import os
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from common.schema import OpenAPISchema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema files served at /api/schema.json for the current code.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--force', action='store_true', help='Regenerate even if the code did not change.')
+        parser.add_argument('--clean', action='store_true', help='Remove schema files of previous code versions.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        fingerprint = OpenAPISchema.build(force=options['force'])
+        self.stdout.write(f'OpenAPI schema: {OpenAPISchema.get_path(fingerprint)}')
+        if options['clean']:
+            current = {OpenAPISchema.get_path(fingerprint), OpenAPISchema.get_path(fingerprint, compressed=True)}
+            for path in glob.glob(os.path.join(settings.OPENAPI_SCHEMA_ROOT, 'openapi.*.json*')):
+                if path not in current:
+                    os.remove(path)
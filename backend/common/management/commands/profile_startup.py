@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+ROLES = {
+    'all-in-one': ('restaurant_website.settings', []),
+    'api': ('restaurant_website.profiles.api', []),
+    'worker': ('restaurant_website.profiles.worker', ['menu.tasks']),
+    'beat': ('restaurant_website.profiles.beat', ['menu.tasks']),
+}
+
+
+class Command(BaseCommand):
+    help = 'Report the cold start time of each role: import time per module and app loading and ready time.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('roles', nargs='*', help=f'Roles to profile: {", ".join(ROLES)}; all by default.')
+        parser.add_argument('--limit', type=int, default=15, help='Number of slowest top-level imports to list.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per role; the fastest one is reported.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        unknown = set(options['roles']) - set(ROLES)
+        if unknown:
+            raise CommandError(f'Unknown roles: {", ".join(sorted(unknown))}')
+        for role in options['roles'] or ROLES:
+            settings_module, modules = ROLES[role]
+            timings, imports = min(
+                (self.run(settings_module, modules) for _ in range(max(options['repeat'], 1))),
+                key=lambda run: self.get_total(run[0])
+            )
+            self.report(role, timings, imports[:options['limit']])
+
+    @staticmethod
+    def run(settings_module: str, modules: List[str]) -> Tuple[Dict[str, Any], List[Tuple[int, str]]]:
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'common.startup', *modules],
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module},
+            capture_output=True, text=True
+        )
+        if process.returncode:
+            raise CommandError(f'{settings_module} failed to start:\n{process.stderr[-2000:]}')
+
+        imports = []
+        for line in process.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package", nested imports are indented.
+            if not line.startswith('import time:'):
+                continue
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit() and not name.startswith('  '):
+                imports.append((int(cumulative), name.strip()))
+        return json.loads(process.stdout), sorted(imports, reverse=True)
+
+    @staticmethod
+    def get_total(timings: Dict[str, Any]) -> float:
+        return timings['setup'] + sum(timings['imports'].values())
+
+    def report(self, role: str, timings: Dict[str, Any], imports: List[Tuple[int, str]]) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{role} ({timings["settings"]}): {self.get_total(timings) * 1000:.0f} ms'
+        ))
+        self.stdout.write(f'  {"django.setup()":<40} {timings["setup"] * 1000:8.1f} ms')
+        for module, seconds in timings['imports'].items():
+            self.stdout.write(f'  {"import " + module:<40} {seconds * 1000:8.1f} ms')
+
+        self.stdout.write(f'  {"app":<24} {"models":>7} {"ready":>10}')
+        for label, phases in timings['apps'].items():
+            self.stdout.write(
+                f'  {label:<24} {phases.get("models", 0) * 1000:7.1f} ms {phases.get("ready", 0) * 1000:7.1f} ms'
+            )
+
+        self.stdout.write('  slowest top-level imports (cumulative):')
+        for microseconds, name in imports:
+            self.stdout.write(f'  {name:<40} {microseconds / 1000:8.1f} ms')
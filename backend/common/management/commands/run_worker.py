@@ -0,0 +1,36 @@
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from restaurant_website.celery import app
+
+
+class Command(BaseCommand):
+    help = 'Start a Celery worker for one of the WORKER_POOLS, with its queues, concurrency and prefetch.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('pool', help=f'One of: {", ".join(settings.WORKER_POOLS)}.')
+        parser.add_argument('--loglevel', default='info')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        pool_name = options['pool']
+        app.worker_main(self.get_argv(pool_name, self.get_pool(pool_name), options['loglevel']))
+
+    @staticmethod
+    def get_pool(pool_name: str) -> Dict[str, Any]:
+        try:
+            return settings.WORKER_POOLS[pool_name]
+        except KeyError:
+            raise CommandError(f'Unknown worker pool {pool_name}, choose one of: {", ".join(settings.WORKER_POOLS)}')
+
+    @staticmethod
+    def get_argv(pool_name: str, pool: Dict[str, Any], loglevel: str = 'info') -> List[str]:
+        return [
+            'worker',
+            f'--hostname={pool_name}@%h',
+            f'--queues={",".join(pool["queues"])}',
+            f'--concurrency={pool["concurrency"]}',
+            f'--prefetch-multiplier={pool["prefetch_multiplier"]}',
+            f'--loglevel={loglevel}',
+        ]
@@ -0,0 +1,31 @@
+import json
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+
+class Command(BaseCommand):
+    help = 'Summarize span durations by name from the file written by TRACING_EXPORTER=file.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--path', default=None, help='Trace file, TRACING_FILE_PATH by default.')
+        parser.add_argument('--trace', default=None, help='Only include spans of this trace id.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        durations: Dict[str, List[float]] = defaultdict(list)
+        with open(options['path'] or settings.TRACING_FILE_PATH) as file:
+            for line in file:
+                for resource_spans in json.loads(line)['resourceSpans']:
+                    for scope_spans in resource_spans['scopeSpans']:
+                        for span in scope_spans['spans']:
+                            if options['trace'] in (None, span['traceId']):
+                                duration = int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])
+                                durations[span['name']].append(duration / 1e6)
+
+        self.stdout.write(f'{"span":<70} {"count":>7} {"total ms":>10} {"avg ms":>9} {"max ms":>9}')
+        for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            self.stdout.write(
+                f'{name:<70} {len(values):7d} {sum(values):10.1f} {sum(values) / len(values):9.2f} {max(values):9.2f}'
+            )
@@ -0,0 +1,127 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import coreapi
+import coreschema
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination ordered by one of ``view.ordering_fields`` and the primary key.
+
+    The cursor holds the ordering value and primary key of the last row of a page, so the next
+    page is read with an index range scan instead of an ``OFFSET``. The range is expressed as
+    ``field >= value AND (field > value OR pk > last_pk)`` so a ``(field, pk)`` index bounds it.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Optional[APIView] = None) -> List[Model]:
+        self.request = request
+        self.field, self.descending = self.get_ordering(request, view)
+        self.page_size = self.get_page_size(request)
+        self.model_field = queryset.model._meta.get_field(self.field) if self.field != 'pk' else None
+
+        direction = '-' if self.descending else ''
+        ordering = [f'{direction}{self.field}'] if self.model_field is not None else []
+        queryset = queryset.order_by(*ordering, f'{direction}pk')
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_cursor_filter(*cursor))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_ordering(self, request: Request, view: Optional[APIView]) -> Tuple[str, bool]:
+        ordering_fields = getattr(view, 'ordering_fields', [])
+        ordering = request.query_params.get(self.ordering_param, '')
+        field = ordering.lstrip('-')
+        if not ordering:
+            return 'pk', False
+        if field not in ordering_fields:
+            raise ValidationError({self.ordering_param: [f'Select one of: {", ".join(ordering_fields)}.']})
+        return field, ordering.startswith('-')
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_cursor_filter(self, value: Any, pk: Any) -> Q:
+        compare = 'lt' if self.descending else 'gt'
+        if self.field == 'pk':
+            return Q(**{f'pk__{compare}': pk})
+        return Q(**{f'{self.field}__{compare}e': value}) & (
+            Q(**{f'{self.field}__{compare}': value}) | Q(**{f'pk__{compare}': pk})
+        )
+
+    def decode_cursor(self, request: Request) -> Optional[Tuple[Any, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if self.model_field is not None:
+                value = self.model_field.to_python(value)
+            return value, int(pk)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance: Model) -> str:
+        value = self.model_field.value_to_string(instance) if self.model_field is not None else None
+        return urlsafe_b64encode(json.dumps([value, instance.pk]).encode('ascii')).decode('ascii')
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
+
+    def get_schema_fields(self, view: APIView) -> List[coreapi.Field]:
+        ordering_fields = getattr(view, 'ordering_fields', [])
+        return [
+            coreapi.Field(
+                name=self.cursor_query_param,
+                required=False,
+                location='query',
+                schema=coreschema.String(description='The pagination cursor value.')
+            ),
+            coreapi.Field(
+                name=self.page_size_query_param,
+                required=False,
+                location='query',
+                schema=coreschema.Integer(description=f'Number of results per page, at most {self.max_page_size}.')
+            ),
+            coreapi.Field(
+                name=self.ordering_param,
+                required=False,
+                location='query',
+                schema=coreschema.String(
+                    description=', '.join(f'{field}, -{field}' for field in ordering_fields)
+                )
+            ),
+        ]
@@ -0,0 +1,136 @@
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.db import connections
+
+Fingerprint = Dict[str, Any]
+Scenarios = Dict[str, Callable[[], Any]]
+
+select_pattern = re.compile(r'^\s*(?:DECLARE .+? CURSOR (?:WITH(?:OUT)? HOLD )?FOR )?(SELECT\b.*)$', re.I | re.S)
+
+
+class QueryPlans:
+    """Captures the PostgreSQL plans of the queries run by named scenarios.
+
+    A fingerprint keeps the shape of a plan, its nodes with their relations and indexes, and its
+    total cost. Compared to a stored baseline, a plan regresses when it reads a relation with a
+    sequential scan which the baseline read through an index without getting cheaper, when its
+    cost grows more than ``cost_tolerance`` times, or when its scenario runs a different number
+    of queries.
+    """
+    scan_nodes = ('Seq Scan', 'Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+
+    def __init__(self, cost_tolerance: float = 2.0, using: str = 'default') -> None:
+        self.cost_tolerance = cost_tolerance
+        self.using = using
+
+    @staticmethod
+    def explain(sql: str, params: Sequence[Any] = (), using: str = 'default') -> Dict[str, Any]:
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def capture(self, scenarios: Scenarios) -> Dict[str, List[Fingerprint]]:
+        """Run every scenario and fingerprint the plans of the SELECT queries it ran."""
+        captured = {}
+        connection = connections[self.using]
+        for name, scenario in scenarios.items():
+            queries: List[str] = []
+
+            def record(execute: Callable[..., Any], sql: str, params: Any, many: bool,
+                       context: Dict[str, Any]) -> Any:
+                result = execute(sql, params, many, context)
+                # With the parameters inlined, like the queries Django logs, so the plans can be explained alone.
+                queries.append(connection.ops.last_executed_query(context['cursor'], sql, params))
+                return result
+
+            with connection.execute_wrapper(record):
+                scenario()
+            selects = [self.get_select(sql) for sql in queries]
+            captured[name] = [
+                self.fingerprint(sql, self.explain(sql, using=self.using)) for sql in selects if sql is not None
+            ]
+        return captured
+
+    @staticmethod
+    def get_select(sql: str) -> Optional[str]:
+        """Return the SELECT of a query, also of the server-side cursors opened by ``QuerySet.iterator()``."""
+        match = select_pattern.match(sql)
+        return match.group(1) if match else None
+
+    @classmethod
+    def fingerprint(cls, sql: str, plan: Dict[str, Any]) -> Fingerprint:
+        return {
+            'sql': sql,
+            'cost': plan['Total Cost'],
+            'nodes': [
+                ' ' * (2 * depth) + ' '.join(filter(None, (
+                    node['Node Type'],
+                    node.get('Relation Name') and f'on {node["Relation Name"]}',
+                    node.get('Index Name') and f'using {node["Index Name"]}',
+                )))
+                for depth, node in cls.walk(plan)
+            ],
+        }
+
+    @classmethod
+    def walk(cls, node: Dict[str, Any], depth: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        yield depth, node
+        for child in node.get('Plans', []):
+            yield from cls.walk(child, depth + 1)
+
+    @classmethod
+    def get_scans(cls, fingerprint: Fingerprint) -> Dict[str, List[str]]:
+        """Map every scanned relation to the scan node types reading it."""
+        scans: Dict[str, List[str]] = {}
+        for node in fingerprint['nodes']:
+            node_type, _, relation = node.strip().partition(' on ')
+            if node_type in cls.scan_nodes:
+                scans.setdefault(relation.split(' using ')[0], []).append(node_type)
+        return scans
+
+    def compare(self, baseline: Dict[str, List[Fingerprint]],
+                captured: Dict[str, List[Fingerprint]]) -> List[str]:
+        """Describe the regressions of the captured plans against the baseline."""
+        problems = []
+        for name, fingerprints in captured.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if len(fingerprints) != len(expected):
+                problems.append(f'{name}: runs {len(fingerprints)} queries instead of {len(expected)}')
+                continue
+            for number, (before, after) in enumerate(zip(expected, fingerprints), start=1):
+                problems.extend(f'{name} query {number}: {problem}' for problem in self.compare_plan(before, after))
+        return problems
+
+    def compare_plan(self, before: Fingerprint, after: Fingerprint) -> List[str]:
+        problems = []
+        scans_before, scans_after = self.get_scans(before), self.get_scans(after)
+        # A cheaper plan may scan small relations sequentially, e.g. to hash join instead of nested loop.
+        for relation, node_types in sorted(scans_after.items()):
+            indexed_before = any(node_type != 'Seq Scan' for node_type in scans_before.get(relation, []))
+            if ('Seq Scan' in node_types and indexed_before and 'Seq Scan' not in scans_before[relation]
+                    and after['cost'] >= before['cost']):
+                problems.append(f'sequential scan of {relation}, which was read through an index')
+        if after['cost'] > before['cost'] * self.cost_tolerance:
+            problems.append(f'cost rose from {before["cost"]} to {after["cost"]}')
+        return problems
+
+    @staticmethod
+    def load(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def save(path: str, baseline: Dict[str, Any]) -> None:
+        with open(path, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write('\n')
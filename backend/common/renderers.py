@@ -0,0 +1,75 @@
+import datetime
+import decimal
+import math
+from typing import Any, Dict, Optional
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback_encoder = JSONEncoder()
+
+
+def encode_default(obj: Any) -> Any:
+    """Encode the types orjson or msgpack don't handle natively the way DRF's ``JSONEncoder`` does."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    return _fallback_encoder.default(obj)
+
+
+def has_non_finite_number(data: Any) -> bool:
+    """Whether ``data`` holds a NaN or infinite float or decimal, which JSON has no literal for."""
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, (float, decimal.Decimal)) and not math.isfinite(value):
+            return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Renders the same JSON as DRF's ``JSONRenderer`` with orjson.
+
+    Datetimes, dates, times and UUIDs are encoded natively, other types as ``JSONEncoder`` does.
+    Indented output, requested by the browsable API or ``; indent=`` in Accept, and data holding
+    NaN or infinities fall back to the standard renderer, which rejects those under ``STRICT_JSON``.
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data: Any, accepted_media_type: Optional[str] = None,
+               renderer_context: Optional[Dict[str, Any]] = None) -> bytes:
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=encode_default, option=self.options)
+        # orjson writes NaN and infinities as null. Walking the data for them costs several times the
+        # rendering, so it's only walked when the content holds a null and doesn't decode back to the data.
+        if b'null' in content and orjson.loads(content) != data and has_non_finite_number(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Like JSONRenderer, escape the separators which JSON allows but JavaScript strings don't.
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders MessagePack holding the same values as the JSON representation."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data: Any, accepted_media_type: Optional[str] = None,
+               renderer_context: Optional[Dict[str, Any]] = None) -> bytes:
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import os
+import threading
+from typing import Dict, Iterator
+
+import drf_yasg
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.codecs import OpenAPICodecJson
+
+api_info = openapi.Info(
+    title="Menus API",
+    default_version='v1',
+)
+
+
+class OpenAPISchema:
+    """The public OpenAPI schema, generated once per code version into ``OPENAPI_SCHEMA_ROOT``.
+
+    The fingerprint covers the project sources, the schema libraries' versions and the
+    swagger settings, so the files are regenerated only after a deploy which changes them.
+    A plain and a gzip-compressed copy are written, both named after the fingerprint.
+    """
+    _lock = threading.Lock()
+    _built: Dict[str, str] = {}
+
+    @classmethod
+    def get_fingerprint(cls) -> str:
+        digest = hashlib.sha256()
+        digest.update(f'{drf_yasg.__version__}:{rest_framework.VERSION}:{settings.SWAGGER_SETTINGS!r}'.encode())
+        for path in sorted(cls.get_source_files()):
+            digest.update(os.path.relpath(path, settings.BASE_DIR).encode())
+            with open(path, 'rb') as source:
+                digest.update(source.read())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def get_source_files() -> Iterator[str]:
+        roots = [app.path for app in apps.get_app_configs() if app.path.startswith(settings.BASE_DIR)]
+        roots.append(os.path.join(settings.BASE_DIR, settings.ROOT_URLCONF.split('.')[0]))
+        for root in set(roots):
+            for directory, dirnames, filenames in os.walk(root):
+                dirnames[:] = [name for name in dirnames if name not in ('tests', 'migrations', '__pycache__')]
+                yield from (os.path.join(directory, name) for name in filenames if name.endswith('.py'))
+
+    @staticmethod
+    def get_path(fingerprint: str, compressed: bool = False) -> str:
+        name = f'openapi.{fingerprint}.json' + ('.gz' if compressed else '')
+        return os.path.join(settings.OPENAPI_SCHEMA_ROOT, name)
+
+    @classmethod
+    def get(cls) -> str:
+        """Return the fingerprint of the current schema files, building them on first use."""
+        root = settings.OPENAPI_SCHEMA_ROOT
+        if root not in cls._built:
+            with cls._lock:
+                if root not in cls._built:
+                    cls._built[root] = cls.build()
+        return cls._built[root]
+
+    @classmethod
+    def build(cls, force: bool = False) -> str:
+        fingerprint = cls.get_fingerprint()
+        path = cls.get_path(fingerprint)
+        if not force and os.path.exists(path) and os.path.exists(cls.get_path(fingerprint, compressed=True)):
+            return fingerprint
+
+        content = cls.generate()
+        os.makedirs(settings.OPENAPI_SCHEMA_ROOT, exist_ok=True)
+        cls.write(cls.get_path(fingerprint, compressed=True), gzip.compress(content, compresslevel=9, mtime=0))
+        cls.write(path, content)
+        return fingerprint
+
+    @staticmethod
+    def generate() -> bytes:
+        generator = swagger_settings.DEFAULT_GENERATOR_CLASS(api_info)
+        schema = generator.get_schema(request=None, public=True)
+        return OpenAPICodecJson(validators=[]).encode(schema)
+
+    @staticmethod
+    def write(path: str, content: bytes) -> None:
+        # Written under a temporary name and renamed, so concurrent workers never serve a partial file.
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(content)
+        os.replace(temporary_path, path)
@@ -0,0 +1,64 @@
+"""Measures the cold start of a Django process.
+
+Run as ``python -X importtime -m common.startup [module ...]``. After ``django.setup()`` the
+URLconf and the given modules are imported, as the first request or the Celery worker would.
+The timings are printed as JSON on stdout, while ``-X importtime`` reports every import on stderr.
+"""
+import json
+import os
+import sys
+import time
+from importlib import import_module
+from typing import Any, Callable, Dict, List
+
+import django
+from django.apps import AppConfig
+
+Timings = Dict[str, Dict[str, float]]
+
+
+def timed(timings: Timings, label: str, phase: str, method: Callable[[], None]) -> Callable[[], None]:
+    def wrapper() -> None:
+        start = time.perf_counter()
+        method()
+        timings.setdefault(label, {})[phase] = time.perf_counter() - start
+    return wrapper
+
+
+def instrument_app_configs(timings: Timings) -> None:
+    create = AppConfig.create.__func__
+
+    def create_timed(cls: Any, entry: str) -> AppConfig:
+        config = create(cls, entry)
+        config.import_models = timed(timings, config.label, 'models', config.import_models)
+        config.ready = timed(timings, config.label, 'ready', config.ready)
+        return config
+
+    AppConfig.create = classmethod(create_timed)
+
+
+def main(modules: List[str]) -> None:
+    apps: Timings = {}
+    instrument_app_configs(apps)
+
+    start = time.perf_counter()
+    django.setup()
+    setup = time.perf_counter() - start
+
+    from django.conf import settings
+    imports: Dict[str, float] = {}
+    for module in [settings.ROOT_URLCONF, *modules]:
+        start = time.perf_counter()
+        import_module(module)
+        imports[module] = time.perf_counter() - start
+
+    print(json.dumps({
+        'settings': os.environ['DJANGO_SETTINGS_MODULE'],
+        'setup': setup,
+        'imports': imports,
+        'apps': apps,
+    }))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import Optional
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage which names files after the SHA-256 of their content.
+
+    Uploads are streamed to a temporary file while being hashed, so identical files are
+    stored once and a stored name never changes its content. Names derived from a stored
+    hash (e.g. ``ab/ab12...ef.150w.webp``) are kept as given.
+    """
+    content_addressed_name = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{64}(\.[\w.]+)?$')
+
+    @classmethod
+    def is_content_addressed(cls, name: str) -> bool:
+        return bool(cls.content_addressed_name.match(name))
+
+    def get_available_name(self, name: str, max_length: Optional[int] = None) -> str:
+        return name
+
+    def _save(self, name: str, content: File) -> str:
+        directory = self.path('')
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as temporary_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temporary_file.write(chunk)
+
+            name = self.get_content_name(name, digest.hexdigest())
+            self.store(temporary_path, self.path(name))
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return name
+
+    def get_name_for(self, content: File) -> str:
+        """The name ``content`` will be stored under, e.g. to lock it before saving."""
+        if self.is_content_addressed(content.name):
+            return content.name
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        return self.get_content_name(content.name, digest.hexdigest())
+
+    def get_content_name(self, name: str, hexdigest: str) -> str:
+        name = name.replace('\\', '/')
+        if self.is_content_addressed(name):
+            return name
+        extension = os.path.splitext(name)[1].lower()
+        return f'{hexdigest[:2]}/{hexdigest}{extension}'
+
+    def store(self, temporary_path: str, full_path: str) -> None:
+        if os.path.exists(full_path):
+            return
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        os.replace(temporary_path, full_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
@@ -0,0 +1,111 @@
+import math
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:  # pragma: no cover
+    get_redis_connection = None
+
+periods = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 60 * 60, 'hour': 60 * 60}
+
+
+class TokenBuckets:
+    """Token buckets kept in the shared cache, so every process and host draws on the same buckets.
+
+    A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens per second; a request
+    takes one token, and gets it back when refunded. On Redis a bucket is updated atomically by a
+    Lua script, other cache backends, like the local memory cache of tests, update it under a
+    process lock.
+    """
+    script = """
+        local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+        local take = tonumber(ARGV[4])
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+        local tokens = tonumber(bucket[1]) or capacity
+        tokens = math.min(capacity, tokens + math.max(0, now - (tonumber(bucket[2]) or now)) * rate)
+        local wait = 0
+        if tokens >= take then tokens = math.min(capacity, tokens - take) else wait = (take - tokens) / rate end
+        redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+        return tostring(wait)
+    """
+    lock = threading.Lock()
+
+    @classmethod
+    def consume(cls, key: str, capacity: int, rate: float, take: int = 1) -> float:
+        """Take a token, return 0 when one was available or the seconds until one will be."""
+        now = time.time()
+        if get_redis_connection is not None and type(caches['default']).__module__.startswith('django_redis'):
+            connection = get_redis_connection('default')
+            return float(connection.eval(cls.script, 1, cache.make_key(key), capacity, rate, now, take))
+
+        with cls.lock:
+            tokens, updated = cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            wait = 0.0 if tokens >= take else (take - tokens) / rate
+            tokens = tokens if wait else min(capacity, tokens - take)
+            cache.set(key, (tokens, now), math.ceil(capacity / rate) + 1)
+        return wait
+
+    @classmethod
+    def refund(cls, key: str, capacity: int, rate: float) -> None:
+        """Give back a token taken for a request that was not served after all."""
+        cls.consume(key, capacity, rate, take=-1)
+
+    @staticmethod
+    def parse_rate(rate: str) -> Tuple[int, float]:
+        """Parse ``'<tokens>/<period>'`` into the bucket capacity and its refill rate per second."""
+        tokens, period = rate.split('/')
+        return int(tokens), int(tokens) / periods[period]
+
+
+class Overloaded(Throttled):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Service overloaded.'
+    default_code = 'overloaded'
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttles every client, and sheds load when all clients together exceed the action's capacity.
+
+    Rates come from ``THROTTLE_RATES``, by ``'<basename>.<action>'``, ``'<basename>'`` or
+    ``'default'``: a ``client`` rate for the bucket of a user or an address, answered with 429,
+    and an ``overall`` rate for the bucket of all clients, answered with 503. Both run before
+    the view, so rejected requests issue no queries, and both set ``Retry-After``.
+    """
+
+    def allow_request(self, request: Request, view: Any) -> bool:
+        scope, rates = self.get_rates(request, view)
+        user = request.user
+        # Addresses come from X-Forwarded-For only up to REST_FRAMEWORK['NUM_PROXIES'] trusted proxies.
+        client = f'user:{user.pk}' if user and user.is_authenticated else self.get_ident(request)
+        client_key, client_rate = f'throttle:{scope}:{client}', TokenBuckets.parse_rate(rates['client'])
+        self.wait_seconds = TokenBuckets.consume(client_key, *client_rate)
+        if self.wait_seconds:
+            return False
+
+        overall_wait = TokenBuckets.consume(f'throttle:{scope}', *TokenBuckets.parse_rate(rates['overall']))
+        if overall_wait:
+            # A shed request doesn't count against its client, only served ones do.
+            TokenBuckets.refund(client_key, *client_rate)
+            raise Overloaded(wait=overall_wait)
+        return True
+
+    def wait(self) -> Optional[float]:
+        return self.wait_seconds
+
+    @staticmethod
+    def get_rates(request: Request, view: Any) -> Tuple[str, Dict[str, str]]:
+        basename = getattr(view, 'basename', None) or type(view).__name__
+        scope = f'{basename}.{getattr(view, "action", None) or request.method.lower()}'
+        name = next((name for name in (scope, basename) if name in settings.THROTTLE_RATES), 'default')
+        return scope, settings.THROTTLE_RATES[name]
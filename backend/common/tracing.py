@@ -0,0 +1,163 @@
+import json
+import os
+import re
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+
+traceparent_pattern = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+
+class Span:
+    """A timed operation of a trace, exported in the OTLP/JSON span format."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.error = False
+        # Finished spans of the local trace, exported together when its local root span ends.
+        self.finished: List[Span] = []
+
+    @property
+    def traceparent(self) -> str:
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_time),
+            'endTimeUnixNano': str(self.end_time),
+            'attributes': [{'key': key, 'value': to_otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': 2 if self.error else 1},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def to_otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+_local_root: ContextVar[Optional[Span]] = ContextVar('local_root', default=None)
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Tuple[Span, Any]:
+    """Start a child of the current span, or of ``traceparent`` received from another process."""
+    parent = _current_span.get()
+    remote = traceparent_pattern.match(traceparent or '')
+    parent_id: Optional[str]
+    if remote:
+        trace_id, parent_id = remote.groups()
+        local_root = None
+    elif parent is not None:
+        trace_id, parent_id, local_root = parent.trace_id, parent.span_id, _local_root.get()
+    else:
+        trace_id, parent_id, local_root = os.urandom(16).hex(), None, None
+
+    span = Span(name, trace_id, parent_id, attributes)
+    tokens = (_current_span.set(span), _local_root.set(local_root or span))
+    return span, tokens
+
+
+def end_span(span: Span, tokens: Any, error: bool = False) -> None:
+    span.end_time = time.time_ns()
+    span.error = error
+    local_root = _local_root.get()
+    _current_span.reset(tokens[0])
+    _local_root.reset(tokens[1])
+    if local_root is None:
+        return
+    local_root.finished.append(span)
+    if local_root is span:
+        export(span.finished)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    started, tokens = start_span(name, **attributes)
+    try:
+        yield started
+    except BaseException:
+        end_span(started, tokens, error=True)
+        raise
+    end_span(started, tokens)
+
+
+def export(spans: List[Span]) -> None:
+    """Send finished spans, as an OTLP/JSON trace request, to the ``TRACING_EXPORTER``."""
+    if not settings.TRACING_EXPORTER or not spans:
+        return
+    payload = json.dumps({'resourceSpans': [{
+        'resource': {'attributes': [
+            {'key': 'service.name', 'value': {'stringValue': settings.TRACING_SERVICE_NAME}},
+        ]},
+        'scopeSpans': [{'scope': {'name': __name__}, 'spans': [span.to_otlp() for span in spans]}],
+    }]})
+
+    if settings.TRACING_EXPORTER == 'file':
+        with open(settings.TRACING_FILE_PATH, 'a') as file:
+            file.write(payload + '\n')
+    elif settings.TRACING_EXPORTER == 'otlp':
+        request = urllib.request.Request(
+            settings.TRACING_OTLP_ENDPOINT, data=payload.encode(), headers={'Content-Type': 'application/json'}
+        )
+        try:
+            urllib.request.urlopen(request, timeout=2).close()
+        except OSError:
+            pass
+
+
+# Celery instrumentation: the publishing span travels in the W3C ``traceparent`` message header
+# and every task runs in a span which continues that trace.
+
+_task_spans: Dict[str, Tuple[Span, Any]] = {}
+
+
+@before_task_publish.connect
+def inject_trace_context(headers: Dict[str, Any], **kwargs: Any) -> None:
+    current = _current_span.get()
+    if current is not None:
+        headers.setdefault('traceparent', current.traceparent)
+
+
+@task_prerun.connect
+def start_task_span(task_id: str, task: Any, **kwargs: Any) -> None:
+    # Published tasks get the header as a request attribute, eager ones in request.headers.
+    traceparent = task.request.get('traceparent') or (task.request.headers or {}).get('traceparent')
+    _task_spans[task_id] = start_span(f'celery.task {task.name}', traceparent, **{'celery.task_id': task_id})
+
+
+@task_postrun.connect
+def end_task_span(task_id: str, state: Optional[str] = None, **kwargs: Any) -> None:
+    started = _task_spans.pop(task_id, None)
+    if started is not None:
+        started[0].set_attributes(**{'celery.state': state or ''})
+        end_span(*started, error=state == 'FAILURE')
@@ -0,0 +1,198 @@
+import mimetypes
+import os
+import re
+from typing import BinaryIO, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.views import View
+from drf_yasg import openapi
+from drf_yasg.renderers import SwaggerUIRenderer
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .compression import Compressor
+from .schema import OpenAPISchema, api_info
+from .storage import ContentAddressedStorage
+
+
+class FileRange:
+    """Read-only view of ``length`` bytes of an open file starting at its current position.
+
+    ``fileno`` is exposed so ``wsgi.file_wrapper`` implementations can use ``os.sendfile``
+    for the range, limited by the response Content-Length.
+    """
+
+    def __init__(self, file: BinaryIO, start: int, length: int) -> None:
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class MediaView(View):
+    """Serves files from MEDIA_ROOT with validators, byte ranges and cache headers.
+
+    With ``MEDIA_SENDFILE_HEADER`` set to ``X-Sendfile`` or ``X-Accel-Redirect`` the
+    body is offloaded to the front web server, otherwise the file is streamed by
+    ``FileResponse`` without being read into memory.
+    """
+    http_method_names = ['get', 'head']
+    block_size = 64 * 1024
+    range_pattern = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+    def get(self, request: HttpRequest, path: str) -> HttpResponseBase:
+        full_path = self.get_full_path(path)
+        stat = os.stat(full_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = int(stat.st_mtime)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.get_file_response(request, path, full_path, stat.st_size, etag, last_modified)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = self.get_cache_control(path)
+        return response
+
+    @staticmethod
+    def get_full_path(path: str) -> str:
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404
+        if not os.path.isfile(full_path):
+            raise Http404
+        return full_path
+
+    @staticmethod
+    def get_cache_control(path: str) -> str:
+        if ContentAddressedStorage.is_content_addressed(path):
+            return f'public, max-age={settings.MEDIA_IMMUTABLE_CACHE_MAX_AGE}, immutable'
+        return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+    def get_file_response(self, request: HttpRequest, path: str, full_path: str, size: int,
+                          etag: str, last_modified: int) -> HttpResponseBase:
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        if settings.MEDIA_SENDFILE_HEADER:
+            offloaded = HttpResponse(content_type=content_type)
+            offloaded[settings.MEDIA_SENDFILE_HEADER] = self.get_sendfile_value(path, full_path)
+            return offloaded
+
+        try:
+            byte_range = self.get_range(request, size, etag, last_modified)
+        except ValueError:
+            not_satisfiable = HttpResponse(status=416)
+            not_satisfiable['Content-Range'] = f'bytes */{size}'
+            return not_satisfiable
+
+        if byte_range is None:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(FileRange(open(full_path, 'rb'), start, length), content_type=content_type,
+                                    status=206)
+            response['Content-Length'] = length
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response.block_size = self.block_size
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    @staticmethod
+    def get_sendfile_value(path: str, full_path: str) -> str:
+        if settings.MEDIA_SENDFILE_HEADER.lower() == 'x-accel-redirect':
+            return settings.MEDIA_ACCEL_REDIRECT_LOCATION + path
+        return full_path
+
+    def get_range(self, request: HttpRequest, size: int, etag: str, last_modified: int) -> Optional[Tuple[int, int]]:
+        """Return the inclusive byte range requested, ``None`` for the whole file.
+
+        Raises ``ValueError`` for a range which can't be satisfied.
+        """
+        header = request.META.get('HTTP_RANGE', '')
+        match = self.range_pattern.match(header.replace(' ', ''))
+        if not match or not self.if_range_passes(request, etag, last_modified):
+            return None
+
+        first, last = match.groups()
+        if not first and not last:
+            return None
+        if not first:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            raise ValueError(f'Range {header} not satisfiable for {size} bytes')
+        return start, end
+
+    @staticmethod
+    def if_range_passes(request: HttpRequest, etag: str, last_modified: int) -> bool:
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range:
+            return True
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            return if_range == etag
+        return parse_http_date_safe(if_range) == last_modified
+
+
+class OpenAPISchemaView(View):
+    """Serves the prebuilt OpenAPI schema, gzip-compressed when the client accepts it.
+
+    The schema fingerprint is the ETag, so clients revalidate with a bodyless 304 until
+    the code changes.
+    """
+    http_method_names = ['get', 'head']
+
+    def get(self, request: HttpRequest) -> HttpResponseBase:
+        fingerprint = OpenAPISchema.get()
+        etag = f'"{fingerprint}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            compressed = Compressor.get_encoding(request, ['gzip']) is not None
+            response = FileResponse(open(OpenAPISchema.get_path(fingerprint, compressed), 'rb'),
+                                    content_type='application/json', filename='openapi.json')
+            if compressed:
+                response['Content-Encoding'] = 'gzip'
+
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={settings.OPENAPI_SCHEMA_CACHE_MAX_AGE}'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+class SwaggerUIView(APIView):
+    """Swagger UI page, which loads the prebuilt schema from ``SPEC_URL``.
+
+    Unlike drf-yasg's schema view, it runs no schema generator: the page only needs the API info.
+    """
+    renderer_classes = [SwaggerUIRenderer]
+    authentication_classes: List[Type[BaseAuthentication]] = []
+    permission_classes = [AllowAny]
+    schema = None
+
+    def get(self, request: Request) -> Response:
+        return Response(openapi.Swagger(info=api_info, _prefix='/', paths=openapi.Paths({})))
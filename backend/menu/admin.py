@@ -1,6 +1,81 @@
+import re
+from typing import Optional, Tuple
+
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import QuerySet
+from django.forms import ModelForm
+from django.http import HttpRequest
+
+from common.admin import LargeTableAdmin
+
+from .filters import DishFullTextSearch
+from .models import Menu, Dish, Subscription
+from .tasks.delete_menu import delete_menu
+from .tasks.generate_dish_picture_variants import generate_dish_picture_variants
+
+
+@admin.register(Menu)
+class MenuAdmin(LargeTableAdmin):
+    list_display = ('name', 'modified', 'created')
+    ordering = ('name',)
+    # Prefix matching, served by the menu_menu_name_upper_like index; also backs the menu autocomplete.
+    search_fields = ('^name',)
+    actions = ['delete_in_background']
+
+    def has_delete_permission(self, request: HttpRequest, obj: Optional[Menu] = None) -> bool:
+        # The delete view cascades to every dish in the request and lists them all for confirmation;
+        # menus are deleted in batches by the delete_menu task instead, as through the API.
+        return False
+
+    def has_delete_in_background_permission(self, request: HttpRequest) -> bool:
+        return super().has_delete_permission(request)
+
+    def delete_in_background(self, request: HttpRequest, queryset: 'QuerySet[Menu]') -> None:
+        menu_ids = list(queryset.values_list('pk', flat=True))
+        for menu_id in menu_ids:
+            delete_menu.delay(menu_id)
+        self.message_user(request, f'Queued deletion of {len(menu_ids)} menus with their dishes.')
+
+    delete_in_background.short_description = 'Delete selected menus in the background'  # type: ignore
+    delete_in_background.allowed_permissions = ('delete_in_background',)  # type: ignore
+
+
+@admin.register(Dish)
+class DishAdmin(LargeTableAdmin):
+    list_display = ('name', 'menu', 'price', 'is_vegetarian', 'modified')
+    list_select_related = ('menu',)
+    list_filter = ('is_vegetarian',)
+    autocomplete_fields = ('menu',)
+    search_fields = ('name', 'description')
+
+    def save_model(self, request: HttpRequest, obj: Dish, form: ModelForm, change: bool) -> None:
+        """Save an uploaded picture like the picture endpoint, locked against deletion of identical files."""
+        picture = form.cleaned_data.get('picture')
+        if 'picture' not in form.changed_data:
+            super().save_model(request, obj, form, change)
+            return
+        with transaction.atomic():
+            if picture:
+                Dish.lock_picture(Dish.picture.field.storage.get_name_for(picture))
+            obj.has_picture_variants = False
+            super().save_model(request, obj, form, change)
+        if obj.picture:
+            transaction.on_commit(lambda: generate_dish_picture_variants.delay(obj.pk, obj.picture.name))
+
+    def get_search_results(self, request: HttpRequest, queryset: 'QuerySet[Dish]',
+                           search_term: str) -> Tuple['QuerySet[Dish]', bool]:
+        # Uses the GIN indexed search_vector instead of the default icontains scan of both columns.
+        terms = re.findall(r'\w+', search_term)
+        if not terms:
+            return queryset, False
+        return DishFullTextSearch().filter_terms(queryset, terms), False
 
-from .models import Menu, Dish
 
-admin.site.register(Menu)
-admin.site.register(Dish)
+@admin.register(Subscription)
+class SubscriptionAdmin(LargeTableAdmin):
+    list_display = ('user', 'vegetarian_only', 'opted_out')
+    list_select_related = ('user',)
+    list_filter = ('vegetarian_only', 'opted_out')
+    raw_id_fields = ('user',)
+    autocomplete_fields = ('followed_menus',)
@@ -0,0 +1,112 @@
+import hashlib
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.duration import duration_string
+
+from common.db import CommitBatch
+
+from .models import Dish
+
+Bucket = Tuple[Optional[Any], Optional[Any]]
+
+
+class DishFacets:
+    """Facet counts over dishes, computed in one aggregate query and cached per dish data version.
+
+    Any dish write bumps the version once its transaction commits, which retires every cached
+    facet set at once.
+    """
+    version_key = 'dish-facets-version'
+
+    @classmethod
+    def get(cls, queryset: 'QuerySet[Dish]', params: Dict[str, str]) -> Dict[str, Any]:
+        key = cls.get_cache_key(params)
+        facets = cache.get(key)
+        if facets is None:
+            facets = cls.compute(queryset)
+            cache.set(key, facets, settings.DISH_FACETS_CACHE_TIMEOUT)
+        return facets
+
+    @classmethod
+    def get_cache_key(cls, params: Dict[str, str]) -> str:
+        version = cache.get_or_set(cls.version_key, 1, None)
+        query = '&'.join(f'{name}={value}' for name, value in sorted(params.items()))
+        return f'dish-facets:{version}:{hashlib.sha1(query.encode()).hexdigest()}'
+
+    @classmethod
+    def invalidate(cls) -> None:
+        try:
+            cache.incr(cls.version_key)
+        except ValueError:
+            cache.set(cls.version_key, 1, None)
+
+    @classmethod
+    def compute(cls, queryset: 'QuerySet[Dish]') -> Dict[str, Any]:
+        price_buckets = cls.get_buckets(settings.DISH_FACET_PRICE_BUCKETS)
+        prepare_time_buckets = cls.get_buckets(
+            [timedelta(minutes=minutes) for minutes in settings.DISH_FACET_PREPARE_TIME_BUCKETS]
+        )
+        aggregates = {
+            'count': Count('pk'),
+            'vegetarian': Count('pk', filter=Q(is_vegetarian=True)),
+        }
+        for i, bucket in enumerate(price_buckets):
+            aggregates[f'price_{i}'] = Count('pk', filter=cls.get_bucket_filter('price', bucket) or None)
+        for i, bucket in enumerate(prepare_time_buckets):
+            aggregates[f'prepare_time_{i}'] = Count(
+                'pk', filter=cls.get_bucket_filter('prepare_time', bucket) or None
+            )
+
+        counts = queryset.order_by().aggregate(**aggregates)
+        return {
+            'count': counts['count'],
+            'is_vegetarian': {'true': counts['vegetarian'], 'false': counts['count'] - counts['vegetarian']},
+            'price': [
+                {'from': cls.format_price(start), 'to': cls.format_price(end), 'count': counts[f'price_{i}']}
+                for i, (start, end) in enumerate(price_buckets)
+            ],
+            'prepare_time': [
+                {'from': cls.format_duration(start), 'to': cls.format_duration(end),
+                 'count': counts[f'prepare_time_{i}']}
+                for i, (start, end) in enumerate(prepare_time_buckets)
+            ],
+        }
+
+    @staticmethod
+    def get_buckets(bounds: List[Any]) -> List[Bucket]:
+        edges: List[Optional[Any]] = [None, *sorted(bounds), None]
+        return list(zip(edges[:-1], edges[1:]))
+
+    @staticmethod
+    def get_bucket_filter(field: str, bucket: Bucket) -> Q:
+        start, end = bucket
+        condition = Q()
+        if start is not None:
+            condition &= Q(**{f'{field}__gte': start})
+        if end is not None:
+            condition &= Q(**{f'{field}__lt': end})
+        return condition
+
+    @staticmethod
+    def format_price(value: Optional[Any]) -> Optional[str]:
+        return None if value is None else f'{value:.2f}'
+
+    @staticmethod
+    def format_duration(value: Optional[timedelta]) -> Optional[str]:
+        return None if value is None else duration_string(value)
+
+
+# Writing or deleting many dishes in one transaction bumps the version once.
+written_dishes = CommitBatch(lambda keys: DishFacets.invalidate())
+
+
+@receiver(post_save, sender=Dish)
+@receiver(post_delete, sender=Dish)
+def invalidate_dish_facets(**kwargs: Any) -> None:
+    written_dishes.add(DishFacets.version_key)
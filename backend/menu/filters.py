@@ -1,6 +1,11 @@
-from typing import List
+import re
+from typing import Any, List
 
-from django.db.models import Count, QuerySet
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, Count, F, FloatField, Max, Min, Q, QuerySet, Value, When
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import BaseFilterBackend
 from django_filters import rest_framework as filters
 from rest_framework.request import Request
@@ -9,30 +14,112 @@ from rest_framework.viewsets import GenericViewSet
 from .models import Menu, Dish
 
 
-class DishesCountOrdering(BaseFilterBackend):
-    value = 'dishes_count'
+class MenuAggregates:
+    """Per-menu dish aggregates, annotated onto the menu query so a whole list is computed at once."""
+    expressions = {
+        'dishes_count': Count('dishes'),
+        'min_price': Min('dishes__price'),
+        'max_price': Max('dishes__price'),
+        'vegetarian_count': Count('dishes', filter=Q(dishes__is_vegetarian=True)),
+        'min_vegetarian_price': Min('dishes__price', filter=Q(dishes__is_vegetarian=True)),
+    }
 
-    def filter_queryset(self, request: Request, queryset: 'QuerySet[Dish]', view: GenericViewSet) -> 'QuerySet[Dish]':
+    @classmethod
+    def annotate(cls, queryset: 'QuerySet[Menu]', *names: str) -> 'QuerySet[Menu]':
+        missing = {
+            name: cls.expressions[name] for name in names if name not in queryset.query.annotations
+        }
+        return queryset.annotate(**missing) if missing else queryset
+
+
+class MenuAggregatesOrdering(BaseFilterBackend):
+    values = ('dishes_count', 'min_price', 'max_price', 'vegetarian_count')
+
+    def filter_queryset(self, request: Request, queryset: 'QuerySet[Menu]', view: GenericViewSet) -> 'QuerySet[Menu]':
         params = request.query_params.get('ordering', '').split(',')
-        ordering_value = self.get_ordering_value(params)
-        if not ordering_value:
+        ordering_values = self.get_ordering_values(params)
+        if not ordering_values:
             return queryset
 
-        return queryset.annotate(dishes_count=Count('dishes')).order_by(ordering_value)
+        queryset = MenuAggregates.annotate(queryset, *(value.lstrip('-') for value in ordering_values))
+        return queryset.order_by(*ordering_values)
 
-    def get_ordering_value(self, params: List[str]) -> str:
+    def get_ordering_values(self, params: List[str]) -> List[str]:
+        ordering_values = []
         for param in params:
             descending = param.startswith('-')
             param = param[1:] if descending else param
-            if param == self.value:
-                return '-%s' % param if descending else param
-        return ''
+            if param in self.values:
+                ordering_values.append('-%s' % param if descending else param)
+        return ordering_values
+
+
+class MenuAggregateFilter(filters.NumberFilter):
+    """Filters menus on one of ``MenuAggregates``, annotating it only when the filter is used."""
+
+    def filter(self, queryset: 'QuerySet[Menu]', value: Any) -> 'QuerySet[Menu]':
+        if value in EMPTY_VALUES:
+            return queryset
+        return super().filter(MenuAggregates.annotate(queryset, self.field_name), value)
+
+
+class DishFullTextSearch(BaseFilterBackend):
+    """Ranked prefix search over dish names and descriptions.
+
+    Uses the trigger-maintained ``search_vector`` column and its GIN index on PostgreSQL,
+    falling back to ``LIKE`` matching on other databases.
+    """
+    param = 'q'
+    config = 'english'
+
+    def filter_queryset(self, request: Request, queryset: 'QuerySet[Dish]', view: GenericViewSet) -> 'QuerySet[Dish]':
+        return self.filter_terms(queryset, self.get_terms(request))
+
+    def filter_terms(self, queryset: 'QuerySet[Dish]', terms: List[str]) -> 'QuerySet[Dish]':
+        if connections[queryset.db].vendor == 'postgresql':
+            return self.search(queryset, terms)
+        return self.search_fallback(queryset, terms)
+
+    def get_terms(self, request: Request) -> List[str]:
+        terms = re.findall(r'\w+', request.query_params.get(self.param, ''))
+        if not terms:
+            raise ValidationError({self.param: ['This field is required.']})
+        return terms
+
+    def search(self, queryset: 'QuerySet[Dish]', terms: List[str]) -> 'QuerySet[Dish]':
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=self.config, search_type='raw')
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', 'pk')
+
+    @staticmethod
+    def search_fallback(queryset: 'QuerySet[Dish]', terms: List[str]) -> 'QuerySet[Dish]':
+        in_name = Q()
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+            in_name &= Q(name__icontains=term)
+        return queryset.annotate(
+            rank=Case(When(in_name, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+        ).order_by('-rank', 'pk')
+
+
+class DishFilterSet(filters.FilterSet):
+    class Meta:
+        model = Dish
+        fields = ('price', 'is_vegetarian', 'prepare_time_max', 'menu')
+
+    price = filters.RangeFilter()
+    prepare_time_max = filters.DurationFilter(field_name='prepare_time', lookup_expr='lte')
+    menu = filters.NumberFilter(field_name='menu_id')
 
 
 class MenuFilterSet(filters.FilterSet):
     class Meta:
         model = Menu
-        fields = ('modified', 'created')
+        fields = ('modified', 'created', 'price_max', 'vegetarian_price_max', 'vegetarian_count_min')
 
     modified = filters.IsoDateTimeFromToRangeFilter()
     created = filters.IsoDateTimeFromToRangeFilter()
+    price_max = MenuAggregateFilter(field_name='min_price', lookup_expr='lte')
+    vegetarian_price_max = MenuAggregateFilter(field_name='min_vegetarian_price', lookup_expr='lte')
+    vegetarian_count_min = MenuAggregateFilter(field_name='vegetarian_count', lookup_expr='gte')
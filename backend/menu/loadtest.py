@@ -0,0 +1,139 @@
+import json
+import random
+import uuid
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional
+
+from PIL import Image
+
+from common.loadtest import HttpConnection, Request, Response
+
+READS = ('menu_list', 'menu_aggregates', 'menu_detail', 'menu_batch')
+WRITES = ('token', 'menu_create', 'menu_update', 'menu_delete', 'dish_picture')
+
+
+class TrafficMix:
+    """Synthetic API traffic, ``write_ratio`` of it writes and the rest reads of the public menus.
+
+    Writes obtain tokens, create, update and delete menus, and upload dish pictures, so they need
+    an editor's ``username`` and ``password``. They work on a menu and dish created by ``setup``
+    and on menus created during the run; ``teardown`` deletes whatever of those is left.
+    """
+
+    def __init__(self, write_ratio: float, username: str = '', password: str = '', seed: Optional[int] = None) -> None:
+        self.write_ratio = write_ratio
+        self.username = username
+        self.password = password
+        self.random = random.Random(seed)
+        self.prefix = f'Load test {uuid.uuid4().hex[:8]}'
+        self.counter = 0
+        self.headers: Dict[str, str] = {}
+        self.menu_ids: List[int] = []
+        self.created_menu_ids: List[int] = []
+        self.menu_id: Optional[int] = None
+        self.dish_id: Optional[int] = None
+        self.picture = b''
+
+    async def setup(self, connection: HttpConnection) -> None:
+        self.menu_ids = [menu['id'] for menu in await self.call(connection, self.menu_list())]
+        if self.write_ratio:
+            self.on_response(self.token(), await connection.request(self.token()))
+            if not self.headers:
+                raise ValueError(f'No token for {self.username}')
+            menu_id = (await self.call(connection, self.menu_create()))['id']
+            self.menu_id = menu_id
+            self.menu_ids.append(menu_id)
+            self.dish_id = (await self.call(connection, self.json_request('', 'POST', '/api/manage/menu/dish/', {
+                'name': self.get_name(), 'description': 'Dish for picture uploads', 'price': '10.00',
+                'prepare_time': '0:15:00', 'is_vegetarian': False, 'menu': self.prefix,
+            })))['id']
+            self.picture = self.get_picture_body()
+        if not self.menu_ids:
+            raise ValueError('There are no menus to read')
+
+    async def teardown(self, connection: HttpConnection) -> None:
+        for menu_id in self.created_menu_ids + ([self.menu_id] if self.menu_id else []):
+            await connection.request(self.menu_delete(menu_id))
+
+    def next_request(self) -> Request:
+        kinds = WRITES if self.random.random() < self.write_ratio else READS
+        get_request: Callable[[], Request] = getattr(self, self.random.choice(kinds))
+        return get_request()
+
+    def on_response(self, request: Request, response: Optional[Response]) -> None:
+        if response is None:
+            return
+        if request.label == 'POST /api/token/' and response.status == 200:
+            self.headers = {'Authorization': f'Bearer {json.loads(response.body)["access"]}'}
+        elif request.label == 'POST /api/manage/menu/' and response.status == 201:
+            self.created_menu_ids.append(json.loads(response.body)['id'])
+
+    @staticmethod
+    async def call(connection: HttpConnection, request: Request) -> Any:
+        response = await connection.request(request)
+        if response.status >= 400:
+            raise ValueError(f'{request.method} {request.path} responded with {response.status}')
+        return json.loads(response.body) if response.body else None
+
+    def menu_list(self) -> Request:
+        return Request('GET /api/menu/', 'GET', '/api/menu/')
+
+    def menu_aggregates(self) -> Request:
+        return Request('GET /api/menu/?aggregates', 'GET', '/api/menu/?aggregates=true&ordering=-dishes_count')
+
+    def menu_detail(self) -> Request:
+        return Request('GET /api/menu/{id}/', 'GET', f'/api/menu/{self.random.choice(self.menu_ids)}/')
+
+    def menu_batch(self) -> Request:
+        ids = self.random.sample(self.menu_ids, min(len(self.menu_ids), 5))
+        return Request('GET /api/menu/batch/', 'GET', f'/api/menu/batch/?ids={",".join(map(str, ids))}')
+
+    def token(self) -> Request:
+        return self.json_request(
+            'POST /api/token/', 'POST', '/api/token/', {'username': self.username, 'password': self.password}
+        )
+
+    def menu_create(self) -> Request:
+        name = self.get_name() if self.menu_id else self.prefix
+        return self.json_request('POST /api/manage/menu/', 'POST', '/api/manage/menu/', {
+            'name': name, 'description': 'Created by the load test'
+        })
+
+    def menu_update(self) -> Request:
+        return self.json_request(
+            'PATCH /api/manage/menu/{id}/', 'PATCH', f'/api/manage/menu/{self.menu_id}/',
+            {'description': f'Updated by the load test {self.get_name()}'}
+        )
+
+    def menu_delete(self, menu_id: Optional[int] = None) -> Request:
+        if menu_id is None:
+            if not self.created_menu_ids:
+                return self.menu_create()
+            menu_id = self.created_menu_ids.pop(self.random.randrange(len(self.created_menu_ids)))
+        return Request('DELETE /api/manage/menu/{id}/', 'DELETE', f'/api/manage/menu/{menu_id}/', self.headers)
+
+    def dish_picture(self) -> Request:
+        boundary = 'loadtestboundary'
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="picture"; filename="picture.jpeg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n'
+        ).encode() + self.picture + f'\r\n--{boundary}--\r\n'.encode()
+        headers = {**self.headers, 'Content-Type': f'multipart/form-data; boundary={boundary}'}
+        return Request(
+            'PUT /api/manage/menu/dish/{id}/picture/', 'PUT', f'/api/manage/menu/dish/{self.dish_id}/picture/',
+            headers, body
+        )
+
+    def json_request(self, label: str, method: str, path: str, data: Dict[str, Any]) -> Request:
+        headers = {**self.headers, 'Content-Type': 'application/json'}
+        return Request(label, method, path, headers, json.dumps(data).encode())
+
+    def get_name(self) -> str:
+        self.counter += 1
+        return f'{self.prefix} {self.counter}'
+
+    @staticmethod
+    def get_picture_body() -> bytes:
+        buffer = BytesIO()
+        Image.new('RGB', (640, 480), (200, 120, 40)).save(buffer, 'JPEG')
+        return buffer.getvalue()
@@ -0,0 +1,75 @@
+import json
+import timeit
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, List
+
+import msgpack
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from common.renderers import FastJSONRenderer, MessagePackRenderer
+from menu.models import Menu, Dish
+from menu.serializers import DishListSerializer, MenuDishesSerializer, MenuSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare the render time and size of menu and dish responses for each API renderer.'
+    renderers: List[BaseRenderer] = [JSONRenderer(), FastJSONRenderer(), MessagePackRenderer()]
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--menus', type=int, default=50, help='Menus in the menu list.')
+        parser.add_argument('--dishes', type=int, default=100, help='Dishes in the menu detail and dish list.')
+        parser.add_argument('--number', type=int, default=200, help='Renders per measurement.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        menus = self.build_menus(options['menus'], options['dishes'])
+        payloads = {
+            'menu list': MenuSerializer(menus, many=True).data,
+            'menu detail': MenuDishesSerializer(menus[0]).data,
+            'dish list': DishListSerializer(list(menus[0].dishes.all()), many=True).data,
+        }
+        for name, data in payloads.items():
+            self.report(name, data, options['number'])
+
+    @staticmethod
+    def build_menus(menus_count: int, dishes_count: int) -> List[Menu]:
+        now = timezone.now()
+        menus = [
+            Menu(pk=pk, name=f'Menu {pk}', description=f'Description of menu {pk} ' * 3, created=now, modified=now)
+            for pk in range(1, menus_count + 1)
+        ]
+        dishes = [
+            Dish(
+                pk=pk, menu=menus[0], name=f'Dish {pk}', description=f'Description of dish {pk} ' * 3,
+                price=Decimal(pk % 99 + 1) + Decimal('0.99'), prepare_time=timedelta(minutes=pk % 60 + 5),
+                is_vegetarian=pk % 3 == 0, created=now, modified=now,
+            )
+            for pk in range(1, dishes_count + 1)
+        ]
+        # Stands in for prefetch_related('dishes'), so no database is needed.
+        menus[0]._prefetched_objects_cache = {'dishes': dishes}
+        return menus
+
+    def report(self, name: str, data: Any, number: int) -> None:
+        expected = JSONRenderer().render(data)
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+
+        baseline = None
+        for renderer in self.renderers:
+            content = renderer.render(data)
+            seconds = min(timeit.repeat(lambda: renderer.render(data), number=number, repeat=3)) / number
+            baseline = baseline or seconds
+            self.stdout.write(
+                f'  {type(renderer).__name__:<22} {seconds * 1e6:9.1f} us {baseline / seconds:6.1f}x '
+                f'{len(content):8d} bytes  {self.compare(renderer, content, expected)}'
+            )
+
+    @staticmethod
+    def compare(renderer: BaseRenderer, content: bytes, expected: bytes) -> str:
+        if content == expected:
+            return 'identical to JSONRenderer'
+        if isinstance(renderer, MessagePackRenderer) and msgpack.unpackb(content) == json.loads(expected):
+            return 'same values as JSONRenderer'
+        return 'DIFFERS from JSONRenderer'
@@ -0,0 +1,21 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from menu.static_site import StaticMenuSite
+
+
+class Command(BaseCommand):
+    help = 'Render the published menus into static JSON and HTML files under STATIC_MENUS_ROOT.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('menu_ids', nargs='*', type=int, help='Menus to rebuild, all by default.')
+        parser.add_argument('--force', action='store_true', help='Rewrite files even if their content is unchanged.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        site = StaticMenuSite()
+        result = site.build(options['menu_ids'] or None, force=options['force'])
+        self.stdout.write(
+            f'Static menus in {site.root}: {len(result["written"])} written, '
+            f'{len(result["unchanged"])} unchanged, {len(result["removed"])} removed'
+        )
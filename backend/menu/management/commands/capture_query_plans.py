@@ -0,0 +1,54 @@
+import os
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+
+from common.plans import QueryPlans
+from menu.models import Menu, Dish
+from menu.plans import get_scenarios, populate
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'tests', 'query_plans.json')
+
+
+class Command(BaseCommand):
+    help = 'Capture the PostgreSQL plans of the API and task queries and compare them to the stored baseline.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--baseline', default=os.path.normpath(BASELINE_PATH), help='Baseline JSON file.')
+        parser.add_argument('--update', action='store_true', help='Store the captured plans as the baseline.')
+        parser.add_argument('--tolerance', type=float, default=2.0, help='Allowed cost growth factor.')
+        parser.add_argument(
+            '--populate', type=int, nargs=2, metavar=('MENUS', 'DISHES'),
+            help='First insert this many synthetic menus and dishes, only for a scratch database.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans can only be captured on PostgreSQL')
+        if options['populate']:
+            populate(*options['populate'])
+
+        plans = QueryPlans(options['tolerance'])
+        captured = plans.capture(get_scenarios())
+        size = {'menus': Menu.objects.count(), 'dishes': Dish.objects.count()}
+        for name, fingerprints in captured.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for fingerprint in fingerprints:
+                self.stdout.write(f'  cost {fingerprint["cost"]}')
+                self.stdout.write('\n'.join(f'    {node}' for node in fingerprint['nodes']))
+
+        if options['update']:
+            QueryPlans.save(options['baseline'], {'size': size, 'plans': captured})
+            self.stdout.write(f'Stored the plans at {size["dishes"]} dishes in {options["baseline"]}')
+            return
+
+        baseline = QueryPlans.load(options['baseline'])
+        if baseline is None:
+            raise CommandError(f'No baseline at {options["baseline"]}, store one with --update')
+        if baseline['size'] != size:
+            self.stdout.write(self.style.WARNING(f'Baseline was captured at {baseline["size"]}, now {size}'))
+        problems = plans.compare(baseline['plans'], captured)
+        if problems:
+            raise CommandError('Query plans regressed:\n' + '\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS('No query plan regressions'))
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import Group, Permission, User
 from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from menu.models import Menu, Dish
@@ -46,10 +47,12 @@ class Command(BaseCommand):
 
     @staticmethod
     def create_menus():
-        MenuFactory()
-        menus = MenuFactory.create_batch(3)
-        for menu in menus:
-            DishFactory.create_batch(3, menu=menu)
+        # In one transaction, so the static menus are rebuilt once.
+        with transaction.atomic():
+            MenuFactory()
+            menus = MenuFactory.create_batch(3)
+            for menu in menus:
+                DishFactory.create_batch(3, menu=menu)
 
     @staticmethod
     def create_token_for_user(user: User):
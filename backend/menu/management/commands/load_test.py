@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Dict, List
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from common.loadtest import HttpConnection, LoadTest, read_log
+from menu.loadtest import TrafficMix
+
+
+class Command(BaseCommand):
+    help = 'Replay an access log, or send a synthetic read and write mix, to a running instance and report latencies.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('url', nargs='?', default='http://localhost:8000', help='Instance under test.')
+        parser.add_argument('--log', help='Access log in the combined format to replay, its GET and HEAD requests.')
+        parser.add_argument('--speed', type=float, default=1.0, help='Replay this many times faster than recorded.')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds of synthetic traffic.')
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent connections.')
+        parser.add_argument('--write-ratio', type=float, default=0.1, help='Share of writes in synthetic traffic.')
+        parser.add_argument('--username', default='', help='Editor to write as.')
+        parser.add_argument('--password', default='', help='Password of the editor.')
+        parser.add_argument('--seed', type=int, help='Seed of the synthetic traffic.')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not options['log'] and options['write_ratio'] and not options['username']:
+            raise CommandError('Writes need --username and --password of an editor, or set --write-ratio 0.')
+        load_test = LoadTest(options['url'], options['concurrency'])
+        try:
+            if options['log']:
+                with open(options['log']) as log:
+                    asyncio.run(load_test.replay(read_log(log), options['speed']))
+            else:
+                asyncio.run(self.run_mix(load_test, options))
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.report(load_test.get_report(), load_test.elapsed)
+
+    @staticmethod
+    async def run_mix(load_test: LoadTest, options: Dict[str, Any]) -> None:
+        mix = TrafficMix(options['write_ratio'], options['username'], options['password'], options['seed'])
+        connection = HttpConnection(options['url'])
+        try:
+            await mix.setup(connection)
+            await load_test.run(mix.next_request, options['duration'], mix.on_response)
+        finally:
+            await mix.teardown(connection)
+            await connection.close()
+
+    def report(self, rows: List[Dict[str, Any]], elapsed: float) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{rows[-1]["requests"]} requests in {elapsed:.1f} s'))
+        for row in rows:
+            statuses = ' '.join(f'{status or "failed"}:{count}' for status, count in row['statuses'].items())
+            self.stdout.write(
+                f'  {row["label"]:<42} {row["requests"]:7d} {row["throughput"]:8.1f}/s  '
+                f'p50 {row["p50"]:7.1f} ms  p90 {row["p90"]:7.1f} ms  p99 {row["p99"]:7.1f} ms  '
+                f'max {row["max"]:7.1f} ms  {statuses}'
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.4 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_dish_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='has_picture_variants',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.0.4 on 2026-10-19 10:50
+
+import common.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_dish_has_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dish',
+            name='picture',
+            field=models.ImageField(blank=True, db_index=True, storage=common.storage.ContentAddressedStorage(), upload_to=''),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.0.4 on 2026-10-19 10:53
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce({table}.name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({table}.description, '')), 'B')
+"""
+
+CREATE_SEARCH_VECTOR_SQL = f"""
+CREATE FUNCTION menu_dish_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(table='NEW')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER menu_dish_search_vector_update
+    BEFORE INSERT OR UPDATE ON menu_dish
+    FOR EACH ROW EXECUTE PROCEDURE menu_dish_search_vector_update();
+
+UPDATE menu_dish SET search_vector = {SEARCH_VECTOR_SQL.format(table='menu_dish')};
+
+CREATE INDEX menu_dish_search_vector_gin ON menu_dish USING gin (search_vector);
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP INDEX IF EXISTS menu_dish_search_vector_gin;
+DROP TRIGGER IF EXISTS menu_dish_search_vector_update ON menu_dish;
+DROP FUNCTION IF EXISTS menu_dish_search_vector_update();
+"""
+
+
+def create_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_VECTOR_SQL)
+
+
+def drop_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_VECTOR_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0004_dish_picture_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_vector_trigger, drop_search_vector_trigger),
+    ]
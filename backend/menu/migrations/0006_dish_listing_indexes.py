@@ -0,0 +1,37 @@
+# Generated by Django 3.0.4 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0005_dish_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['price', 'id'], name='menu_dish_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['prepare_time', 'id'], name='menu_dish_prep_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['is_vegetarian', 'price', 'id'], name='menu_dish_veg_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['is_vegetarian', 'prepare_time', 'id'], name='menu_dish_veg_prep_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['menu', 'price', 'id'], name='menu_dish_menu_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['menu', 'prepare_time', 'id'], name='menu_dish_menu_prep_id_idx'),
+        ),
+    ]
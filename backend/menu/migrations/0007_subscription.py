@@ -0,0 +1,26 @@
+# Generated by Django 3.0.4 on 2026-10-19 11:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('menu', '0006_dish_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Subscription',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vegetarian_only', models.BooleanField(default=False)),
+                ('opted_out', models.BooleanField(default=False)),
+                ('followed_menus', models.ManyToManyField(blank=True, related_name='subscriptions', to='menu.Menu')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='subscription', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
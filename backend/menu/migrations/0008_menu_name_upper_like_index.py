@@ -0,0 +1,26 @@
+from django.db import migrations
+
+# Serves the admin's prefix search, name__istartswith, which compiles to UPPER(name) LIKE UPPER(%s).
+CREATE_INDEX_SQL = 'CREATE INDEX menu_menu_name_upper_like ON menu_menu (UPPER(name::text) text_pattern_ops);'
+DROP_INDEX_SQL = 'DROP INDEX IF EXISTS menu_menu_name_upper_like;'
+
+
+def create_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_INDEX_SQL)
+
+
+def drop_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0007_subscription'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_name_index, drop_name_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.0.4 on 2026-10-19 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0008_menu_name_upper_like_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['created'], name='menu_dish_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(fields=['modified'], name='menu_dish_modified_idx'),
+        ),
+    ]
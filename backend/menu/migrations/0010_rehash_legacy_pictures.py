@@ -0,0 +1,44 @@
+import os
+
+from django.conf import settings
+from django.db import migrations
+
+from common.storage import ContentAddressedStorage
+
+
+def rehash_legacy_pictures(apps, schema_editor):
+    """Move pictures uploaded before content addressing, and their variants, to content-addressed names.
+
+    Variant names are derived from the picture name, so a legacy ``picture.jpeg`` would otherwise get
+    its variants stored under unrelated hash names, which its URLs and deletions never find.
+    """
+    Dish = apps.get_model('menu', 'Dish')
+    storage = ContentAddressedStorage()
+    names = Dish.objects.exclude(picture='').values_list('picture', flat=True).distinct()
+    for name in [name for name in names if not storage.is_content_addressed(name)]:
+        if not storage.exists(name):
+            continue
+        with storage.open(name, 'rb') as picture:
+            new_name = storage.save(name, picture)
+
+        root, new_root = os.path.splitext(name)[0], os.path.splitext(new_name)[0]
+        for width in settings.DISH_PICTURE_VARIANT_WIDTHS:
+            variant, new_variant = f'{root}.{width}w.webp', f'{new_root}.{width}w.webp'
+            if storage.exists(variant):
+                if storage.exists(new_variant):
+                    storage.delete(variant)
+                else:
+                    os.replace(storage.path(variant), storage.path(new_variant))
+        Dish.objects.filter(picture=name).update(picture=new_name)
+        storage.delete(name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0009_dish_created_modified_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rehash_legacy_pictures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 3.0.4 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+# Statement level triggers see all rows a DELETE removed at once, so bulk deletes insert their tombstones in one go.
+CREATE_POSTGRESQL_TRIGGERS_SQL = """
+CREATE FUNCTION menu_tombstone_insert() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'menu_dish' THEN
+        INSERT INTO menu_tombstone (model, object_id, menu_id, deleted)
+        SELECT 'dish', id, menu_id, clock_timestamp() FROM deleted_rows;
+    ELSE
+        INSERT INTO menu_tombstone (model, object_id, menu_id, deleted)
+        SELECT 'menu', id, id, clock_timestamp() FROM deleted_rows;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER menu_dish_tombstone AFTER DELETE ON menu_dish
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE PROCEDURE menu_tombstone_insert();
+
+CREATE TRIGGER menu_menu_tombstone AFTER DELETE ON menu_menu
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE PROCEDURE menu_tombstone_insert();
+"""
+
+DROP_POSTGRESQL_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS menu_menu_tombstone ON menu_menu;
+DROP TRIGGER IF EXISTS menu_dish_tombstone ON menu_dish;
+DROP FUNCTION IF EXISTS menu_tombstone_insert();
+"""
+
+# SQLite, used for local development, has row level triggers only.
+CREATE_SQLITE_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER menu_dish_tombstone AFTER DELETE ON menu_dish BEGIN
+        INSERT INTO menu_tombstone (model, object_id, menu_id, deleted)
+        VALUES ('dish', OLD.id, OLD.menu_id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END;
+    """,
+    """
+    CREATE TRIGGER menu_menu_tombstone AFTER DELETE ON menu_menu BEGIN
+        INSERT INTO menu_tombstone (model, object_id, menu_id, deleted)
+        VALUES ('menu', OLD.id, OLD.id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END;
+    """,
+]
+
+DROP_SQLITE_TRIGGERS_SQL = [
+    'DROP TRIGGER IF EXISTS menu_menu_tombstone;',
+    'DROP TRIGGER IF EXISTS menu_dish_tombstone;',
+]
+
+
+def create_tombstone_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_POSTGRESQL_TRIGGERS_SQL)
+    elif schema_editor.connection.vendor == 'sqlite':
+        for sql in CREATE_SQLITE_TRIGGERS_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_tombstone_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_POSTGRESQL_TRIGGERS_SQL)
+    elif schema_editor.connection.vendor == 'sqlite':
+        for sql in DROP_SQLITE_TRIGGERS_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0010_rehash_legacy_pictures'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('menu', 'Menu'), ('dish', 'Dish')], max_length=4)),
+                ('object_id', models.IntegerField()),
+                ('menu_id', models.IntegerField()),
+                ('deleted', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(create_tombstone_triggers, drop_tombstone_triggers),
+    ]
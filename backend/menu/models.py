@@ -1,5 +1,20 @@
+from typing import Any, List
+
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from common.db import advisory_lock
+from common.storage import ContentAddressedStorage
+
+from .pictures import PictureVariants
+
+
+class MenuQuerySet(models.QuerySet):
+    def published(self) -> 'MenuQuerySet':
+        """Menus with dishes, as a semi-join instead of a DISTINCT over the join with every dish."""
+        return self.filter(pk__in=Dish.objects.values('menu_id'))
+
 
 class Menu(models.Model):
     name = models.CharField(max_length=1024, unique=True)
@@ -8,6 +23,8 @@ class Menu(models.Model):
     modified = models.DateTimeField(auto_now=True)
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = MenuQuerySet.as_manager()
+
     def __str__(self) -> str:
         return f'Menu {self.name}'
 
@@ -19,7 +36,9 @@ class Dish(models.Model):
     price = models.DecimalField(max_digits=4, decimal_places=2)
     prepare_time = models.DurationField()
     is_vegetarian = models.BooleanField()
-    picture = models.ImageField(blank=True)
+    picture = models.ImageField(blank=True, db_index=True, storage=ContentAddressedStorage())
+    has_picture_variants = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     modified = models.DateTimeField(auto_now=True)
     created = models.DateTimeField(auto_now_add=True)
@@ -30,5 +49,77 @@ class Dish(models.Model):
         related_name='dishes'
     )
 
+    stored_picture = ''
+    stored_menu_id = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['price', 'id'], name='menu_dish_price_id_idx'),
+            models.Index(fields=['prepare_time', 'id'], name='menu_dish_prep_id_idx'),
+            models.Index(fields=['is_vegetarian', 'price', 'id'], name='menu_dish_veg_price_id_idx'),
+            models.Index(fields=['is_vegetarian', 'prepare_time', 'id'], name='menu_dish_veg_prep_id_idx'),
+            models.Index(fields=['menu', 'price', 'id'], name='menu_dish_menu_price_id_idx'),
+            models.Index(fields=['menu', 'prepare_time', 'id'], name='menu_dish_menu_prep_id_idx'),
+            models.Index(fields=['created'], name='menu_dish_created_idx'),
+            models.Index(fields=['modified'], name='menu_dish_modified_idx'),
+        ]
+
     def __str__(self) -> str:
         return f'Dish {self.name} in menu {self.menu}'
+
+    @classmethod
+    def from_db(cls, db: str, field_names: List[str], values: List[Any]) -> 'Dish':
+        dish = super().from_db(db, field_names, values)
+        # The picture and menu as stored, so what a save replaces can be released and rebuilt.
+        dish.stored_picture = dish.__dict__.get('picture') or ''
+        dish.stored_menu_id = dish.__dict__.get('menu_id')
+        return dish
+
+    @property
+    def picture_variants(self) -> PictureVariants:
+        return PictureVariants(self.picture, self.has_picture_variants)
+
+    @staticmethod
+    def lock_picture(name: str) -> None:
+        """Serialize storing and deleting the files of ``name`` until the transaction ends.
+
+        Identical uploads share files, so a deletion checking that no dish references them
+        must not interleave with a save of the same content.
+        """
+        advisory_lock(f'dish-picture:{name}')
+
+    def release_picture(self, save: bool = True) -> None:
+        """Detach the picture; its files are deleted after commit once no other dish references them."""
+        self.picture = None
+        self.has_picture_variants = False
+        if save:
+            self.save()
+
+
+class Subscription(models.Model):
+    """Digest preferences of a user; users without one get the digest of every menu."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='subscription')
+    followed_menus = models.ManyToManyField(Menu, blank=True, related_name='subscriptions')
+    vegetarian_only = models.BooleanField(default=False)
+    opted_out = models.BooleanField(default=False)
+
+    def __str__(self) -> str:
+        return f'Subscription of {self.user}'
+
+
+class Tombstone(models.Model):
+    """A deleted menu or dish, recorded by a database trigger so the menu read model can drop it.
+
+    Deletions leave no ``modified`` timestamp to refresh from, and the triggers also catch bulk
+    and cascading deletes. Tombstones are pruned after ``MENU_TOMBSTONE_RETENTION`` seconds.
+    """
+    MENU = 'menu'
+    DISH = 'dish'
+
+    model = models.CharField(max_length=4, choices=[(MENU, 'Menu'), (DISH, 'Dish')])
+    object_id = models.IntegerField()
+    menu_id = models.IntegerField()
+    deleted = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f'Deleted {self.model} {self.object_id}'
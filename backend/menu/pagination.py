@@ -0,0 +1,6 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class DishSearchPagination(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 100
@@ -0,0 +1,74 @@
+import os
+from io import BytesIO
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps
+
+
+class PictureVariants:
+    """Resized WebP variants of a dish picture stored next to the original file."""
+    extension = 'webp'
+
+    def __init__(self, picture: FieldFile, generated: bool = True) -> None:
+        self.picture = picture
+        self.generated = generated
+
+    @property
+    def widths(self) -> List[int]:
+        return sorted(settings.DISH_PICTURE_VARIANT_WIDTHS)
+
+    def name(self, width: int) -> str:
+        root, _ = os.path.splitext(self.picture.name)
+        return f'{root}.{width}w.{self.extension}'
+
+    def urls(self) -> Dict[str, str]:
+        if not self.picture or not self.generated:
+            return {}
+        return {f'{width}w': self.picture.storage.url(self.name(width)) for width in self.widths}
+
+    @property
+    def smallest_url(self) -> str:
+        if not self.picture:
+            return ''
+        if not self.generated:
+            return self.picture.url
+        return self.picture.storage.url(self.name(self.widths[0]))
+
+    def generate(self) -> List[str]:
+        storage = self.picture.storage
+        with storage.open(self.picture.name, 'rb') as original_file:
+            original = ImageOps.exif_transpose(Image.open(original_file))
+            if original.mode not in ('RGB', 'RGBA'):
+                original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+            names = []
+            for width in self.widths:
+                names.append(self.save_variant(original, width))
+        return names
+
+    def save_variant(self, original: Image.Image, width: int) -> str:
+        name = self.name(width)
+        storage = self.picture.storage
+        if storage.exists(name):
+            return name
+
+        variant = original.copy()
+        if variant.width > width:
+            height = max(1, round(variant.height * width / variant.width))
+            variant = variant.resize((width, height), Image.LANCZOS)
+
+        content = BytesIO()
+        variant.save(content, format='WEBP', quality=settings.DISH_PICTURE_VARIANT_QUALITY, method=6)
+        return storage.save(name, ContentFile(content.getvalue()))
+
+    def delete(self) -> None:
+        if not self.picture:
+            return
+        storage = self.picture.storage
+        for width in self.widths:
+            name = self.name(width)
+            if storage.exists(name):
+                storage.delete(name)
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from io import BytesIO
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler, WSGIRequest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from common.plans import Scenarios
+
+from .facets import DishFacets
+from .models import Menu
+from .static_site import get_menus_queryset
+from .tasks.notify_about_new_and_modified_dishes import NotifyManager
+
+POPULATE_MENUS_SQL = """
+INSERT INTO menu_menu (name, description, created, modified)
+SELECT 'Plan menu ' || i, 'Menu number ' || i, now() - i * interval '1 hour', now() - i * interval '1 minute'
+FROM generate_series(1, %(menus)s) AS i
+"""
+
+# Dishes go to the first nine tenths of the menus, so some menus stay empty like unpublished ones.
+POPULATE_DISHES_SQL = """
+INSERT INTO menu_dish (
+    name, description, price, prepare_time, is_vegetarian, picture, has_picture_variants, created, modified, menu_id
+)
+SELECT
+    'Plan dish ' || i,
+    'Dish number ' || i || ' with ' || (ARRAY['tomato', 'cheese', 'mushroom', 'chicken'])[i %% 4 + 1],
+    (i %% 9899) / 100.0 + 0.01,
+    (i %% 120) * interval '1 minute',
+    i %% 3 = 0,
+    '',
+    false,
+    now() - (i %% 720) * interval '1 hour',
+    now() - (i %% 240) * interval '1 hour',
+    (ARRAY(SELECT id FROM menu_menu ORDER BY id DESC LIMIT %(menus)s))[i %% greatest(%(menus)s * 9 / 10, 1) + 1]
+FROM generate_series(1, %(dishes)s) AS i
+"""
+
+
+def populate(menus: int, dishes: int) -> None:
+    """Insert synthetic menus and dishes on PostgreSQL and refresh the planner statistics."""
+    with connection.cursor() as cursor:
+        cursor.execute(POPULATE_MENUS_SQL, {'menus': menus})
+        cursor.execute(POPULATE_DISHES_SQL, {'menus': menus, 'dishes': dishes})
+        cursor.execute('ANALYZE menu_menu, menu_dish')
+
+
+def get_scenarios() -> Scenarios:
+    """The queries run by the API, its filters, and the tasks, named by where they come from."""
+    menu_ids = list(Menu.objects.published().order_by('pk').values_list('pk', flat=True)[:3])
+    yesterday_date = timezone.now() - timedelta(days=1)
+    urls = {
+        'api.menu.list': reverse('menu-list'),
+        'api.menu.list.aggregates': reverse('menu-list') + '?aggregates=true&ordering=-dishes_count',
+        'api.menu.list.created': reverse('menu-list') + f'?created_after={yesterday_date:%Y-%m-%dT%H:%M:%S}',
+        'api.menu.detail': reverse('menu-detail', args=[menu_ids[0]]),
+        'api.menu.batch': reverse('menu-batch') + f'?ids={",".join(map(str, menu_ids))}',
+        'api.dish.list': reverse('dish-list') + '?ordering=price',
+        'api.dish.list.vegetarian': reverse('dish-list') + '?is_vegetarian=true&ordering=prepare_time',
+        'api.dish.list.menu': reverse('dish-list') + f'?menu={menu_ids[0]}&ordering=price',
+        'api.dish.facets': reverse('dish-facets') + '?is_vegetarian=true',
+        'api.dish.search': reverse('dish-search-list') + '?q=mushroom',
+    }
+    scenarios = {name: request(url) for name, url in urls.items()}
+    scenarios.update({
+        'task.notify.created_dishes': lambda: list(NotifyManager.get_created_dishes(yesterday_date)),
+        'task.notify.modified_dishes': lambda: list(NotifyManager.get_modified_dishes(yesterday_date)),
+        'task.notify.recipients': lambda: list(NotifyManager.get_recipients(10)),
+        'task.static_site.menus': lambda: list(get_menus_queryset(menu_ids)),
+    })
+    return scenarios
+
+
+def request(url: str) -> Callable[[], Any]:
+    """A GET of the URL through the middleware and view, like a request from a client."""
+    handler = WSGIHandler()
+    path, _, query = url.partition('?')
+    host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+
+    def get() -> None:
+        # Facet counts are cached per dish data version, so a new version makes every run count them.
+        DishFacets.invalidate()
+        response = handler.get_response(WSGIRequest({
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'HTTP_HOST': host, 'SERVER_NAME': host, 'SERVER_PORT': '443',
+            'wsgi.url_scheme': 'https', 'wsgi.input': BytesIO(),
+        }))
+        if response.status_code != 200:
+            raise ValueError(f'GET {url} responded with {response.status_code}')
+    return get
@@ -0,0 +1,301 @@
+import logging
+import operator
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import QuerySet
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.serializers import Serializer
+
+from .filters import MenuAggregates, MenuAggregatesOrdering, MenuFilterSet
+from .models import Menu, Dish, Tombstone
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[['MenuRecord'], bool]
+
+lookups = {'exact': operator.eq, 'lt': operator.lt, 'lte': operator.le, 'gt': operator.gt, 'gte': operator.ge}
+
+
+class MenuRecord:
+    """A menu with its ``MenuAggregates``, holding just what the menu list serializers read."""
+    __slots__ = (
+        'id', 'name', 'description', 'modified', 'created',
+        'dishes_count', 'min_price', 'max_price', 'vegetarian_count', 'min_vegetarian_price', 'representations',
+    )
+
+    def __init__(self, menu: Menu) -> None:
+        self.id: int = menu.pk
+        self.name: str = menu.name
+        self.description: str = menu.description
+        self.modified: datetime = menu.modified
+        self.created: datetime = menu.created
+        self.dishes_count: int = getattr(menu, 'dishes_count')
+        self.min_price: Optional[Decimal] = getattr(menu, 'min_price')
+        self.max_price: Optional[Decimal] = getattr(menu, 'max_price')
+        self.vegetarian_count: int = getattr(menu, 'vegetarian_count')
+        self.min_vegetarian_price: Optional[Decimal] = getattr(menu, 'min_vegetarian_price')
+        self.representations: Dict[type, Dict[str, Any]] = {}
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    def represent(self, serializer: Serializer) -> Dict[str, Any]:
+        """Serialize the menu once per serializer class; a changed menu gets a new record."""
+        representation = self.representations.get(type(serializer))
+        if representation is None:
+            representation = self.representations[type(serializer)] = serializer.to_representation(self)
+        return representation
+
+    @classmethod
+    def fetch(cls, queryset: 'QuerySet[Menu]') -> Dict[int, 'MenuRecord']:
+        queryset = MenuAggregates.annotate(queryset.order_by(), *MenuAggregates.expressions)
+        return {menu.pk: cls(menu) for menu in queryset}
+
+
+class DishMenus:
+    """The menu of every dish, as sorted arrays of ids, so the menu a dish moved away from can be traced.
+
+    Sixteen bytes a dish instead of a model instance.
+    """
+    # Removing more dishes at once rebuilds the arrays instead of shifting them once per dish.
+    max_removals_in_place = 100
+
+    def __init__(self, pairs: Iterable[Any] = ()) -> None:
+        self.ids = array('q')
+        self.menu_ids = array('q')
+        for dish_id, menu_id in pairs:
+            self.ids.append(dish_id)
+            self.menu_ids.append(menu_id)
+
+    def set(self, dish_id: int, menu_id: int) -> Optional[int]:
+        """Record the menu of a dish, return its previous menu."""
+        index = bisect_left(self.ids, dish_id)
+        if index < len(self.ids) and self.ids[index] == dish_id:
+            previous = self.menu_ids[index]
+            self.menu_ids[index] = menu_id
+            return previous
+        self.ids.insert(index, dish_id)
+        self.menu_ids.insert(index, menu_id)
+        return None
+
+    def remove(self, dish_ids: Set[int]) -> None:
+        if len(dish_ids) > self.max_removals_in_place:
+            pairs = [(dish_id, menu_id) for dish_id, menu_id in zip(self.ids, self.menu_ids) if dish_id not in dish_ids]
+            self.ids, self.menu_ids = array('q', (pair[0] for pair in pairs)), array('q', (pair[1] for pair in pairs))
+            return
+        for dish_id in dish_ids:
+            index = bisect_left(self.ids, dish_id)
+            if index < len(self.ids) and self.ids[index] == dish_id:
+                del self.ids[index]
+                del self.menu_ids[index]
+
+
+class Catalogue(NamedTuple):
+    menus: Dict[int, MenuRecord]
+    dishes: DishMenus
+    # Published menus, the ones with dishes, by pk and by every ordering the menu list accepts.
+    orderings: Dict[str, List[MenuRecord]]
+    name_ranks: Dict[int, int]
+    # Database time the catalogue was read from, and monotonic times of the last refresh and full load.
+    read_at: datetime
+    refreshed: float
+    loaded: float
+
+    def get_menus(self, ordering: List[str], predicates: List[Predicate]) -> List[MenuRecord]:
+        if len(ordering) == 1:
+            menus = self.orderings[ordering[0].lstrip('-')]
+            if ordering[0].startswith('-'):
+                menus = menus[::-1]
+        else:
+            menus = self.orderings['pk']
+            if ordering:
+                menus = list(menus)
+                # Stable sorts from the last term to the first order by all of them.
+                for term in reversed(ordering):
+                    menus.sort(key=self.get_sort_key(term.lstrip('-')), reverse=term.startswith('-'))
+        return [menu for menu in menus if all(predicate(menu) for predicate in predicates)]
+
+    def get_sort_key(self, field: str) -> Callable[[MenuRecord], Any]:
+        if field == 'name':
+            return lambda menu: self.name_ranks.get(menu.pk, -1)
+        return operator.attrgetter(field)
+
+
+class MenuReadModel:
+    """The whole menu catalogue in process memory, serving the menu list without queries.
+
+    Loaded by ``start()`` when the WSGI worker starts, then refreshed by a background thread every
+    ``MENU_READ_MODEL_REFRESH_INTERVAL`` seconds from the ``modified`` timestamps of menus and dishes
+    and the tombstones of deleted ones. Rows modified or deleted up to ``MENU_READ_MODEL_MODIFIED_MARGIN``
+    seconds before the previous refresh are read again, for transactions committed late and clocks of
+    other hosts. Everything is loaded again every ``MENU_READ_MODEL_RELOAD_INTERVAL`` seconds. A catalogue
+    not refreshed within ``MENU_READ_MODEL_MAX_STALENESS`` seconds is not served, the database is.
+    Processes which never started the thread, like management commands, refresh on the request that
+    finds the catalogue due.
+    """
+    orderings = ('pk', 'name', *MenuAggregatesOrdering.values)
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.catalogue: Optional[Catalogue] = None
+        self.refresher: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    def reset(self) -> None:
+        self.stop()
+        with self.lock:
+            self.catalogue = None
+
+    def start(self) -> None:
+        """Load the catalogue, then keep refreshing it from a daemon thread, off the request path."""
+        if not settings.MENU_READ_MODEL_ENABLED:
+            return
+        self.update()
+        self.stopping.clear()
+        self.refresher = threading.Thread(target=self.refresh_periodically, name='menu-read-model', daemon=True)
+        self.refresher.start()
+
+    def stop(self) -> None:
+        if self.refresher is not None:
+            self.stopping.set()
+            self.refresher.join()
+            self.refresher = None
+
+    def refresh_periodically(self) -> None:
+        while not self.stopping.wait(settings.MENU_READ_MODEL_REFRESH_INTERVAL):
+            try:
+                self.update()
+            except Exception:
+                logger.exception('Menu read model refresh failed')
+            finally:
+                close_old_connections()
+
+    def get(self) -> Optional[Catalogue]:
+        """Return the current catalogue, or None when it must not be served."""
+        if not settings.MENU_READ_MODEL_ENABLED:
+            return None
+        if self.refresher is None:
+            self.refresh_when_due()
+        elif not self.refresher.is_alive():
+            # Forked from the process which started it, e.g. by a preloading server, which forks no threads.
+            self.start()
+        catalogue = self.catalogue
+        if catalogue is None or time.monotonic() - catalogue.refreshed > settings.MENU_READ_MODEL_MAX_STALENESS:
+            return None
+        return catalogue
+
+    def refresh_when_due(self) -> None:
+        catalogue = self.catalogue
+        age = time.monotonic() - catalogue.refreshed if catalogue else None
+        if age is None or age >= settings.MENU_READ_MODEL_REFRESH_INTERVAL:
+            # While the catalogue is fresh enough, other threads serve it instead of waiting for the refresh.
+            self.update(blocking=age is None or age >= settings.MENU_READ_MODEL_MAX_STALENESS)
+
+    def update(self, blocking: bool = True) -> None:
+        catalogue = self.catalogue
+        if not self.lock.acquire(blocking=blocking):
+            return
+        try:
+            if self.catalogue is catalogue:
+                self.catalogue = self.refresh(catalogue)
+        except DatabaseError:
+            logger.exception('Menu read model not refreshed')
+            if catalogue is not None:
+                # The dish arrays may be half updated, so the next refresh loads everything.
+                self.catalogue = catalogue._replace(loaded=float('-inf'))
+        finally:
+            self.lock.release()
+
+    def refresh(self, catalogue: Optional[Catalogue]) -> Catalogue:
+        started, read_at = time.monotonic(), timezone.now()
+        if catalogue is None or started - catalogue.loaded >= settings.MENU_READ_MODEL_RELOAD_INTERVAL:
+            return self.load(started, read_at)
+
+        since = catalogue.read_at - timedelta(seconds=settings.MENU_READ_MODEL_MODIFIED_MARGIN)
+        dishes = catalogue.dishes
+        changed = MenuRecord.fetch(Menu.objects.filter(modified__gte=since))
+        affected: Set[int] = set()
+        for dish_id, menu_id in Dish.objects.filter(modified__gte=since).values_list('pk', 'menu_id').iterator():
+            affected.update((menu_id, dishes.set(dish_id, menu_id) or menu_id))
+
+        # Read after the modified rows, so a row deleted in between is dropped instead of kept.
+        deleted_menus: Set[int] = set()
+        deleted_dishes: Set[int] = set()
+        tombstones = Tombstone.objects.filter(deleted__gte=since).values_list('model', 'object_id', 'menu_id')
+        for model, object_id, menu_id in tombstones.iterator():
+            if model == Tombstone.MENU:
+                deleted_menus.add(object_id)
+            else:
+                deleted_dishes.add(object_id)
+                affected.add(menu_id)
+        dishes.remove(deleted_dishes)
+
+        changed.update(MenuRecord.fetch(Menu.objects.filter(pk__in=affected - changed.keys() - deleted_menus)))
+        removed = deleted_menus & (catalogue.menus.keys() | changed.keys())
+        if not changed and not removed:
+            return catalogue._replace(read_at=read_at, refreshed=started)
+        menus = {**catalogue.menus, **changed}
+        for menu_id in removed:
+            del menus[menu_id]
+        return self.build(menus, dishes, read_at, started, catalogue.loaded)
+
+    def load(self, started: float, read_at: datetime) -> Catalogue:
+        menus = MenuRecord.fetch(Menu.objects.all())
+        dishes = DishMenus(Dish.objects.order_by('pk').values_list('pk', 'menu_id').iterator(chunk_size=10000))
+        return self.build(menus, dishes, read_at, started, started)
+
+    def build(self, menus: Dict[int, MenuRecord], dishes: DishMenus, read_at: datetime, refreshed: float,
+              loaded: float) -> Catalogue:
+        # Names are ranked by the database, so they sort by its collation like the queries do.
+        name_order = Menu.objects.order_by('name').values_list('pk', flat=True)
+        name_ranks = {pk: rank for rank, pk in enumerate(name_order.iterator())}
+        published = sorted((menu for menu in menus.values() if menu.dishes_count > 0), key=operator.attrgetter('pk'))
+        orderings = {'pk': published}
+        for field in self.orderings[1:]:
+            key = (lambda menu: name_ranks.get(menu.pk, -1)) if field == 'name' else operator.attrgetter(field)
+            orderings[field] = sorted(published, key=key)
+        return Catalogue(menus, dishes, orderings, name_ranks, read_at, refreshed, loaded)
+
+    @staticmethod
+    def get_predicates(filterset: MenuFilterSet) -> Optional[List[Predicate]]:
+        """Turn the used filters into predicates, or return None when one has no in-memory equivalent."""
+        predicates: List[Predicate] = []
+        for name, field_filter in filterset.filters.items():
+            value = filterset.form.cleaned_data.get(name)
+            if value in EMPTY_VALUES:
+                continue
+            if field_filter.exclude or field_filter.field_name not in MenuRecord.__slots__:
+                return None
+            if isinstance(field_filter, filters.RangeFilter):
+                conditions = [(operator.ge, value.start), (operator.le, value.stop)]
+            elif field_filter.lookup_expr in lookups:
+                conditions = [(lookups[field_filter.lookup_expr], value)]
+            else:
+                return None
+            predicates.extend(
+                get_predicate(field_filter.field_name, compare, bound)
+                for compare, bound in conditions if bound is not None
+            )
+        return predicates
+
+
+def get_predicate(field: str, compare: Callable[[Any, Any], bool], bound: Any) -> Predicate:
+    # Like SQL, a comparison with a missing aggregate, e.g. of a menu without vegetarian dishes, fails.
+    def predicate(menu: MenuRecord) -> bool:
+        value = getattr(menu, field)
+        return value is not None and compare(value, bound)
+    return predicate
+
+
+menu_read_model = MenuReadModel()
@@ -1,8 +1,10 @@
+from typing import Dict
+
 from rest_framework import serializers
 
 from common.serializers import DynamicFieldsModelSerializer
 
-from .models import Menu, Dish
+from .models import Menu, Dish, Subscription
 
 
 class DishSerializer(DynamicFieldsModelSerializer):
@@ -10,7 +12,7 @@ class DishSerializer(DynamicFieldsModelSerializer):
         model = Dish
         fields = (
             'id', 'name', 'description', 'price', 'prepare_time', 'is_vegetarian', 'modified', 'created', 'menu',
-            'picture'
+            'picture', 'picture_variants'
         )
 
     menu = serializers.SlugRelatedField(
@@ -18,6 +20,22 @@ class DishSerializer(DynamicFieldsModelSerializer):
         slug_field='name',
         write_only=True
     )
+    picture_variants = serializers.SerializerMethodField()
+
+    def get_picture_variants(self, dish: Dish) -> Dict[str, str]:
+        urls = dish.picture_variants.urls()
+        request = self.context.get('request')
+        if request is not None:
+            return {width: request.build_absolute_uri(url) for width, url in urls.items()}
+        return urls
+
+
+class DishListSerializer(DishSerializer):
+    class Meta:
+        model = Dish
+        fields = DishSerializer.Meta.fields
+
+    menu = serializers.SlugRelatedField(slug_field='name', read_only=True)
 
 
 class MenuSerializer(serializers.ModelSerializer):
@@ -26,6 +44,18 @@ class MenuSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'description', 'modified', 'created')
 
 
+class MenuAggregatesSerializer(MenuSerializer):
+    class Meta:
+        model = Menu
+        aggregate_fields = ('dishes_count', 'min_price', 'max_price', 'vegetarian_count')
+        fields = MenuSerializer.Meta.fields + aggregate_fields
+
+    dishes_count = serializers.IntegerField(read_only=True)
+    min_price = serializers.DecimalField(max_digits=4, decimal_places=2, read_only=True)
+    max_price = serializers.DecimalField(max_digits=4, decimal_places=2, read_only=True)
+    vegetarian_count = serializers.IntegerField(read_only=True)
+
+
 class MenuDishesSerializer(MenuSerializer):
     class Meta:
         model = Menu
@@ -33,3 +63,16 @@ class MenuDishesSerializer(MenuSerializer):
         dish_fields = set(DishSerializer.Meta.fields) - {'menu'}
 
     dishes = DishSerializer(many=True, fields=Meta.dish_fields)
+
+
+class SubscriptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Subscription
+        fields = ('followed_menus', 'vegetarian_only', 'opted_out')
+
+    followed_menus = serializers.SlugRelatedField(
+        queryset=Menu.objects.all(),
+        slug_field='name',
+        many=True,
+        required=False
+    )
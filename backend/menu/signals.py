@@ -0,0 +1,69 @@
+from typing import Any
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.db import CommitBatch
+
+from .facets import DishFacets, written_dishes
+from .models import Dish, Menu
+from .tasks.build_static_menus import build_static_menus
+from .tasks.delete_menu import delete_unreferenced_pictures
+
+released_pictures = CommitBatch(lambda names: delete_unreferenced_pictures.delay(names))
+changed_menus = CommitBatch(lambda menu_ids: build_static_menus.delay(sorted(menu_ids)))
+
+
+def get_picture_name(dish: Dish) -> str:
+    # Read without the descriptor, so a dish loaded without its picture doesn't fetch it.
+    picture = dish.__dict__.get('picture')
+    return getattr(picture, 'name', picture) or ''
+
+
+@receiver(post_save, sender=Dish)
+def release_replaced_picture(instance: Dish, **kwargs: Any) -> None:
+    if 'picture' not in instance.__dict__:
+        return
+    name = get_picture_name(instance)
+    if instance.stored_picture and instance.stored_picture != name:
+        released_pictures.add(instance.stored_picture)
+    instance.stored_picture = name
+
+
+@receiver(post_delete, sender=Dish)
+def release_deleted_picture(instance: Dish, **kwargs: Any) -> None:
+    released_pictures.add(*{instance.stored_picture, get_picture_name(instance)} - {''})
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+def rebuild_menu(instance: Menu, **kwargs: Any) -> None:
+    changed_menus.add(instance.pk)
+
+
+@receiver(post_save, sender=Dish)
+@receiver(post_delete, sender=Dish)
+def rebuild_dish_menus(instance: Dish, **kwargs: Any) -> None:
+    # A moved dish changes the menu it left as well.
+    changed_menus.add(*{instance.stored_menu_id, instance.menu_id} - {None})
+    instance.stored_menu_id = instance.menu_id
+
+
+def delete_dishes(dishes: 'QuerySet[Dish]', rebuild_menus: bool = True) -> int:
+    """Delete dishes with one DELETE, without loading them or sending ``post_delete`` for each.
+
+    What the Dish receivers do per deleted dish is done once for the whole set: pictures are
+    released, facets invalidated and, unless the caller deletes the menus anyway, menus rebuilt.
+    Must run in a transaction, which locks the rows between reading them and deleting them.
+    """
+    rows = list(dishes.select_for_update().values_list('pk', 'picture', 'menu_id'))
+    if not rows:
+        return 0
+    pks, pictures, menu_ids = zip(*rows)
+    deleted: int = Dish.objects.filter(pk__in=pks)._raw_delete(dishes.db)
+    released_pictures.add(*set(pictures) - {''})
+    if rebuild_menus:
+        changed_menus.add(*set(menu_ids))
+    written_dishes.add(DishFacets.version_key)
+    return deleted
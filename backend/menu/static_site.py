@@ -0,0 +1,145 @@
+import fcntl
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.db.models import Prefetch, QuerySet
+from django.template.loader import render_to_string
+
+from common.renderers import FastJSONRenderer
+
+from .models import Menu, Dish
+from .serializers import MenuDishesSerializer, MenuSerializer
+
+Manifest = Dict[str, str]
+
+
+class StaticMenuSite:
+    """Renders the published menus, those with dishes, into ``STATIC_MENUS_ROOT`` for a CDN.
+
+    Every menu gets ``menus/<id>.json``, matching the API detail response served at
+    ``STATIC_MENUS_BASE_URL``, and ``menus/<id>.html``, listed by ``index.json`` and ``index.html``.
+    A manifest keeps the content hash of every file set, so a build only writes, and the CDN only
+    fetches, the menus whose content changed.
+    """
+    manifest_name = 'manifest.json'
+    index_key = 'index'
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root or settings.STATIC_MENUS_ROOT
+
+    def build(self, menu_ids: Optional[Iterable[int]] = None, force: bool = False) -> Dict[str, List[int]]:
+        """Rebuild the given menus, or all of them, and the index; return the menu ids by outcome."""
+        os.makedirs(os.path.join(self.root, 'menus'), exist_ok=True)
+        with self.lock():
+            manifest = {} if force else self.read_manifest()
+            published = set(Menu.objects.published().values_list('pk', flat=True))
+            built = set(int(key) for key in manifest if key != self.index_key)
+            targets = published | built if menu_ids is None else set(menu_ids)
+
+            result: Dict[str, List[int]] = {'written': [], 'unchanged': [], 'removed': []}
+            for menu_id, digest, written in self.render(sorted(targets & published), manifest):
+                manifest[str(menu_id)] = digest
+                result['written' if written else 'unchanged'].append(menu_id)
+            for menu_id in sorted((targets - published) & built):
+                self.remove_menu(menu_id)
+                del manifest[str(menu_id)]
+                result['removed'].append(menu_id)
+
+            manifest[self.index_key] = self.write_index(manifest.get(self.index_key))
+            self.write(self.manifest_name, json.dumps(manifest, indent=2, sort_keys=True).encode())
+        return result
+
+    def render(self, menu_ids: List[int], manifest: Manifest) -> List[Tuple[int, str, bool]]:
+        """Render the menus and write those which changed; return their ids, digests and whether written."""
+        # Picture URLs are absolute in the HTML as in the JSON, so both work from STATIC_MENUS_BASE_URL.
+        request = SiteRequest(settings.STATIC_MENUS_BASE_URL)
+        rendered = []
+        for menu in get_menus_queryset(menu_ids):
+            content = FastJSONRenderer().render(MenuDishesSerializer(menu, context={'request': request}).data)
+            html = render_to_string(
+                'menu/static_menu.html', {'menu': menu, 'dishes': menu.dishes.all(), 'request': request}
+            ).encode()
+            digest = get_digest(content, html)
+            json_path, html_path = get_menu_paths(menu.pk)
+            written = digest != manifest.get(str(menu.pk)) or not self.exists(json_path, html_path)
+            if written:
+                self.write(json_path, content)
+                self.write(html_path, html)
+            rendered.append((menu.pk, digest, written))
+        return rendered
+
+    def write_index(self, previous_digest: Optional[str]) -> str:
+        menus = list(Menu.objects.published().order_by('pk'))
+        content = FastJSONRenderer().render(MenuSerializer(menus, many=True).data)
+        html = render_to_string('menu/static_index.html', {'menus': menus}).encode()
+        digest = get_digest(content, html)
+        if digest != previous_digest or not self.exists('index.json', 'index.html'):
+            self.write('index.json', content)
+            self.write('index.html', html)
+        return digest
+
+    def read_manifest(self) -> Manifest:
+        try:
+            with open(os.path.join(self.root, self.manifest_name)) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def remove_menu(self, menu_id: int) -> None:
+        for name in get_menu_paths(menu_id):
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Serialize builds, e.g. of concurrent Celery tasks, which all update the manifest."""
+        with open(os.path.join(self.root, '.lock'), 'w') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def exists(self, *names: str) -> bool:
+        return all(os.path.exists(os.path.join(self.root, name)) for name in names)
+
+    def write(self, name: str, content: bytes) -> None:
+        path = os.path.join(self.root, name)
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+
+
+class SiteRequest:
+    """Stands in for the request in serializer context, so picture URLs are absolute like in the API."""
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+
+    def build_absolute_uri(self, location: str) -> str:
+        return urljoin(self.base_url, location)
+
+
+def get_menu_paths(menu_id: int) -> Tuple[str, str]:
+    return f'menus/{menu_id}.json', f'menus/{menu_id}.html'
+
+
+def get_digest(*contents: bytes) -> str:
+    digest = hashlib.sha256()
+    for content in contents:
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def get_menus_queryset(menu_ids: List[int]) -> 'QuerySet[Menu]':
+    return Menu.objects.filter(pk__in=menu_ids).order_by('pk').prefetch_related(
+        Prefetch('dishes', queryset=Dish.objects.defer('search_vector').order_by('pk'))
+    )
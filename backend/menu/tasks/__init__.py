@@ -0,0 +1,10 @@
+from .build_static_menus import build_static_menus
+from .delete_menu import delete_menu, delete_unreferenced_pictures
+from .generate_dish_picture_variants import generate_dish_picture_variants
+from .notify_about_new_and_modified_dishes import notify_about_new_and_modified_dishes, send_emails
+from .prune_tombstones import prune_tombstones
+
+__all__ = (
+    'build_static_menus', 'delete_menu', 'delete_unreferenced_pictures', 'generate_dish_picture_variants',
+    'notify_about_new_and_modified_dishes', 'prune_tombstones', 'send_emails'
+)
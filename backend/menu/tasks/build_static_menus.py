@@ -0,0 +1,16 @@
+from typing import List, Optional
+
+from celery import task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@task
+def build_static_menus(menu_ids: Optional[List[int]] = None) -> None:
+    # Imported here: the site renders through DRF serializers, which the worker otherwise never loads.
+    from menu.static_site import StaticMenuSite
+
+    result = StaticMenuSite().build(menu_ids)
+    logger.info(f'Built static menus, written: {result["written"]}, removed: {result["removed"]}, '
+                f'unchanged: {len(result["unchanged"])}')
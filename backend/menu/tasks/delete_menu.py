@@ -0,0 +1,49 @@
+from typing import List
+
+from celery import task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.db import transaction
+
+from menu.models import Menu, Dish
+
+logger = get_task_logger(__name__)
+
+
+@task
+def delete_menu(menu_id: int) -> None:
+    # Imported here: menu.signals imports this module for the tasks it queues.
+    from menu.signals import delete_dishes
+
+    batch_size = settings.MENU_DELETE_BATCH_SIZE
+    dishes = Dish.objects.filter(menu_id=menu_id).order_by('pk')
+    deleted = 0
+    while True:
+        # One transaction per batch, which releases its pictures and invalidates facets once.
+        with transaction.atomic():
+            batch_deleted = delete_dishes(dishes[:batch_size], rebuild_menus=False)
+        if not batch_deleted:
+            break
+        deleted += batch_deleted
+
+    # Its post_delete queues the rebuild of the menu's static files.
+    Menu.objects.filter(pk=menu_id).delete()
+    logger.info(f'Deleted menu {menu_id} with {deleted} dishes')
+
+
+@task
+def delete_unreferenced_pictures(names: List[str]) -> None:
+    unique_names = sorted(set(names))
+    batch_size = settings.MENU_DELETE_BATCH_SIZE
+    for i in range(0, len(unique_names), batch_size):
+        batch = unique_names[i:i + batch_size]
+        referenced = set(Dish.objects.filter(picture__in=batch).values_list('picture', flat=True))
+        for name in sorted(set(batch) - referenced):
+            # Checked again under the lock an upload of identical content takes to store the files.
+            with transaction.atomic():
+                Dish.lock_picture(name)
+                if Dish.objects.filter(picture=name).exists():
+                    continue
+                dish = Dish(picture=name, has_picture_variants=True)
+                dish.picture_variants.delete()
+                dish.picture.storage.delete(name)
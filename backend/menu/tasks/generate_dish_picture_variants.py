@@ -0,0 +1,21 @@
+from celery import task
+from celery.utils.log import get_task_logger
+
+from menu.models import Dish
+
+from .build_static_menus import build_static_menus
+
+logger = get_task_logger(__name__)
+
+
+@task
+def generate_dish_picture_variants(dish_id: int, picture_name: str) -> None:
+    dish = Dish.objects.filter(pk=dish_id, picture=picture_name).first()
+    if dish is None:
+        logger.info(f'Picture {picture_name} of dish {dish_id} was replaced or removed, skipping')
+        return
+
+    names = dish.picture_variants.generate()
+    Dish.objects.filter(pk=dish_id, picture=picture_name).update(has_picture_variants=True)
+    build_static_menus.delay([dish.menu_id])
+    logger.info(f'Generated picture variants for dish {dish_id}: {names}')
@@ -1,95 +1,220 @@
+import csv
+import gzip
+import os
+import uuid
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from itertools import chain, groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from celery import task, group
+from celery import task
+from celery.result import ResultSet
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.mail import get_connection, send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.db.models import QuerySet
 from django.template.loader import render_to_string
 from django.utils import timezone
 
+from common import tracing
+from common.db import replica_reads
 from menu.models import Dish
 
 logger = get_task_logger(__name__)
 
 
+# Followed menu ids, empty for every menu, and whether only vegetarian dishes are wanted.
+Signature = Tuple[Tuple[int, ...], bool]
+# The signature of a digest and the email it goes to.
+Recipient = Tuple[Signature, str]
+attachment_fields = (
+    'id', 'name', 'menu__name', 'price', 'prepare_time', 'is_vegetarian', 'created', 'modified'
+)
+
+
+class Digest(NamedTuple):
+    text: str
+    html: str
+    # File name and path of the CSV of all changes, for large digests.
+    attachment: Optional[Tuple[str, str]]
+
+
+def get_day_range(date: datetime) -> Tuple[datetime, datetime]:
+    """Bounds of the day of ``date``, so its rows are found with an index range scan."""
+    start = timezone.localtime(date).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=1)
+
+
 class NotifyManager:
     base_template_path = 'menu/recently_modified_mail'
 
     @classmethod
     def run(cls, chunk_size: int) -> None:
         yesterday_date = timezone.now() - timedelta(days=1)
-        modified_dishes = cls.get_modified_dishes(yesterday_date)
-        created_dishes = cls.get_created_dishes(yesterday_date)
-        logger.info(f'Menus created/modified on {yesterday_date.isoformat()}: '
-                    f'{created_dishes.count()}/{modified_dishes.count()}')
-
-        context = {
-            'created_dishes': created_dishes,
-            'modified_dishes': modified_dishes
-        }
-        template_html = render_to_string(
-            f'{cls.base_template_path}.html',
-            context
-        )
-        template_text = render_to_string(
-            f'{cls.base_template_path}.txt',
-            context
-        )
-        mails = cls.get_mails(template_text, template_html)
+        digests: Dict[Signature, Digest] = {}
+        try:
+            with replica_reads():
+                modified_dishes = cls.get_modified_dishes(yesterday_date)
+                created_dishes = cls.get_created_dishes(yesterday_date)
+                with tracing.span('notify.count_dishes') as span:
+                    created_count, modified_count = created_dishes.count(), modified_dishes.count()
+                    span.set_attributes(created_dishes=created_count, modified_dishes=modified_count)
+                logger.info(f'Menus created/modified on {yesterday_date.isoformat()}: '
+                            f'{created_count}/{modified_count}')
 
-        sent_mails, failed_mails = cls.send(mails, chunk_size)
+                chunks = cls.render_digests(
+                    cls.get_recipients(chunk_size), digests, created_dishes, modified_dishes, yesterday_date
+                )
+                _, failed = cls.send(chunks, digests)
 
-        if failed_mails:
-            logger.info('Retrying sending failed mails')
-            cls.send(failed_mails, chunk_size)
+            if failed:
+                logger.info('Retrying sending failed mails')
+                cls.send((failed[i:i + chunk_size] for i in range(0, len(failed), chunk_size)), digests, attempt=2)
+        finally:
+            for digest in digests.values():
+                if digest.attachment:
+                    os.remove(digest.attachment[1])
 
         logger.info('Finishing')
 
     @staticmethod
-    def send(mails: List[dict], chunk_size: int) -> Tuple[List[dict], List[dict]]:
-        logger.info(f'Sending mails in {chunk_size} batches')
-        chunked_tasks = group(
-            send_emails.s(mails[i:i + chunk_size])
-            for i in range(0, len(mails), chunk_size)
-        )()
-
-        sent_mails = []
-        failed_mails = []
-        for result in chunked_tasks.get():
-            sent_mails.extend(result[0])
-            failed_mails.extend(result[1])
-
-        logger.info(f'Sent/failed mails {len(sent_mails)} / {len(failed_mails)}')
-        return sent_mails, failed_mails
+    def get_recipients(chunk_size: int) -> Iterator[List[Recipient]]:
+        """Stream the emails of subscribed users with the signature of their digest preferences, in chunks."""
+        users = User.objects.exclude(email='').exclude(subscription__opted_out=True).order_by('email', 'pk')
+        rows = users.values_list('email', 'pk', 'subscription__vegetarian_only', 'subscription__followed_menus')
+
+        chunk: List[Recipient] = []
+        for email, user_rows in groupby(rows.iterator(), key=itemgetter(0)):
+            # Users sharing an email get one digest, with the preferences of the first of them.
+            _, user_id, vegetarian_only, _ = first_row = next(user_rows)
+            followed_menus = tuple(sorted(
+                menu_id for _, pk, _, menu_id in chain([first_row], user_rows) if pk == user_id and menu_id
+            ))
+            chunk.append(((followed_menus, bool(vegetarian_only)), email))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @classmethod
+    def render_digests(cls, chunks: Iterable[List[Recipient]], digests: Dict[Signature, Digest],
+                       created_dishes: 'QuerySet[Dish]', modified_dishes: 'QuerySet[Dish]',
+                       yesterday_date: datetime) -> Iterator[List[Recipient]]:
+        """Pass the chunks on once ``digests`` holds the digests of their recipients.
+
+        Every distinct digest is rendered once, however many recipients and chunks share it.
+        """
+        for chunk in chunks:
+            for signature, _ in chunk:
+                if signature not in digests:
+                    with tracing.span('notify.render_digest'):
+                        digests[signature] = cls.render_digest(
+                            signature, created_dishes, modified_dishes, yesterday_date
+                        )
+            yield chunk
+
+    @classmethod
+    def render_digest(cls, signature: Signature, created_dishes: 'QuerySet[Dish]',
+                      modified_dishes: 'QuerySet[Dish]', yesterday_date: datetime) -> Digest:
+        """Render a digest, in large-digest mode when a table has more than ``DIGEST_INLINE_DISHES``.
+
+        Large digests only inline the first dishes of every table and attach a gzipped CSV of all
+        changes, so message size and rendering time stay bounded on days with bulk imports.
+        """
+        created_dishes = cls.filter_dishes(created_dishes, signature)
+        modified_dishes = cls.filter_dishes(modified_dishes, signature)
+        limit = settings.DIGEST_INLINE_DISHES
+        context: Dict[str, Any] = {
+            'created_dishes': list(created_dishes[:limit + 1]),
+            'modified_dishes': list(modified_dishes[:limit + 1]),
+        }
+
+        attachment = None
+        if len(context['created_dishes']) > limit or len(context['modified_dishes']) > limit:
+            attachment = cls.write_attachment(created_dishes, modified_dishes, yesterday_date)
+            context.update(
+                created_dishes=context['created_dishes'][:limit],
+                modified_dishes=context['modified_dishes'][:limit],
+                created_count=created_dishes.count(),
+                modified_count=modified_dishes.count(),
+                attachment_name=attachment[0],
+            )
+        return Digest(
+            render_to_string(f'{cls.base_template_path}.txt', context),
+            render_to_string(f'{cls.base_template_path}.html', context),
+            attachment,
+        )
+
+    @staticmethod
+    def write_attachment(created_dishes: 'QuerySet[Dish]', modified_dishes: 'QuerySet[Dish]',
+                         yesterday_date: datetime) -> Tuple[str, str]:
+        """Stream all changes from the database into a gzipped CSV, return its name and path."""
+        os.makedirs(settings.DIGEST_ATTACHMENTS_ROOT, exist_ok=True)
+        name = f'dishes-{yesterday_date.date().isoformat()}.csv.gz'
+        path = os.path.join(settings.DIGEST_ATTACHMENTS_ROOT, f'{uuid.uuid4().hex}-{name}')
+        with gzip.open(path, 'wt', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('change',) + attachment_fields)
+            for change, dishes in (('created', created_dishes), ('modified', modified_dishes)):
+                for row in dishes.values_list(*attachment_fields).iterator():
+                    writer.writerow((change,) + row)
+        return name, path
+
+    @staticmethod
+    def filter_dishes(dishes: 'QuerySet[Dish]', signature: Signature) -> 'QuerySet[Dish]':
+        followed_menus, vegetarian_only = signature
+        if followed_menus:
+            dishes = dishes.filter(menu__in=followed_menus)
+        if vegetarian_only:
+            dishes = dishes.filter(is_vegetarian=True)
+        return dishes
+
+    @classmethod
+    def send(cls, chunks: Iterable[List[Recipient]], digests: Dict[Signature, Digest],
+             attempt: int = 1) -> Tuple[List[Recipient], List[Recipient]]:
+        """Dispatch a ``send_emails`` task per chunk, each digest of a chunk travels with it once."""
+        with tracing.span('notify.send', attempt=attempt) as span:
+            chunk_signatures = []
+            results = []
+            for chunk in chunks:
+                signatures = list(dict.fromkeys(signature for signature, _ in chunk))
+                indexes = {signature: index for index, signature in enumerate(signatures)}
+                chunk_signatures.append(signatures)
+                results.append(send_emails.delay(
+                    cls.get_mails(signatures, digests), [(indexes[signature], email) for signature, email in chunk]
+                ))
+
+            sent: List[Recipient] = []
+            failed: List[Recipient] = []
+            for signatures, (sent_emails, failed_emails) in zip(chunk_signatures, ResultSet(results).get()):
+                sent.extend((signatures[index], email) for index, email in sent_emails)
+                failed.extend((signatures[index], email) for index, email in failed_emails)
+            span.set_attributes(chunks=len(results), sent=len(sent), failed=len(failed))
+
+        logger.info(f'Sent/failed mails {len(sent)} / {len(failed)}')
+        return sent, failed
 
     @staticmethod
-    def get_mails(template_text: str, template_html: str) -> List[dict]:
+    def get_mails(signatures: List[Signature], digests: Dict[Signature, Digest]) -> List[dict]:
         return [{
             'subject': 'Recently modified and created dishes',
             'from_email': settings.DEFAULT_FROM_EMAIL,
-            'message': template_text,
-            'html_message': template_html,
-            'recipient_list': [user_mail]
-        } for user_mail in User.objects.values_list('email', flat=True).distinct()]
+            'message': digests[signature].text,
+            'html_message': digests[signature].html,
+            'attachment': digests[signature].attachment,
+        } for signature in signatures]
 
     @staticmethod
     def get_modified_dishes(yesterday_date: datetime) -> 'QuerySet[Dish]':
-        return Dish.objects.filter(
-            modified__year=yesterday_date.year,
-            modified__month=yesterday_date.month,
-            modified__day=yesterday_date.day
-        ).select_related('menu')
+        start, end = get_day_range(yesterday_date)
+        return Dish.objects.filter(modified__gte=start, modified__lt=end).select_related('menu').order_by('pk')
 
     @staticmethod
     def get_created_dishes(yesterday_date: datetime) -> 'QuerySet[Dish]':
-        return Dish.objects.filter(
-            created__year=yesterday_date.year,
-            created__month=yesterday_date.month,
-            created__day=yesterday_date.day
-        ).select_related('menu')
+        start, end = get_day_range(yesterday_date)
+        return Dish.objects.filter(created__gte=start, created__lt=end).select_related('menu').order_by('pk')
 
 
 @task
@@ -98,16 +223,40 @@ def notify_about_new_and_modified_dishes(chunk_size: int = 10) -> None:
 
 
 @task
-def send_emails(emails: List[dict]) -> Tuple[List[dict], List[dict]]:
-    failed_mails = []
-    sent_mails = []
+def send_emails(mails: List[dict],
+                recipients: List[Tuple[int, str]]) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """Send every recipient, given with the index of their digest in ``mails``, their own message."""
+    failed_emails = []
+    sent_emails = []
+    task_span = tracing.get_current_span()
+    if task_span is not None:
+        task_span.set_attributes(chunk_size=len(recipients))
+    # Digests in a chunk mostly share their attachment, read it once.
+    attachments: Dict[str, bytes] = {}
     connection = get_connection()
-    connection.open()
-    for mail in emails:
-        result = send_mail(**mail, connection=connection, fail_silently=True)
+    with tracing.span('smtp.connect'):
+        connection.open()
+    for index, email in recipients:
+        with tracing.span('smtp.send') as span:
+            result = send_digest(mails[index], email, connection, attachments)
+            span.set_attributes(sent=result == 1)
         if result == 1:
-            sent_mails.append(mail)
+            sent_emails.append((index, email))
         else:
-            failed_mails.append(mail)
+            failed_emails.append((index, email))
     connection.close()
-    return sent_mails, failed_mails
+    return sent_emails, failed_emails
+
+
+def send_digest(mail: dict, email: str, connection: Any, attachments: Dict[str, bytes]) -> int:
+    message = EmailMultiAlternatives(
+        mail['subject'], mail['message'], mail['from_email'], [email], connection=connection
+    )
+    message.attach_alternative(mail['html_message'], 'text/html')
+    if mail.get('attachment'):
+        name, path = mail['attachment']
+        if path not in attachments:
+            with open(path, 'rb') as file:
+                attachments[path] = file.read()
+        message.attach(name, attachments[path], 'application/gzip')
+    return message.send(fail_silently=True)
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from celery import task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.utils import timezone
+
+from menu.models import Tombstone
+
+logger = get_task_logger(__name__)
+
+
+@task
+def prune_tombstones() -> None:
+    deleted_before = timezone.now() - timedelta(seconds=settings.MENU_TOMBSTONE_RETENTION)
+    count, _ = Tombstone.objects.filter(deleted__lt=deleted_before).delete()
+    logger.info(f'Pruned {count} tombstones')
@@ -0,0 +1,12 @@
+from typing import Any, Dict
+
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def absolute_url(context: Dict[str, Any], url: str) -> str:
+    """Make ``url`` absolute with the request in the context; without one, e.g. in emails, keep it."""
+    request = context.get('request')
+    return request.build_absolute_uri(url) if request is not None and url else url
@@ -0,0 +1,142 @@
+import shutil
+import tempfile
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.contrib.auth.models import Permission, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from common.admin import EstimatedCountPaginator
+from menu.models import Dish, Menu
+from menu.tests.factories import MenuFactory, DishFactory
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DishAdminTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@test.pl', 'password'))
+
+    def get_changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:menu_dish_changelist'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_should_list_dishes_with_constant_number_of_queries(self):
+        DishFactory.create_batch(2)
+        _, expected_queries = self.get_changelist_queries()
+        DishFactory.create_batch(10)
+
+        response, queries = self.get_changelist_queries()
+
+        self.assertEqual(queries, expected_queries)
+        self.assertEqual(response.context['cl'].result_count, 12)
+
+    def test_should_search_dish_names_and_descriptions(self):
+        dish = DishFactory(name='Tomato soup')
+        DishFactory(name='Pancakes', description='With jam')
+
+        response, _ = self.get_changelist_queries(q='tomat')
+
+        self.assertEqual(list(response.context['cl'].result_list), [dish])
+
+    def test_should_select_menu_with_autocomplete(self):
+        menu = MenuFactory(name='Summer')
+        MenuFactory(name='Winter')
+
+        response = self.client.get(reverse('admin:menu_dish_add'))
+        autocomplete = self.client.get(reverse('admin:menu_menu_autocomplete'), {'term': 'sum'})
+
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'Winter')
+        self.assertEqual([result['id'] for result in autocomplete.json()['results']], [str(menu.pk)])
+
+    @patch('django.db.transaction.on_commit', lambda callback: callback())
+    @patch('menu.signals.build_static_menus')
+    @patch('menu.admin.generate_dish_picture_variants')
+    def test_should_save_picture_like_picture_endpoint(self, generate_dish_picture_variants, build_static_menus):
+        dish = DishFactory(has_picture_variants=True)
+        with open('menu/tests/mocks/picture.jpeg', 'rb') as picture:
+            upload = SimpleUploadedFile('picture.jpeg', picture.read(), 'image/jpeg')
+
+        response = self.client.post(reverse('admin:menu_dish_change', args=[dish.pk]), {
+            'name': dish.name, 'description': dish.description, 'price': dish.price,
+            'prepare_time': '00:15:00', 'is_vegetarian': dish.is_vegetarian, 'menu': dish.menu_id,
+            'picture': upload,
+        })
+
+        self.assertEqual(response.status_code, 302)
+        dish.refresh_from_db()
+        self.assertTrue(dish.picture.name.endswith('.jpeg'))
+        self.assertFalse(dish.has_picture_variants)
+        generate_dish_picture_variants.delay.assert_called_once_with(dish.pk, dish.picture.name)
+        build_static_menus.delay.assert_called_with([dish.menu_id])
+
+
+class MenuAdminTestCase(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@test.pl', 'password'))
+
+    def test_should_not_cascade_delete_in_request(self):
+        menu = DishFactory().menu
+
+        response = self.client.get(reverse('admin:menu_menu_delete', args=[menu.pk]))
+
+        self.assertEqual(response.status_code, 403)
+
+    @patch('menu.admin.delete_menu')
+    def test_should_queue_deletion_of_selected_menus(self, delete_menu):
+        menus = MenuFactory.create_batch(2)
+
+        response = self.client.post(reverse('admin:menu_menu_changelist'), {
+            'action': 'delete_in_background', '_selected_action': [menu.pk for menu in menus],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(sorted(call.args[0] for call in delete_menu.delay.call_args_list),
+                         sorted(menu.pk for menu in menus))
+        self.assertEqual(Menu.objects.count(), 2)
+
+    def test_should_not_offer_deletion_without_delete_permission(self):
+        user = User.objects.create_user('editor', password='password', is_staff=True)
+        user.user_permissions.add(*Permission.objects.filter(codename__in=['view_menu', 'change_menu']))
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('admin:menu_menu_changelist'))
+
+        self.assertNotContains(response, 'delete_in_background')
+
+
+class EstimatedCountPaginatorTestCase(TestCase):
+    def test_should_count_exactly_below_limit(self):
+        DishFactory.create_batch(3)
+
+        paginator = EstimatedCountPaginator(Dish.objects.order_by('pk'), 2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
+
+    @skipIf(connection.vendor != 'postgresql', 'uses the PostgreSQL planner estimate')
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=0)
+    def test_should_estimate_count_above_limit(self):
+        DishFactory.create_batch(3)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE menu_dish')
+
+        with CaptureQueriesContext(connection) as queries:
+            count = EstimatedCountPaginator(Dish.objects.filter(price__gte=0).order_by('pk'), 2).count
+
+        self.assertGreater(count, 0)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('EXPLAIN'))
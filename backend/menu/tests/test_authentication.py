@@ -0,0 +1,115 @@
+from base64 import b64encode
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.tests import TestUtilsMixin
+from menu.tests.factories import MenuFactory
+
+User = get_user_model()
+
+
+class TestCaseCachedAuthentication(TestUtilsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_should_resolve_user_and_permissions_from_cache(self):
+        self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        path = reverse('menu-manage-detail', args=[menu.id])
+        self.client.patch(path, {'description': 'first'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(path, {'description': 'second'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries.captured_queries if 'auth_' in query['sql']])
+
+    def test_should_deny_after_group_membership_removed(self):
+        user = self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        path = reverse('menu-manage-detail', args=[menu.id])
+        self.assertEqual(self.client.patch(path, {'description': 'first'}).status_code, status.HTTP_200_OK)
+
+        user.groups.clear()
+        response = self.client.patch(path, {'description': 'second'})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_should_cache_basic_credentials(self):
+        user = self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        path = reverse('menu-manage-detail', args=[menu.id])
+        self.client.credentials(HTTP_AUTHORIZATION=self.basic_header(user.username, 'test'))
+        self.client.patch(path, {'description': 'first'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(path, {'description': 'second'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries.captured_queries if 'auth_' in query['sql']])
+
+    def test_should_reject_wrong_basic_password_after_cached_login(self):
+        user = self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        path = reverse('menu-manage-detail', args=[menu.id])
+        self.client.credentials(HTTP_AUTHORIZATION=self.basic_header(user.username, 'test'))
+        self.client.patch(path, {'description': 'first'})
+
+        self.client.credentials(HTTP_AUTHORIZATION=self.basic_header(user.username, 'wrong'))
+        response = self.client.patch(path, {'description': 'second'})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_should_reject_old_basic_password_after_password_change(self):
+        user = self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        path = reverse('menu-manage-detail', args=[menu.id])
+        self.client.credentials(HTTP_AUTHORIZATION=self.basic_header(user.username, 'test'))
+        self.client.patch(path, {'description': 'first'})
+
+        user.set_password('changed')
+        user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=self.basic_header(user.username, 'changed'))
+        self.assertEqual(self.client.patch(path, {'description': 'second'}).status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=self.basic_header(user.username, 'test'))
+        response = self.client.patch(path, {'description': 'third'})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_should_keep_cached_users_on_login_and_changes_of_others(self):
+        user = self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        path = reverse('menu-manage-detail', args=[menu.id])
+        self.client.patch(path, {'description': 'first'})
+
+        update_last_login(None, user)
+        other = User.objects.create_user('other', password='other')
+        other.groups.add(Group.objects.get())
+        other.save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(path, {'description': 'second'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries.captured_queries if 'auth_' in query['sql']])
+
+    def test_should_deny_users_removed_from_group(self):
+        user = self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        path = reverse('menu-manage-detail', args=[menu.id])
+        self.assertEqual(self.client.patch(path, {'description': 'first'}).status_code, status.HTTP_200_OK)
+
+        Group.objects.get().user_set.remove(user)
+        response = self.client.patch(path, {'description': 'second'})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @staticmethod
+    def basic_header(username, password):
+        return 'Basic ' + b64encode(f'{username}:{password}'.encode()).decode()
@@ -0,0 +1,86 @@
+import gzip
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common import compression
+from common.compression import Compressor
+from common.tests import TestUtilsMixin
+from .factories import MenuFactory, DishFactory
+
+
+class TestCaseCompression(TestUtilsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.menu = MenuFactory()
+        self.dishes = DishFactory.create_batch(20, menu=self.menu)
+        self.path = reverse('menu-detail', args=[self.menu.id])
+
+    def test_should_gzip_large_responses(self):
+        plain = self.client.get(self.path)
+
+        response = self.client.get(self.path, HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    @skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_should_prefer_brotli(self):
+        plain = self.client.get(self.path)
+
+        response = self.client.get(self.path, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+
+    def test_should_compress_menu_once_per_change(self):
+        with patch.object(Compressor, 'compress', wraps=Compressor.compress) as compress:
+            self.client.get(self.path, HTTP_ACCEPT_ENCODING='gzip')
+            self.client.get(self.path, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compress.call_count, 1)
+
+            self.dishes[0].name = 'changed'
+            self.dishes[0].save()
+            response = self.client.get(self.path, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(compress.call_count, 2)
+        self.assertIn(b'changed', gzip.decompress(response.content))
+
+    def test_should_compress_other_responses_per_request(self):
+        with patch.object(Compressor, 'compress', wraps=Compressor.compress) as compress:
+            self.client.get(reverse('dish-list'), HTTP_ACCEPT_ENCODING='gzip')
+            response = self.client.get(reverse('dish-list'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(compress.call_count, 2)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    @override_settings(COMPRESSION_MIN_SIZE=1024 * 1024)
+    def test_should_not_compress_responses_below_threshold(self):
+        response = self.client.get(self.path, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json()['id'], self.menu.id)
+
+    def test_should_not_compress_without_accept_encoding(self):
+        response = self.client.get(self.path)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_should_not_compress_encodings_refused_with_zero_quality(self):
+        response = self.client.get(self.path, HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0, *;q=0.5, identity')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_should_choose_encoding_by_quality(self):
+        request = RequestFactory().get(self.path, HTTP_ACCEPT_ENCODING='br;q=0.2, GZIP;q=0.8')
+
+        self.assertEqual(Compressor.get_encoding(request), 'gzip')
+        self.assertEqual(Compressor.get_encoding(request, ['br']), 'br')
+        self.assertIsNone(Compressor.get_encoding(RequestFactory().get(self.path, HTTP_ACCEPT_ENCODING='br;q=x')))
@@ -1,18 +1,36 @@
+import shutil
+import tempfile
+from importlib import import_module
 from io import BytesIO
+from unittest.mock import patch
 
+from django.apps import apps
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
 
+from common.storage import ContentAddressedStorage
 from common.tests import TestUtilsMixin
 from menu.models import Dish
+from menu.tasks import delete_unreferenced_pictures
 from menu.tests.factories import MenuFactory, DishFactory
 
+MEDIA_ROOT = tempfile.mkdtemp()
 
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class TestCaseDishManageViewSet(TestUtilsMixin, APITestCase):
     picture_path = 'menu/tests/mocks/picture.jpeg'
 
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
     def test_should_create_dish(self):
         self.authenticate_and_add_modify_permissions()
         menu = MenuFactory()
@@ -129,6 +147,7 @@ class TestCaseDishManageViewSet(TestUtilsMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         dish.refresh_from_db()
         self.assertEqual(dish.picture.read(), open(self.picture_path, 'rb').read())
+        self.assertFalse(dish.has_picture_variants)
 
     def test_should_raise_if_wrong_picture_format(self):
         self.authenticate_and_add_modify_permissions()
@@ -159,6 +178,57 @@ class TestCaseDishManageViewSet(TestUtilsMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         dish.refresh_from_db()
         self.assertFalse(dish.picture)
+        self.assertFalse(dish.has_picture_variants)
+
+    def test_should_store_identical_pictures_once(self):
+        self.authenticate_and_add_modify_permissions()
+        dishes = DishFactory.create_batch(2)
+
+        for dish in dishes:
+            path = reverse('dish-manage-picture', args=[dish.id])
+            response = self.client.put(path, {'picture': File(open(self.picture_path, 'rb'))})
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        names = {dish.picture.name for dish in Dish.objects.filter(pk__in=[dish.id for dish in dishes])}
+        self.assertEqual(len(names), 1)
+        self.assertTrue(ContentAddressedStorage.is_content_addressed(names.pop()))
+
+    @patch('django.db.transaction.on_commit', lambda callback: callback())
+    @patch('menu.signals.build_static_menus')
+    @patch.object(delete_unreferenced_pictures, 'delay', delete_unreferenced_pictures)
+    def test_should_keep_picture_shared_with_other_dish_on_remove(self, build_static_menus):
+        self.authenticate_and_add_modify_permissions()
+        dish, other_dish = DishFactory.create_batch(2)
+        for instance in (dish, other_dish):
+            instance.picture = File(open(self.picture_path, 'rb'))
+            instance.save()
+        path = reverse('dish-manage-picture', args=[dish.id])
+
+        response = self.client.delete(path)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        other_dish.refresh_from_db()
+        self.assertTrue(other_dish.picture.storage.exists(other_dish.picture.name))
+
+        other_dish.release_picture()
+        self.assertFalse(Dish.picture.field.storage.exists(dish.picture.name))
+
+    @patch('django.db.transaction.on_commit', lambda callback: callback())
+    @patch('menu.signals.build_static_menus')
+    @patch.object(delete_unreferenced_pictures, 'delay')
+    def test_should_release_picture_of_deleted_dish_after_commit(self, delay, build_static_menus):
+        self.authenticate_and_add_modify_permissions()
+        dish = DishFactory()
+        dish.picture = File(open(self.picture_path, 'rb'))
+        dish.save()
+        name = dish.picture.name
+
+        response = self.client.delete(reverse('dish-manage-detail', args=[dish.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        delay.assert_called_once_with([name])
+        delete_unreferenced_pictures([name])
+        self.assertFalse(Dish.picture.field.storage.exists(name))
 
     def test_should_raise_if_not_authenticated(self):
         self.authenticate_user()
@@ -171,3 +241,33 @@ class TestCaseDishManageViewSet(TestUtilsMixin, APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(response.json(), {'detail': 'You do not have permission to perform this action.'})
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RehashLegacyPicturesTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_should_move_legacy_picture_and_variants_to_content_addressed_names(self):
+        storage = Dish.picture.field.storage
+        with open('menu/tests/mocks/picture.jpeg', 'rb') as picture:
+            content = picture.read()
+        legacy_name = 'legacy-picture.jpeg'
+        FileSystemStorage(location=storage.location).save(legacy_name, ContentFile(content))
+        FileSystemStorage(location=storage.location).save('legacy-picture.150w.webp', ContentFile(b'variant'))
+        dishes = DishFactory.create_batch(2, picture=legacy_name, has_picture_variants=True)
+
+        import_module('menu.migrations.0010_rehash_legacy_pictures').rehash_legacy_pictures(apps, None)
+
+        names = set(Dish.objects.filter(pk__in=[dish.pk for dish in dishes]).values_list('picture', flat=True))
+        self.assertEqual(len(names), 1)
+        dish = Dish.objects.get(pk=dishes[0].pk)
+        self.assertTrue(ContentAddressedStorage.is_content_addressed(dish.picture.name))
+        self.assertEqual(dish.picture.read(), content)
+        self.assertTrue(storage.exists(dish.picture_variants.name(150)))
+        self.assertFalse(storage.exists(legacy_name))
+        self.assertFalse(storage.exists('legacy-picture.150w.webp'))
+        dish.picture_variants.delete()
+        storage.delete(dish.picture.name)
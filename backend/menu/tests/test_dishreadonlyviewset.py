@@ -0,0 +1,176 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.tests import TestUtilsMixin
+from menu.facets import DishFacets, written_dishes
+from menu.models import Dish
+from menu.tests.factories import MenuFactory, DishFactory
+
+
+class TestCaseDishReadOnlyViewSet(TestUtilsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_should_list_dishes_with_menu_name(self):
+        dishes = DishFactory.create_batch(3)
+
+        path = reverse('dish-list')
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()['next'])
+        results = response.json()['results']
+        self.assertListEqual([dish['id'] for dish in results], [dish.id for dish in dishes])
+        self.assertEqual(results[0]['menu'], dishes[0].menu.name)
+
+    def test_should_filter_dishes(self):
+        menu = MenuFactory()
+        dish = DishFactory(menu=menu, price=Decimal('15.00'), is_vegetarian=True, prepare_time=timedelta(minutes=10))
+        DishFactory(menu=menu, price=Decimal('15.00'), is_vegetarian=True, prepare_time=timedelta(minutes=50))
+        DishFactory(menu=menu, price=Decimal('15.00'), is_vegetarian=False, prepare_time=timedelta(minutes=10))
+        DishFactory(menu=menu, price=Decimal('45.00'), is_vegetarian=True, prepare_time=timedelta(minutes=10))
+        DishFactory(price=Decimal('15.00'), is_vegetarian=True, prepare_time=timedelta(minutes=10))
+
+        path = reverse('dish-list')
+        response = self.client.get(path, data={
+            'price_min': '10', 'price_max': '20', 'is_vegetarian': 'true', 'prepare_time_max': '00:30:00',
+            'menu': menu.id
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual([result['id'] for result in response.json()['results']], [dish.id])
+
+    def test_should_paginate_by_price_with_keyset_cursor(self):
+        prices = ['5.00', '9.99', '9.99', '9.99', '12.50', '1.00', '30.00']
+        dishes = [DishFactory(price=Decimal(price)) for price in prices]
+        expected = [dish.id for dish in sorted(dishes, key=lambda dish: (dish.price, dish.id))]
+
+        path = reverse('dish-list')
+        received = []
+        response = self.client.get(path, data={'ordering': 'price', 'page_size': 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            received.extend(result['id'] for result in response.json()['results'])
+            if not response.json()['next']:
+                break
+            response = self.client.get(response.json()['next'])
+
+        self.assertListEqual(received, expected)
+
+    def test_should_paginate_by_prepare_time_descending(self):
+        dishes = [DishFactory(prepare_time=timedelta(minutes=minutes)) for minutes in (30, 10, 30, 45, 5)]
+        expected = [dish.id for dish in sorted(dishes, key=lambda dish: (dish.prepare_time, dish.id), reverse=True)]
+
+        path = reverse('dish-list')
+        first_page = self.client.get(path, data={'ordering': '-prepare_time', 'page_size': 3}).json()
+        second_page = self.client.get(first_page['next']).json()
+
+        self.assertListEqual(
+            [result['id'] for result in first_page['results'] + second_page['results']],
+            expected
+        )
+        self.assertIsNone(second_page['next'])
+
+    def test_should_raise_if_ordering_not_allowed(self):
+        path = reverse('dish-list')
+
+        response = self.client.get(path, data={'ordering': 'name'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'ordering': ['Select one of: price, prepare_time.']})
+
+    def test_should_raise_if_cursor_invalid(self):
+        path = reverse('dish-list')
+
+        response = self.client.get(path, data={'ordering': 'price', 'cursor': 'broken'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_should_count_facets(self):
+        DishFactory(price=Decimal('5.00'), is_vegetarian=True, prepare_time=timedelta(minutes=10))
+        DishFactory(price=Decimal('15.00'), is_vegetarian=False, prepare_time=timedelta(minutes=15))
+        DishFactory(price=Decimal('19.99'), is_vegetarian=True, prepare_time=timedelta(minutes=45))
+        DishFactory(price=Decimal('75.00'), is_vegetarian=False, prepare_time=timedelta(minutes=90))
+
+        path = reverse('dish-facets')
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertDictEqual(response.json(), {
+            'count': 4,
+            'is_vegetarian': {'true': 2, 'false': 2},
+            'price': [
+                {'from': None, 'to': '10.00', 'count': 1},
+                {'from': '10.00', 'to': '20.00', 'count': 2},
+                {'from': '20.00', 'to': '30.00', 'count': 0},
+                {'from': '30.00', 'to': '50.00', 'count': 0},
+                {'from': '50.00', 'to': None, 'count': 1},
+            ],
+            'prepare_time': [
+                {'from': None, 'to': '00:15:00', 'count': 1},
+                {'from': '00:15:00', 'to': '00:30:00', 'count': 1},
+                {'from': '00:30:00', 'to': '01:00:00', 'count': 1},
+                {'from': '01:00:00', 'to': None, 'count': 1},
+            ],
+        })
+
+    def test_should_count_facets_of_filtered_dishes(self):
+        menu = MenuFactory()
+        DishFactory(menu=menu, is_vegetarian=True)
+        DishFactory(menu=menu, is_vegetarian=False)
+        DishFactory(is_vegetarian=True)
+
+        path = reverse('dish-facets')
+        response = self.client.get(path, data={'menu': menu.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(response.json()['is_vegetarian'], {'true': 1, 'false': 1})
+
+    @patch('django.db.transaction.on_commit', lambda callback: callback())
+    @patch('menu.signals.build_static_menus')
+    def test_should_cache_facets_until_dish_is_written(self, build_static_menus):
+        DishFactory(is_vegetarian=True)
+        path = reverse('dish-facets')
+        self.client.get(path)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(path)
+        self.assertEqual(response.json()['count'], 1)
+
+        DishFactory(is_vegetarian=False)
+        response = self.client.get(path)
+        self.assertEqual(response.json()['count'], 2)
+
+    @patch('django.db.transaction.on_commit', lambda callback: callback())
+    @patch('menu.signals.build_static_menus')
+    def test_should_invalidate_facets_on_dish_delete(self, build_static_menus):
+        self.authenticate_and_add_modify_permissions()
+        dish = DishFactory()
+        path = reverse('dish-facets')
+        self.client.get(path)
+
+        self.client.delete(reverse('dish-manage-detail', args=[dish.id]))
+
+        response = self.client.get(path)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_should_invalidate_facets_once_per_transaction(self):
+        DishFactory.create_batch(3)
+        path = reverse('dish-facets')
+        self.client.get(path)
+
+        with patch.object(DishFacets, 'invalidate') as invalidate:
+            with transaction.atomic():
+                Dish.objects.all().delete()
+            invalidate.assert_not_called()
+            written_dishes.flush()
+
+        invalidate.assert_called_once_with()
@@ -0,0 +1,54 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.tests import TestUtilsMixin
+from menu.tests.factories import DishFactory
+
+
+class TestCaseDishSearchViewSet(TestUtilsMixin, APITestCase):
+    def test_should_find_dishes_by_name_and_description_prefix(self):
+        by_description = DishFactory(name='Soup', description='Creamy tomato soup')
+        by_name = DishFactory(name='Tomato salad', description='Fresh')
+        DishFactory(name='Pasta', description='Carbonara')
+
+        path = reverse('dish-search-list')
+        response = self.client.get(path, data={'q': 'tomat'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertListEqual(
+            [dish['id'] for dish in response.json()['results']],
+            [by_name.id, by_description.id]
+        )
+
+    def test_should_require_all_words(self):
+        dish = DishFactory(name='Tomato soup', description='Creamy')
+        DishFactory(name='Tomato salad', description='Fresh')
+
+        path = reverse('dish-search-list')
+        response = self.client.get(path, data={'q': 'tomato creamy'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual([result['id'] for result in response.json()['results']], [dish.id])
+
+    def test_should_combine_search_with_price_and_vegetarian_filters(self):
+        dish = DishFactory(name='Tomato soup', price='12.00', is_vegetarian=True)
+        DishFactory(name='Tomato steak', price='12.00', is_vegetarian=False)
+        DishFactory(name='Tomato salad', price='30.00', is_vegetarian=True)
+
+        path = reverse('dish-search-list')
+        response = self.client.get(path, data={'q': 'tomato', 'price_max': '20', 'is_vegetarian': 'true'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()['results']
+        self.assertListEqual([result['id'] for result in results], [dish.id])
+        self.assertEqual(results[0]['menu'], dish.menu.name)
+
+    def test_should_raise_if_query_missing(self):
+        path = reverse('dish-search-list')
+
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'q': ['This field is required.']})
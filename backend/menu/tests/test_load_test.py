@@ -0,0 +1,114 @@
+import asyncio
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+
+from common.loadtest import HttpConnection, LoadTest, Request, Response, get_percentile, read_log
+from menu.management.commands.load_initial_data import Command as LoadInitialDataCommand
+from menu.models import Menu, Dish
+from menu.tasks.build_static_menus import build_static_menus
+from menu.tasks.delete_menu import delete_unreferenced_pictures
+from menu.tasks.generate_dish_picture_variants import generate_dish_picture_variants
+from menu.tests.factories import DishFactory
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    THROTTLE_RATES={'default': {'client': '10000/s', 'overall': '10000/s'}},
+)
+class LoadTestCommandTestCase(LiveServerTestCase):
+    def setUp(self):
+        for task in (build_static_menus, generate_dish_picture_variants, delete_unreferenced_pictures):
+            patcher = patch.object(task, 'delay')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        DishFactory.create_batch(3)
+        user = User.objects.create_user(username='editor', password='editor')
+        user.groups.add(LoadInitialDataCommand.create_editors_group())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_should_report_latencies_of_mixed_traffic(self):
+        out = StringIO()
+
+        call_command(
+            'load_test', self.live_server_url, '--duration=1', '--concurrency=2', '--write-ratio=0.5',
+            '--username=editor', '--password=editor', '--seed=1', stdout=out
+        )
+
+        report = out.getvalue()
+        for label in ('GET /api/menu/{id}/', 'POST /api/token/', 'PATCH /api/manage/menu/{id}/',
+                      'PUT /api/manage/menu/dish/{id}/picture/', 'total'):
+            self.assertIn(label, report)
+        self.assertRegex(report, r'total +\d+ +[\d.]+/s +p50 +[\d.]+ ms +p90 +[\d.]+ ms +p99 +[\d.]+ ms')
+        self.assertNotRegex(report, r'\b(4\d\d|5\d\d|failed):')
+        # The menus and dish the run created are deleted again.
+        self.assertEqual(Menu.objects.count(), 3)
+        self.assertEqual(Dish.objects.count(), 3)
+
+    def test_should_replay_log(self):
+        menu_id = Dish.objects.first().menu_id
+        with tempfile.NamedTemporaryFile('w', suffix='.log') as log:
+            log.write(
+                f'10.0.0.1 - - [19/Oct/2026:12:00:00 +0000] "GET /api/menu/ HTTP/1.1" 200 512 "-" "curl"\n'
+                f'10.0.0.1 - - [19/Oct/2026:12:00:01 +0000] "GET /api/menu/{menu_id}/ HTTP/1.1" 200 512 "-" "curl"\n'
+                f'10.0.0.1 - - [19/Oct/2026:12:00:01 +0000] "POST /api/token/ HTTP/1.1" 200 512 "-" "curl"\n'
+            )
+            log.flush()
+            out = StringIO()
+
+            call_command('load_test', self.live_server_url, f'--log={log.name}', '--speed=10', stdout=out)
+
+        self.assertIn('2 requests in', out.getvalue())
+        self.assertRegex(out.getvalue(), r'GET /api/menu/\{id\}/ +1 .* 200:1')
+
+    def test_should_require_credentials_for_writes(self):
+        with self.assertRaisesMessage(CommandError, 'Writes need --username'):
+            call_command('load_test', self.live_server_url, '--write-ratio=0.1')
+
+
+class ReadLogTestCase(SimpleTestCase):
+    def test_should_time_requests_by_offset_and_skip_writes(self):
+        lines = [
+            '10.0.0.1 - - [19/Oct/2026:12:00:00 +0000] "GET /api/menu/?ordering=name HTTP/1.1" 200 5 "-" "-"',
+            'not a log line',
+            '10.0.0.2 - - [19/Oct/2026:12:00:02 +0000] "PATCH /api/manage/menu/7/ HTTP/1.1" 200 5 "-" "-"',
+            '10.0.0.2 - - [19/Oct/2026:12:00:03 +0000] "HEAD /api/menu/7/ HTTP/1.1" 200 0 "-" "-"',
+        ]
+
+        requests = list(read_log(lines))
+
+        self.assertEqual(
+            [(request.label, request.path, request.offset) for request in requests],
+            [('GET /api/menu/', '/api/menu/?ordering=name', 0.0), ('HEAD /api/menu/{id}/', '/api/menu/7/', 3.0)]
+        )
+
+    def test_should_time_replayed_requests_from_when_they_were_due(self):
+        async def request(connection, request):
+            await asyncio.sleep(0.1)
+            return Response(200, {}, b'')
+
+        load_test = LoadTest('http://localhost', concurrency=1)
+        with patch.object(HttpConnection, 'request', request):
+            asyncio.run(load_test.replay([Request('GET /', 'GET', '/', offset=0.0)] * 3))
+
+        latencies = [latency for latency, _ in load_test.results['GET /']]
+        # Requests waiting behind a slow one include the wait, as a user would have seen it.
+        self.assertGreaterEqual(latencies[2], 0.29)
+
+    def test_should_pick_percentiles_by_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+
+        self.assertEqual([get_percentile(values, p) for p in (50, 90, 99)], [50.0, 90.0, 99.0])
+        self.assertEqual(get_percentile([], 50), 0.0)
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE_HEADER=None)
+class MediaViewTestCase(TestCase):
+    content = bytes(range(256)) * 4
+    immutable_name = f'ab/{"ab" * 32}.jpeg'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('picture.jpeg', cls.immutable_name):
+            os.makedirs(os.path.dirname(os.path.join(MEDIA_ROOT, name)), exist_ok=True)
+            with open(os.path.join(MEDIA_ROOT, name), 'wb') as file:
+                file.write(cls.content)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_should_serve_file_with_validators(self):
+        response = self.client.get(reverse('media', args=['picture.jpeg']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Cache-Control'], f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+    def test_should_cache_content_addressed_file_forever(self):
+        response = self.client.get(reverse('media', args=[self.immutable_name]))
+
+        self.assertEqual(
+            response['Cache-Control'],
+            f'public, max-age={settings.MEDIA_IMMUTABLE_CACHE_MAX_AGE}, immutable'
+        )
+
+    def test_should_return_not_modified_for_matching_etag(self):
+        path = reverse('media', args=['picture.jpeg'])
+        etag = self.client.get(path)['ETag']
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_should_serve_byte_range(self):
+        response = self.client.get(reverse('media', args=['picture.jpeg']), HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+
+    def test_should_serve_suffix_byte_range(self):
+        response = self.client.get(reverse('media', args=['picture.jpeg']), HTTP_RANGE='bytes=-100')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[-100:])
+
+    def test_should_serve_whole_file_if_range_is_stale(self):
+        response = self.client.get(
+            reverse('media', args=['picture.jpeg']), HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_should_raise_if_range_not_satisfiable(self):
+        response = self.client.get(reverse('media', args=['picture.jpeg']), HTTP_RANGE='bytes=5000-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_should_raise_if_path_outside_media_root(self):
+        response = self.client.get(reverse('media', args=['../../settings.py']))
+
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+    def test_should_offload_to_front_server(self):
+        response = self.client.get(reverse('media', args=['picture.jpeg']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'{settings.MEDIA_ACCEL_REDIRECT_LOCATION}picture.jpeg')
+        self.assertEqual(response.content, b'')
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from unittest.mock import patch
 
+from django.test import override_settings
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
@@ -100,6 +101,22 @@ class TestCaseMenuManageViewSet(TestUtilsMixin, APITestCase):
         self.assertEqual(Menu.objects.count(), 0)
         self.assertEqual(Dish.objects.count(), 0)
 
+    @override_settings(MENU_ASYNC_DELETE_THRESHOLD=2)
+    def test_should_queue_deletion_of_large_menu(self):
+        self.authenticate_and_add_modify_permissions()
+        menu = MenuFactory()
+        DishFactory.create_batch(3, menu=menu)
+        path = reverse('menu-manage-detail', args=[menu.id])
+
+        with patch('menu.viewsets.delete_menu.delay') as delete_menu:
+            delete_menu.return_value.id = 'job-id'
+            response = self.client.delete(path)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json(), {'job_id': 'job-id'})
+        delete_menu.assert_called_once_with(menu.id)
+        self.assertEqual(Dish.objects.count(), 3)
+
     def test_should_raise_if_not_authorized(self):
         self.authenticate_user()
         payload = {
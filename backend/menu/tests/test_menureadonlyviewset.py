@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
+from decimal import Decimal
 
+from django.test import override_settings
 from django.utils.duration import duration_string
 from rest_framework import status
 from rest_framework.reverse import reverse
@@ -158,6 +160,94 @@ class TestCaseMenuReadOnlyViewSet(TestUtilsMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.json(), {'created': ['Enter a valid date/time.']})
 
+    def test_should_list_menus_with_aggregates_in_one_query(self):
+        menu1 = MenuFactory()
+        DishFactory(menu=menu1, price=Decimal('9.99'), is_vegetarian=True)
+        DishFactory(menu=menu1, price=Decimal('25.00'), is_vegetarian=False)
+        DishFactory(menu=menu1, price=Decimal('12.00'), is_vegetarian=True)
+        menu2 = MenuFactory()
+        DishFactory(menu=menu2, price=Decimal('30.00'), is_vegetarian=False)
+        MenuFactory()
+
+        path = reverse('menu-list')
+        with self.assertNumQueries(1):
+            response = self.client.get(path, data={'aggregates': 'true'})
+
+        expected = [
+            {**self.transform_menu(menu1), 'dishes_count': 3, 'min_price': '9.99', 'max_price': '25.00',
+             'vegetarian_count': 2},
+            {**self.transform_menu(menu2), 'dishes_count': 1, 'min_price': '30.00', 'max_price': '30.00',
+             'vegetarian_count': 0},
+        ]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(response.json(), expected)
+
+    def test_should_order_menus_by_min_price(self):
+        menu1 = MenuFactory()
+        DishFactory(menu=menu1, price=Decimal('20.00'))
+        menu2 = MenuFactory()
+        DishFactory(menu=menu2, price=Decimal('5.00'))
+        DishFactory(menu=menu2, price=Decimal('50.00'))
+        menu3 = MenuFactory()
+        DishFactory(menu=menu3, price=Decimal('10.00'))
+
+        path = reverse('menu-list')
+        response = self.client.get(path, data={'ordering': 'min_price'})
+
+        expected = [self.transform_menu(menu) for menu in [menu2, menu3, menu1]]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(response.json(), expected)
+
+    def test_should_filter_menus_with_vegetarian_dishes_under_price(self):
+        menu1 = MenuFactory()
+        DishFactory(menu=menu1, price=Decimal('15.00'), is_vegetarian=True)
+        menu2 = MenuFactory()
+        DishFactory(menu=menu2, price=Decimal('15.00'), is_vegetarian=False)
+        DishFactory(menu=menu2, price=Decimal('35.00'), is_vegetarian=True)
+        menu3 = MenuFactory()
+        DishFactory(menu=menu3, price=Decimal('25.00'), is_vegetarian=True)
+        DishFactory(menu=menu3, price=Decimal('5.00'), is_vegetarian=True)
+
+        path = reverse('menu-list')
+        response = self.client.get(path, data={'vegetarian_price_max': '20', 'ordering': '-vegetarian_count'})
+
+        expected = [self.transform_menu(menu) for menu in [menu3, menu1]]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(response.json(), expected)
+
+    def test_should_retrieve_menus_in_batch_with_two_queries(self):
+        menus = MenuFactory.create_batch(3)
+        for menu in menus:
+            DishFactory.create_batch(2, menu=menu)
+
+        path = reverse('menu-batch')
+        with self.assertNumQueries(2):
+            response = self.client.get(path, data={'ids': f'{menus[2].id},{menus[0].id},999'})
+
+        expected = [
+            {**self.transform_menu(menu), 'dishes': [self.transform_dish(dish) for dish in menu.dishes.order_by('pk')]}
+            for menu in [menus[2], menus[0]]
+        ]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(response.json(), expected)
+
+    @override_settings(MENU_BATCH_MAX_SIZE=2)
+    def test_should_raise_if_batch_too_large(self):
+        path = reverse('menu-batch')
+
+        response = self.client.get(path, data={'ids': '1,2,3'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'ids': ['Ensure this field has no more than 2 ids.']})
+
+    def test_should_raise_if_batch_ids_invalid(self):
+        path = reverse('menu-batch')
+
+        response = self.client.get(path, data={'ids': '1,abc'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'ids': ['Enter comma separated menu ids.']})
+
     @classmethod
     def transform_dish(cls, dish: Dish):
         return {
@@ -169,7 +259,8 @@ class TestCaseMenuReadOnlyViewSet(TestUtilsMixin, APITestCase):
             'is_vegetarian': dish.is_vegetarian,
             'modified': cls.transform_date(dish.modified),
             'created': cls.transform_date(dish.created),
-            'picture': dish.picture.url if dish.picture else None
+            'picture': dish.picture.url if dish.picture else None,
+            'picture_variants': {}
         }
 
     @classmethod
@@ -0,0 +1,81 @@
+from unittest import skipIf
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from common.plans import QueryPlans
+from menu.management.commands.capture_query_plans import BASELINE_PATH
+from menu.plans import get_scenarios, populate
+from menu.tests.factories import DishFactory
+
+
+def fingerprint(cost, *nodes):
+    return {'sql': 'SELECT', 'cost': cost, 'nodes': list(nodes)}
+
+
+class QueryPlansTestCase(SimpleTestCase):
+    def test_should_fingerprint_plan_nodes(self):
+        plan = {'Node Type': 'Nested Loop', 'Total Cost': 12.5, 'Plans': [
+            {'Node Type': 'Index Scan', 'Relation Name': 'menu_dish', 'Index Name': 'menu_dish_price_id_idx'},
+            {'Node Type': 'Seq Scan', 'Relation Name': 'menu_menu'},
+        ]}
+
+        result = QueryPlans.fingerprint('SELECT 1', plan)
+
+        self.assertEqual(result, {
+            'sql': 'SELECT 1',
+            'cost': 12.5,
+            'nodes': [
+                'Nested Loop', '  Index Scan on menu_dish using menu_dish_price_id_idx', '  Seq Scan on menu_menu'
+            ],
+        })
+
+    def test_should_report_index_scan_replaced_by_sequential_scan(self):
+        before = {'plan': [fingerprint(10, 'Limit', '  Index Scan on menu_dish using menu_dish_price_id_idx')]}
+        after = {'plan': [fingerprint(15, 'Limit', '  Seq Scan on menu_dish')]}
+
+        problems = QueryPlans().compare(before, after)
+
+        self.assertEqual(problems, ['plan query 1: sequential scan of menu_dish, which was read through an index'])
+
+    def test_should_accept_cheaper_plan_with_sequential_scan(self):
+        before = {'plan': [fingerprint(100, 'Nested Loop', '  Seq Scan on menu_dish', '  Index Scan on menu_menu')]}
+        after = {'plan': [fingerprint(60, 'Hash Join', '  Seq Scan on menu_dish', '  Seq Scan on menu_menu')]}
+
+        self.assertEqual(QueryPlans().compare(before, after), [])
+
+    def test_should_report_cost_rise_and_query_count_change(self):
+        before = {'plan': [fingerprint(10, 'Seq Scan on menu_menu')], 'other': [fingerprint(1, 'Result')]}
+        after = {'plan': [fingerprint(25, 'Seq Scan on menu_menu')], 'other': []}
+
+        problems = QueryPlans(cost_tolerance=2).compare(before, after)
+
+        self.assertEqual(problems, ['plan query 1: cost rose from 10 to 25', 'other: runs 0 queries instead of 1'])
+
+    def test_should_read_select_of_server_side_cursor(self):
+        sql = 'DECLARE "_django_curs_1" NO SCROLL CURSOR WITH HOLD FOR SELECT "auth_user"."email" FROM "auth_user"'
+
+        self.assertEqual(QueryPlans.get_select(sql), 'SELECT "auth_user"."email" FROM "auth_user"')
+        self.assertIsNone(QueryPlans.get_select('SAVEPOINT "s1"'))
+
+
+class QueryPlanScenariosTestCase(TestCase):
+    def test_should_run_every_scenario(self):
+        DishFactory.create_batch(3)
+
+        for name, scenario in get_scenarios().items():
+            with self.subTest(name):
+                scenario()
+
+
+@skipIf(connection.vendor != 'postgresql', 'captures PostgreSQL query plans')
+class QueryPlanRegressionTestCase(TestCase):
+    def test_should_keep_query_plans_of_baseline(self):
+        baseline = QueryPlans.load(BASELINE_PATH)
+        populate(baseline['size']['menus'], baseline['size']['dishes'])
+
+        plans = QueryPlans()
+        captured = plans.capture(get_scenarios())
+
+        self.assertEqual(set(captured), set(baseline['plans']))
+        self.assertEqual(plans.compare(baseline['plans'], captured), [])
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from common.management.commands.run_worker import Command
+from menu.tasks import (
+    build_static_menus, delete_menu, generate_dish_picture_variants, notify_about_new_and_modified_dishes, send_emails,
+)
+from restaurant_website.celery import app
+
+
+class TaskRoutingTestCase(SimpleTestCase):
+    def route(self, task):
+        options = app.amqp.router.route({}, task.name)
+        return options['queue'].name, options.get('priority')
+
+    def test_should_route_tasks_to_their_queues(self):
+        self.assertEqual(self.route(notify_about_new_and_modified_dishes), ('default', 0))
+        self.assertEqual(self.route(send_emails), ('email', 6))
+        self.assertEqual(self.route(generate_dish_picture_variants), ('images', 0))
+        self.assertEqual(self.route(build_static_menus), ('rebuilds', 0))
+        self.assertEqual(self.route(delete_menu), ('rebuilds', 6))
+
+    def test_should_consume_every_routed_queue(self):
+        consumed = {queue for pool in settings.WORKER_POOLS.values() for queue in pool['queues']}
+
+        routed = {route['queue'] for route in settings.CELERY_TASK_ROUTES.values()}
+
+        self.assertLessEqual(routed | {settings.CELERY_TASK_DEFAULT_QUEUE}, consumed)
+
+    def test_should_build_worker_arguments_of_pool(self):
+        argv = Command.get_argv('email', Command.get_pool('email'), loglevel='warning')
+
+        self.assertEqual(argv, [
+            'worker', '--hostname=email@%h', '--queues=email', '--concurrency=4', '--prefetch-multiplier=1',
+            '--loglevel=warning',
+        ])
+
+    def test_should_reject_unknown_pool(self):
+        with self.assertRaises(CommandError):
+            Command.get_pool('unknown')
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.tests import TestUtilsMixin
+from menu.models import Dish, Menu, Tombstone
+from menu.read_model import MenuReadModel, menu_read_model
+from menu.tasks import prune_tombstones
+from menu.tests.factories import DishFactory, MenuFactory
+
+
+@override_settings(MENU_READ_MODEL_ENABLED=True, MENU_READ_MODEL_REFRESH_INTERVAL=0)
+class MenuReadModelTestCase(TestUtilsMixin, APITestCase):
+    queries = [
+        '',
+        '?aggregates=true',
+        '?ordering=name',
+        '?ordering=-name&aggregates=true',
+        '?ordering=-dishes_count&aggregates=true',
+        '?ordering=vegetarian_count,-max_price&aggregates=true',
+        '?ordering=min_price,name',
+        '?ordering=unknown',
+        '?price_max=15',
+        '?vegetarian_price_max=25&vegetarian_count_min=1&ordering=-min_price',
+        '?created_after={created}&ordering=-name',
+        '?modified_before={created}',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        menu_read_model.reset()
+        self.addCleanup(menu_read_model.reset)
+        # The requests of both read paths share the throttle buckets of later tests.
+        self.addCleanup(cache.clear)
+        self.menus = [MenuFactory(name=name) for name in ('beta', 'Alpha', 'delta', 'gamma', 'empty')]
+        self.past = timezone.now() - timedelta(days=2)
+        Menu.objects.filter(name__in=['beta', 'delta']).update(created=self.past, modified=self.past)
+        for number, (menu, count) in enumerate(zip(self.menus, (1, 3, 5, 8)), start=1):
+            for i in range(count):
+                DishFactory(menu=menu, price=Decimal(10 * number + i), is_vegetarian=i < count - 1)
+
+    def get_menus(self, query):
+        url = reverse('menu-list') + query.format(created=(self.past + timedelta(days=1)).isoformat()[:19])
+        response = self.client.get(url)
+        with self.settings(MENU_READ_MODEL_ENABLED=False):
+            expected = self.client.get(url)
+        self.assertEqual((response.status_code, response.json()), (expected.status_code, expected.json()), query)
+        return response
+
+    def test_should_serve_list_like_database(self):
+        for query in self.queries:
+            self.assertEqual(self.get_menus(query).status_code, status.HTTP_200_OK)
+
+    def test_should_reject_invalid_filters_like_database(self):
+        response = self.get_menus('?created_after=yesterday')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(MENU_READ_MODEL_REFRESH_INTERVAL=60)
+    def test_should_serve_list_without_queries(self):
+        menu_read_model.get()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('menu-list') + '?aggregates=true&ordering=-dishes_count')
+
+        self.assertEqual([menu['name'] for menu in response.json()], ['gamma', 'delta', 'Alpha', 'beta'])
+
+    def test_should_refresh_modified_menus_and_dishes(self):
+        menu_read_model.get()
+        menus = {menu.name: menu for menu in self.menus}
+
+        DishFactory(menu=menus['empty'], price=Decimal('5.00'), is_vegetarian=False)
+        dish = Dish.objects.filter(menu=menus['gamma']).first()
+        dish.menu = menus['beta']
+        dish.save()
+        menus['delta'].name = 'Zeta'
+        menus['delta'].save()
+
+        with patch.object(MenuReadModel, 'load', wraps=menu_read_model.load) as load:
+            for query in self.queries:
+                self.get_menus(query)
+        load.assert_not_called()
+
+    def test_should_drop_deleted_menus_and_dishes_without_reload(self):
+        menu_read_model.get()
+
+        Dish.objects.filter(menu=self.menus[1]).first().delete()
+        self.menus[0].dishes.all().delete()
+        self.menus[0].delete()
+        self.menus[2].delete()
+
+        with patch.object(MenuReadModel, 'load', wraps=menu_read_model.load) as load:
+            for query in self.queries:
+                self.get_menus(query)
+        load.assert_not_called()
+        self.assertEqual(
+            len(menu_read_model.catalogue.dishes.ids), Dish.objects.count()
+        )
+
+    @override_settings(MENU_READ_MODEL_REFRESH_INTERVAL=60)
+    def test_should_refresh_in_background_instead_of_on_requests(self):
+        # The thread waits until the model is reset, without refreshing: its queries wouldn't see the test data.
+        with patch.object(MenuReadModel, 'refresh_periodically', side_effect=menu_read_model.stopping.wait):
+            menu_read_model.start()
+        self.assertTrue(menu_read_model.refresher.is_alive())
+
+        with self.settings(MENU_READ_MODEL_REFRESH_INTERVAL=0), self.assertNumQueries(0):
+            response = self.client.get(reverse('menu-list'))
+
+        self.assertEqual(len(response.json()), 4)
+
+    def test_should_serve_stale_menus_only_within_max_staleness(self):
+        menu_read_model.get()
+        DishFactory(menu=self.menus[4])
+
+        with patch.object(MenuReadModel, 'refresh', side_effect=DatabaseError), self.assertLogs('menu.read_model'):
+            with self.settings(MENU_READ_MODEL_MAX_STALENESS=60), self.assertNumQueries(0):
+                stale = self.client.get(reverse('menu-list'))
+            with self.settings(MENU_READ_MODEL_MAX_STALENESS=0), self.assertNumQueries(1):
+                fresh = self.client.get(reverse('menu-list'))
+
+        self.assertEqual(len(stale.json()), 4)
+        self.assertEqual(len(fresh.json()), 5)
+
+
+class TombstoneTestCase(TestCase):
+    def test_should_record_deleted_menus_and_dishes(self):
+        menu = MenuFactory()
+        dishes = DishFactory.create_batch(2, menu=menu)
+
+        Dish.objects.filter(pk=dishes[0].pk).delete()
+        Menu.objects.filter(pk=menu.pk).delete()
+
+        self.assertEqual(
+            sorted(Tombstone.objects.values_list('model', 'object_id', 'menu_id')),
+            sorted([('dish', dishes[0].pk, menu.pk), ('dish', dishes[1].pk, menu.pk), ('menu', menu.pk, menu.pk)])
+        )
+
+    def test_should_prune_old_tombstones(self):
+        now = timezone.now()
+        Tombstone.objects.create(model=Tombstone.DISH, object_id=1, menu_id=1, deleted=now - timedelta(days=2))
+        recent = Tombstone.objects.create(model=Tombstone.DISH, object_id=2, menu_id=1, deleted=now)
+
+        prune_tombstones.apply().get()
+
+        self.assertEqual(list(Tombstone.objects.all()), [recent])
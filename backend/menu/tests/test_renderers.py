@@ -0,0 +1,69 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import msgpack
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.renderers import FastJSONRenderer, MessagePackRenderer
+from common.tests import TestUtilsMixin
+from .factories import MenuFactory, DishFactory
+
+
+class FastJSONRendererTestCase(SimpleTestCase):
+    def test_should_render_same_json_as_drf(self):
+        data = {
+            'price': Decimal('12.50'),
+            'prepare_time': timedelta(minutes=40),
+            'created': datetime(2020, 5, 1, 10, 30, 15, 123456, tzinfo=timezone.utc),
+            'date': datetime(2020, 5, 1).date(),
+            'id': uuid.UUID(int=1),
+            'name': 'Żurek\u2028\u2029',
+            'nested': [{'is_vegetarian': True, 'picture': None}],
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_should_fall_back_to_drf_for_indented_json(self):
+        data = {'name': 'menu'}
+
+        rendered = FastJSONRenderer().render(data, 'application/json; indent=4')
+
+        self.assertEqual(rendered, JSONRenderer().render(data, 'application/json; indent=4'))
+
+    def test_should_reject_nan_and_infinity_like_drf(self):
+        for value in (float('nan'), float('-inf'), Decimal('Infinity')):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'nested': [{'price': value, 'picture': None}]})
+
+
+class TestCaseRenderersNegotiation(TestUtilsMixin, APITestCase):
+    def setUp(self):
+        self.menu = MenuFactory()
+        DishFactory.create_batch(3, menu=self.menu)
+
+    def test_should_render_menu_with_fast_json_by_default(self):
+        response = self.client.get(reverse('menu-detail', args=[self.menu.id]))
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_should_render_menu_as_msgpack_when_accepted(self):
+        json_response = self.client.get(reverse('menu-detail', args=[self.menu.id]))
+
+        response = self.client.get(reverse('menu-detail', args=[self.menu.id]), HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], MessagePackRenderer.media_type)
+        self.assertEqual(msgpack.unpackb(response.content), json_response.json())
+
+    def test_should_render_dishes_as_msgpack_with_format_suffix(self):
+        json_response = self.client.get(reverse('dish-list'))
+
+        response = self.client.get(reverse('dish-list'), {'format': 'msgpack'})
+
+        self.assertEqual(msgpack.unpackb(response.content), json_response.json())
@@ -0,0 +1,108 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITransactionTestCase
+
+from common.db import ReplicaRouter, replica_reads
+from common.tests import TestUtilsMixin
+from menu.models import Menu
+from menu.tests.factories import MenuFactory, DishFactory
+
+
+class ReplicaRouterTestCase(TestCase):
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_should_read_from_replica_only_inside_replica_reads(self):
+        router = ReplicaRouter()
+
+        self.assertIsNone(router.db_for_read(Menu))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Menu), 'replica')
+            self.assertEqual(router.db_for_write(Menu), 'default')
+        self.assertIsNone(router.db_for_read(Menu))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_should_read_from_primary_without_replicas(self):
+        with replica_reads():
+            self.assertIsNone(ReplicaRouter().db_for_read(Menu))
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_should_not_migrate_replicas(self):
+        router = ReplicaRouter()
+
+        self.assertTrue(router.allow_migrate('default', 'menu'))
+        self.assertFalse(router.allow_migrate('replica', 'menu'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class TestCaseReplicaReads(TestUtilsMixin, APITransactionTestCase):
+    """Reads through the ``replica`` alias, a second connection to the test database."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Writes commit here, and would queue static menu rebuilds.
+        patcher = patch('menu.signals.build_static_menus')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.menu = DishFactory().menu
+
+    def get_queries(self, path):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(primary), len(replica)
+
+    def test_should_read_menus_from_replica(self):
+        response, primary, replica = self.get_queries(reverse('menu-detail', args=[self.menu.id]))
+
+        self.assertEqual(response.json()['id'], self.menu.id)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_should_route_orm_reads_and_writes(self):
+        with replica_reads(), CaptureQueriesContext(connections['replica']) as replica:
+            self.assertEqual(Menu.objects.get().pk, self.menu.pk)
+            MenuFactory()
+
+        self.assertEqual(len(replica), 1)
+        self.assertEqual(Menu.objects.using('replica').count(), 2)
+
+    def test_should_read_from_primary_right_after_write_even_anonymously(self):
+        self.authenticate_and_add_modify_permissions()
+        response = self.client.patch(reverse('menu-manage-detail', args=[self.menu.id]), {'description': 'new'})
+        self.assertIn(settings.DATABASE_REPLICA_PIN_COOKIE, response.cookies)
+        self.client.credentials()
+
+        response, primary, replica = self.get_queries(reverse('menu-detail', args=[self.menu.id]))
+
+        self.assertEqual(response.json()['description'], 'new')
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_should_read_from_primary_after_write_with_token_only(self):
+        self.authenticate_and_add_modify_permissions()
+        self.client.patch(reverse('menu-manage-detail', args=[self.menu.id]), {'description': 'new'})
+        self.client.cookies.clear()
+
+        _, primary, replica = self.get_queries(reverse('menu-detail', args=[self.menu.id]))
+
+        self.assertEqual(replica, 0)
+
+    def test_should_read_from_replica_after_pin_expired(self):
+        self.authenticate_and_add_modify_permissions()
+        self.client.patch(reverse('menu-manage-detail', args=[self.menu.id]), {'description': 'new'})
+        self.client.cookies.clear()
+        cache.clear()
+
+        _, primary, replica = self.get_queries(reverse('menu-detail', args=[self.menu.id]))
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from drf_yasg.app_settings import swagger_settings
+
+from common.schema import OpenAPISchema
+
+OPENAPI_SCHEMA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(OPENAPI_SCHEMA_ROOT=OPENAPI_SCHEMA_ROOT)
+class OpenAPISchemaTestCase(TestCase):
+    def setUp(self):
+        OpenAPISchema._built.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(OPENAPI_SCHEMA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_should_serve_prebuilt_schema(self):
+        response = self.client.get(reverse('schema-json'))
+        schema = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{OpenAPISchema.get_fingerprint()}"')
+        self.assertIn('/menu/', schema['paths'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_should_serve_gzipped_schema(self):
+        response = self.client.get(reverse('schema-json'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        schema = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('/dishes/', schema['paths'])
+
+    def test_should_serve_plain_schema_when_gzip_is_refused(self):
+        response = self.client.get(reverse('schema-json'), HTTP_ACCEPT_ENCODING='gzip;q=0, deflate')
+        schema = json.loads(b''.join(response.streaming_content))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('/menu/', schema['paths'])
+
+    def test_should_return_not_modified_for_current_etag(self):
+        etag = self.client.get(reverse('schema-json'))['ETag']
+
+        response = self.client.get(reverse('schema-json'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_should_generate_schema_once_per_code_version(self):
+        call_command('build_openapi_schema', stdout=open(os.devnull, 'w'))
+
+        with patch.object(OpenAPISchema, 'generate') as generate:
+            OpenAPISchema.build()
+            self.client.get(reverse('schema-json'))
+            self.client.get(reverse('schema-json'))
+
+        generate.assert_not_called()
+
+    def test_should_regenerate_schema_when_code_changes(self):
+        OpenAPISchema.build()
+
+        with patch.object(OpenAPISchema, 'get_fingerprint', return_value='changed'):
+            call_command('build_openapi_schema', '--clean', stdout=open(os.devnull, 'w'))
+
+        self.assertEqual(sorted(os.listdir(OPENAPI_SCHEMA_ROOT)), ['openapi.changed.json', 'openapi.changed.json.gz'])
+
+    def test_should_point_swagger_ui_at_prebuilt_schema(self):
+        response = self.client.get(reverse('schema-swagger-ui'))
+
+        self.assertContains(response, reverse('schema-json'))
+
+    def test_should_serve_swagger_ui_without_generating_schema(self):
+        with patch.object(swagger_settings.DEFAULT_GENERATOR_CLASS, 'get_schema') as get_schema:
+            response = self.client.get(reverse('schema-swagger-ui'))
+
+        self.assertContains(response, 'Menus API')
+        get_schema.assert_not_called()
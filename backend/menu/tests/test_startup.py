@@ -0,0 +1,28 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from common.management.commands.profile_startup import Command
+
+
+class ProfileStartupTestCase(SimpleTestCase):
+    def test_should_report_startup_time(self):
+        stdout = StringIO()
+
+        call_command('profile_startup', 'worker', '--repeat', '1', '--limit', '3', stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn('worker (restaurant_website.profiles.worker)', output)
+        self.assertIn('django.setup()', output)
+        self.assertIn('import menu.tasks', output)
+        self.assertIn('slowest top-level imports', output)
+
+    def test_should_skip_apps_not_needed_by_role(self):
+        api, _ = Command.run('restaurant_website.profiles.api', [])
+        worker, imports = Command.run('restaurant_website.profiles.worker', ['menu.tasks'])
+
+        self.assertNotIn('django_celery_beat', api['apps'])
+        self.assertIn('admin', api['apps'])
+        self.assertEqual(set(worker['apps']), {'auth', 'contenttypes', 'common', 'menu'})
+        self.assertNotIn('drf_yasg.views', [name for _, name in imports])
@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.files import File
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.tests import TestUtilsMixin
+from menu.models import Dish
+from menu.signals import changed_menus
+from menu.static_site import StaticMenuSite
+from .factories import MenuFactory, DishFactory
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class StaticSiteMixin:
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.site = StaticMenuSite(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        super().tearDown()
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), 'rb') as file:
+            return file.read()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StaticMenuSiteTestCase(StaticSiteMixin, TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @override_settings(STATIC_MENUS_BASE_URL='http://testserver')
+    def test_should_render_published_menus(self):
+        menu = MenuFactory()
+        dishes = DishFactory.create_batch(2, menu=menu)
+        dishes[0].picture = File(open('menu/tests/mocks/picture.jpeg', 'rb'))
+        dishes[0].has_picture_variants = True
+        dishes[0].save()
+        empty_menu = MenuFactory()
+
+        result = self.site.build()
+
+        self.assertEqual(result, {'written': [menu.pk], 'unchanged': [], 'removed': []})
+        response = self.client.get(reverse('menu-detail', args=[menu.pk]))
+        self.assertEqual(self.read(f'menus/{menu.pk}.json'), response.content)
+        html = self.read(f'menus/{menu.pk}.html').decode()
+        self.assertIn(dishes[1].name, html)
+        self.assertIn(f'src="http://testserver{dishes[0].picture_variants.smallest_url}"', html)
+        self.assertEqual([item['id'] for item in json.loads(self.read('index.json'))], [menu.pk])
+        self.assertFalse(os.path.exists(os.path.join(self.root, f'menus/{empty_menu.pk}.json')))
+
+    def test_should_rewrite_only_changed_menus(self):
+        menus = MenuFactory.create_batch(3)
+        dishes = [DishFactory(menu=menu) for menu in menus]
+        self.site.build()
+
+        dishes[1].name = 'changed'
+        dishes[1].save()
+        result = self.site.build()
+
+        self.assertEqual(result['written'], [menus[1].pk])
+        self.assertEqual(result['unchanged'], [menus[0].pk, menus[2].pk])
+        self.assertIn(b'changed', self.read(f'menus/{menus[1].pk}.json'))
+
+    def test_should_remove_unpublished_menus(self):
+        menu = MenuFactory()
+        dish = DishFactory(menu=menu)
+        self.site.build()
+
+        dish.delete()
+        result = self.site.build([menu.pk])
+
+        self.assertEqual(result['removed'], [menu.pk])
+        self.assertFalse(os.path.exists(os.path.join(self.root, f'menus/{menu.pk}.json')))
+        self.assertNotIn(str(menu.pk), json.loads(self.read('manifest.json')))
+        self.assertEqual(json.loads(self.read('index.json')), [])
+
+    def test_should_rewrite_unchanged_menus_when_forced(self):
+        menu = DishFactory().menu
+        self.site.build()
+
+        self.assertEqual(self.site.build(force=True)['written'], [menu.pk])
+
+
+@patch('menu.signals.build_static_menus')
+class TestCaseStaticMenusRebuild(TestUtilsMixin, APITestCase):
+    def setUp(self):
+        self.authenticate_and_add_modify_permissions()
+
+    def commit(self):
+        # Test transactions never commit, so the batched rebuild is flushed by hand.
+        changed_menus.flush()
+
+    def test_should_rebuild_menu_after_dish_update(self, build_static_menus):
+        dish = DishFactory()
+        other_menu = MenuFactory()
+        self.commit()
+
+        self.client.patch(reverse('dish-manage-detail', args=[dish.pk]), {'menu': other_menu.name})
+        self.commit()
+
+        build_static_menus.delay.assert_called_with(sorted([dish.menu_id, other_menu.pk]))
+
+    def test_should_rebuild_menu_once_after_menu_deletion(self, build_static_menus):
+        menu = DishFactory().menu
+        self.commit()
+
+        self.client.delete(reverse('menu-manage-detail', args=[menu.pk]))
+        self.commit()
+
+        self.assertEqual(build_static_menus.delay.call_count, 2)
+        build_static_menus.delay.assert_called_with([menu.pk])
+
+    def test_should_rebuild_menus_written_outside_api(self, build_static_menus):
+        menus = MenuFactory.create_batch(2)
+        menu_ids = [menu.pk for menu in menus]
+        self.commit()
+
+        DishFactory(menu=menus[0])
+        Dish.objects.filter(menu=menus[1]).delete()
+        menus[1].delete()
+        self.commit()
+
+        build_static_menus.delay.assert_called_with(menu_ids)
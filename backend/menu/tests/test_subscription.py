@@ -0,0 +1,45 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.tests import TestUtilsMixin
+from menu.models import Subscription
+from menu.tests.factories import MenuFactory
+
+
+class TestCaseSubscriptionViewSet(TestUtilsMixin, APITestCase):
+    def test_should_return_default_preferences(self):
+        self.authenticate_user()
+
+        response = self.client.get(reverse('subscription'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'followed_menus': [], 'vegetarian_only': False, 'opted_out': False})
+        self.assertFalse(Subscription.objects.exists())
+
+    def test_should_return_stored_preferences(self):
+        user = self.authenticate_user()
+        menu = MenuFactory()
+        Subscription.objects.create(user=user, opted_out=True).followed_menus.add(menu)
+
+        response = self.client.get(reverse('subscription'))
+
+        self.assertEqual(response.json(), {'followed_menus': [menu.name], 'vegetarian_only': False, 'opted_out': True})
+
+    def test_should_update_preferences_of_authenticated_user(self):
+        user = self.authenticate_user()
+        menu = MenuFactory()
+        payload = {'followed_menus': [menu.name], 'vegetarian_only': True}
+
+        response = self.client.patch(reverse('subscription'), payload)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        subscription = Subscription.objects.get(user=user)
+        self.assertEqual(list(subscription.followed_menus.all()), [menu])
+        self.assertTrue(subscription.vegetarian_only)
+        self.assertFalse(subscription.opted_out)
+
+    def test_should_require_authentication(self):
+        response = self.client.get(reverse('subscription'))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
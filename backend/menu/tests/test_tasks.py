@@ -1,19 +1,42 @@
+import csv
+import gzip
+import os
+import shutil
+import tempfile
 from datetime import datetime, timezone, timedelta
-from unittest.mock import patch
+from io import BytesIO
+from unittest.mock import Mock, patch
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files import File
 from django.template.loader import render_to_string
 from django.test import TestCase, override_settings
 from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.db.models.signals import post_delete
+from PIL import Image
 
 from common.tests import TestUtilsMixin
-from menu.tasks.notify_about_new_and_modified_dishes import notify_about_new_and_modified_dishes
-from menu.tests.factories import DishFactory
+from menu.facets import DishFacets
+from menu.models import Menu, Dish, Subscription
+from menu.tasks.delete_menu import delete_menu, delete_unreferenced_pictures
+from menu.tasks.generate_dish_picture_variants import generate_dish_picture_variants
+from menu.tasks.notify_about_new_and_modified_dishes import (
+    NotifyManager, notify_about_new_and_modified_dishes, send_emails
+)
+from menu.tests.factories import MenuFactory, DishFactory
 
+MEDIA_ROOT = tempfile.mkdtemp()
 
-@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, MEDIA_ROOT=MEDIA_ROOT, STATIC_MENUS_ROOT=tempfile.mkdtemp())
 class TasksTestCase(TestUtilsMixin, TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
     def test_should_notify_about_yesterday_dishes(self):
         user_mail = 'mail@test.pl'
         User.objects.create_user('test_user', user_mail, 'password')
@@ -40,6 +63,158 @@ class TasksTestCase(TestUtilsMixin, TestCase):
         self.assertEqual(received_mail.subject, 'Recently modified and created dishes')
         self.assertEqual(received_mail.to[0], user_mail)
 
+    def test_should_send_digests_matching_subscription_preferences(self):
+        current_date = datetime(2020, 12, 12, 12, 12, 12, tzinfo=timezone.utc)
+        followed_menu, other_menu = MenuFactory(), MenuFactory()
+        vegetarian, meat, other_vegetarian = [
+            self.call_with_mocked_date(lambda: DishFactory(menu=menu, is_vegetarian=is_vegetarian),
+                                       current_date - timedelta(days=1))
+            for menu, is_vegetarian in ((followed_menu, True), (followed_menu, False), (other_menu, True))
+        ]
+        User.objects.create_user('everything', 'everything@test.pl', 'password')
+        for name in ('vegetarian', 'vegetarian2'):
+            user = User.objects.create_user(name, f'{name}@test.pl', 'password')
+            Subscription.objects.create(user=user, vegetarian_only=True)
+        user = User.objects.create_user('follower', 'follower@test.pl', 'password')
+        Subscription.objects.create(user=user).followed_menus.add(followed_menu)
+        user = User.objects.create_user('opted_out', 'opted_out@test.pl', 'password')
+        Subscription.objects.create(user=user, opted_out=True)
+
+        with patch('django.utils.timezone.now') as date, patch.object(
+                NotifyManager, 'render_digest', wraps=NotifyManager.render_digest
+        ) as render_digest:
+            date.return_value = current_date
+            notify_about_new_and_modified_dishes.apply().get()
+
+        self.assertEqual(render_digest.call_count, 3)
+        bodies = {received_mail.to[0]: received_mail.body for received_mail in mail.outbox}
+        self.assertEqual(
+            set(bodies), {'everything@test.pl', 'vegetarian@test.pl', 'vegetarian2@test.pl', 'follower@test.pl'}
+        )
+        expected_dishes = {
+            'everything@test.pl': [vegetarian, meat, other_vegetarian],
+            'vegetarian@test.pl': [vegetarian, other_vegetarian],
+            'vegetarian2@test.pl': [vegetarian, other_vegetarian],
+            'follower@test.pl': [vegetarian, meat],
+        }
+        for email, dishes in expected_dishes.items():
+            expected = render_to_string(
+                'menu/recently_modified_mail.txt', {'created_dishes': dishes, 'modified_dishes': dishes}
+            )
+            self.assertEqual(bodies[email], expected)
+
+    def test_should_send_each_digest_once_per_chunk_and_retry_failed_mails(self):
+        for name in ('user1', 'user2', 'user3'):
+            User.objects.create_user(name, f'{name}@test.pl', 'password')
+
+        with patch.object(send_emails, 'delay', wraps=send_emails.delay) as delay, patch.object(
+                EmailMultiAlternatives, 'send', autospec=True, side_effect=[1, 0, 1, 1]
+        ) as send:
+            notify_about_new_and_modified_dishes.apply(kwargs={'chunk_size': 2}).get()
+
+        chunks = [call.args for call in delay.call_args_list]
+        self.assertEqual([len(mails) for mails, _ in chunks], [1, 1, 1])
+        self.assertEqual([recipients for _, recipients in chunks], [
+            [(0, 'user1@test.pl'), (0, 'user2@test.pl')], [(0, 'user3@test.pl')], [(0, 'user2@test.pl')]
+        ])
+        self.assertEqual(
+            [call.args[0].to[0] for call in send.call_args_list],
+            ['user1@test.pl', 'user2@test.pl', 'user3@test.pl', 'user2@test.pl']
+        )
+
+    @override_settings(DIGEST_INLINE_DISHES=2, DIGEST_ATTACHMENTS_ROOT=tempfile.mkdtemp())
+    def test_should_attach_csv_of_all_changes_to_large_digest(self):
+        User.objects.create_user('test_user', 'mail@test.pl', 'password')
+        current_date = datetime(2020, 12, 12, 12, 12, 12, tzinfo=timezone.utc)
+        dishes = [self.call_with_mocked_date(DishFactory, current_date - timedelta(days=1)) for _ in range(3)]
+
+        with patch('django.utils.timezone.now') as date:
+            date.return_value = current_date
+            notify_about_new_and_modified_dishes.apply().get()
+
+        received_mail, = mail.outbox
+        self.assertEqual(received_mail.body.count('Name - '), 2 * 2)
+        self.assertIn('3 dishes were created and 3 modified', received_mail.body)
+        self.assertIn('3 dishes were created and 3 modified', received_mail.alternatives[0][0])
+        name, content, mimetype = received_mail.attachments[0]
+        self.assertEqual((name, mimetype), ('dishes-2020-12-11.csv.gz', 'application/gzip'))
+        rows = list(csv.reader(gzip.decompress(content).decode().splitlines()))
+        self.assertEqual(rows[0][:3], ['change', 'id', 'name'])
+        self.assertEqual(
+            [row[:3] for row in rows[1:]],
+            [[change, str(dish.pk), dish.name] for change in ('created', 'modified') for dish in dishes]
+        )
+        self.assertEqual(os.listdir(settings.DIGEST_ATTACHMENTS_ROOT), [])
+
+    def test_should_generate_picture_variants(self):
+        dish = DishFactory()
+        dish.picture = File(open('menu/tests/mocks/picture.jpeg', 'rb'))
+        dish.save()
+
+        generate_dish_picture_variants.apply(args=[dish.id, dish.picture.name]).get()
+
+        dish.refresh_from_db()
+        self.assertTrue(dish.has_picture_variants)
+        for width in settings.DISH_PICTURE_VARIANT_WIDTHS:
+            with dish.picture.storage.open(dish.picture_variants.name(width), 'rb') as variant_file:
+                variant = Image.open(variant_file)
+                self.assertEqual(variant.format, 'WEBP')
+                self.assertLessEqual(variant.width, width)
+        self.assertEqual(
+            set(dish.picture_variants.urls()),
+            {f'{width}w' for width in settings.DISH_PICTURE_VARIANT_WIDTHS}
+        )
+        dish.picture_variants.delete()
+
+    def test_should_skip_picture_variants_for_replaced_picture(self):
+        dish = DishFactory()
+
+        generate_dish_picture_variants.apply(args=[dish.id, 'replaced.jpeg']).get()
+
+        dish.refresh_from_db()
+        self.assertFalse(dish.has_picture_variants)
+
+    @override_settings(MENU_DELETE_BATCH_SIZE=2)
+    @patch('django.db.transaction.on_commit', lambda callback: callback())
+    @patch.object(delete_unreferenced_pictures, 'delay', delete_unreferenced_pictures)
+    def test_should_delete_menu_with_dishes_and_unreferenced_pictures(self):
+        menu = MenuFactory()
+        dishes = DishFactory.create_batch(5, menu=menu)
+        other_dish = DishFactory()
+        for dish in (dishes[0], other_dish):
+            dish.picture = File(open('menu/tests/mocks/picture.jpeg', 'rb'))
+            dish.save()
+        dishes[1].picture = File(BytesIO(b'unshared'), name='unshared.jpeg')
+        dishes[1].save()
+        storage = Dish.picture.field.storage
+
+        delete_menu.apply(args=[menu.id]).get()
+
+        self.assertFalse(Menu.objects.filter(pk=menu.id).exists())
+        self.assertEqual(list(Dish.objects.all()), [other_dish])
+        self.assertTrue(storage.exists(other_dish.picture.name))
+        self.assertFalse(storage.exists(dishes[1].picture.name))
+        other_dish.release_picture()
+
+    @override_settings(MENU_DELETE_BATCH_SIZE=2)
+    @patch('django.db.transaction.on_commit', lambda callback: callback())
+    @patch('menu.signals.build_static_menus')
+    def test_should_delete_menu_dishes_in_sets_and_rebuild_menu_once(self, build_static_menus):
+        menu = MenuFactory()
+        DishFactory.create_batch(5, menu=menu)
+        receiver = Mock()
+        post_delete.connect(receiver, sender=Dish)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Dish)
+        build_static_menus.reset_mock()
+
+        with patch.object(DishFacets, 'invalidate') as invalidate:
+            delete_menu.apply(args=[menu.id]).get()
+
+        self.assertFalse(Dish.objects.filter(menu_id=menu.id).exists())
+        receiver.assert_not_called()
+        self.assertEqual(invalidate.call_count, 3)
+        build_static_menus.delay.assert_called_once_with([menu.id])
+
     def create_dishes(self, current_date):
         yesterday_date = current_date - timedelta(days=1)
         yesterday_created = self.call_with_mocked_date(DishFactory, yesterday_date)
@@ -0,0 +1,107 @@
+from unittest import skipUnless
+
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from common.tests import TestUtilsMixin
+from common.throttling import TokenBuckets
+from menu.tests.factories import MenuFactory
+
+
+@override_settings(THROTTLE_RATES={
+    'default': {'client': '100/min', 'overall': '1000/min'},
+    'menu.retrieve': {'client': '2/min', 'overall': '3/min'},
+})
+class TokenBucketThrottleTestCase(TestUtilsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.path = reverse('menu-detail', args=[MenuFactory().id])
+
+    def test_should_throttle_client_before_querying(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.path).status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.path)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self.client.get(self.path, REMOTE_ADDR='10.0.0.2').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('menu-list')).status_code, status.HTTP_200_OK)
+
+    def test_should_throttle_authenticated_users_by_user(self):
+        self.authenticate_user()
+        for address in ('10.0.0.1', '10.0.0.2'):
+            self.assertEqual(self.client.get(self.path, REMOTE_ADDR=address).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.path, REMOTE_ADDR='10.0.0.3')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_should_shed_load_of_all_clients_above_overall_rate(self):
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            self.assertEqual(self.client.get(self.path, REMOTE_ADDR=address).status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.path, REMOTE_ADDR='10.0.0.4')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(len(queries), 0)
+
+    def test_should_not_count_shed_requests_against_client(self):
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            self.client.get(self.path, REMOTE_ADDR=address)
+        for _ in range(3):
+            response = self.client.get(self.path, REMOTE_ADDR='10.0.0.4')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        self.assertEqual(TokenBuckets.consume('throttle:menu.retrieve:10.0.0.4', 2, 2 / 60), 0)
+
+    def test_should_ignore_forwarded_for_without_trusted_proxies(self):
+        for address in ('10.0.0.1', '10.0.0.2'):
+            self.client.get(self.path, HTTP_X_FORWARDED_FOR=address)
+
+        response = self.client.get(self.path, HTTP_X_FORWARDED_FOR='10.0.0.3')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class TokenBucketsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_should_refill_bucket_over_time(self):
+        self.assertEqual(TokenBuckets.parse_rate('10/s'), (10, 10.0))
+        self.assertEqual(TokenBuckets.parse_rate('30/min'), (30, 0.5))
+
+        waits = [TokenBuckets.consume('test-bucket', 2, 0.5) for _ in range(3)]
+
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertAlmostEqual(waits[2], 2, places=1)
+
+    def test_should_refund_token_up_to_capacity(self):
+        TokenBuckets.consume('test-bucket', 1, 0.01)
+        TokenBuckets.refund('test-bucket', 1, 0.01)
+        TokenBuckets.refund('test-bucket', 1, 0.01)
+
+        waits = [TokenBuckets.consume('test-bucket', 1, 0.01) for _ in range(2)]
+
+        self.assertEqual(waits[0], 0)
+        self.assertGreater(waits[1], 0)
+
+    @skipUnless(type(caches['default']).__module__.startswith('django_redis'), 'runs the Lua script of the Redis cache')
+    def test_should_consume_atomically_on_redis(self):
+        waits = [TokenBuckets.consume('test-redis-bucket', 3, 1) for _ in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 1, places=1)
+
+        TokenBuckets.refund('test-redis-bucket', 3, 1)
+        self.assertEqual(TokenBuckets.consume('test-redis-bucket', 3, 1), 0)
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from celery.app.task import Context
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from common import tracing
+from menu.tasks.notify_about_new_and_modified_dishes import notify_about_new_and_modified_dishes
+
+TRACING_FILE_PATH = os.path.join(tempfile.mkdtemp(), 'traces.jsonl')
+
+
+def read_spans():
+    with open(TRACING_FILE_PATH) as file:
+        return [
+            span for line in file for resource_spans in json.loads(line)['resourceSpans']
+            for scope_spans in resource_spans['scopeSpans'] for span in scope_spans['spans']
+        ]
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, TRACING_EXPORTER='file', TRACING_FILE_PATH=TRACING_FILE_PATH)
+class NotificationTracingTestCase(TestCase):
+    def setUp(self):
+        if os.path.exists(TRACING_FILE_PATH):
+            os.remove(TRACING_FILE_PATH)
+
+    def test_should_trace_notification_group(self):
+        for i in range(3):
+            User.objects.create_user(f'user{i}', f'user{i}@test.pl', 'password')
+
+        notify_about_new_and_modified_dishes.apply(kwargs={'chunk_size': 2}).get()
+
+        spans = read_spans()
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span['name'], []).append(span)
+        root, = by_name['celery.task menu.tasks.notify_about_new_and_modified_dishes.'
+                        'notify_about_new_and_modified_dishes']
+        send, = by_name['notify.send']
+        chunks = by_name['celery.task menu.tasks.notify_about_new_and_modified_dishes.send_emails']
+        self.assertEqual({span['traceId'] for span in spans}, {root['traceId']})
+        self.assertNotIn('parentSpanId', root)
+        for name in ('notify.count_dishes', 'notify.send'):
+            self.assertEqual(by_name[name][0]['parentSpanId'], root['spanId'])
+        self.assertEqual(by_name['notify.render_digest'][0]['parentSpanId'], send['spanId'])
+        self.assertEqual([span['parentSpanId'] for span in chunks], [send['spanId']] * 2)
+        self.assertEqual(
+            sorted(attribute['value']['intValue'] for span in chunks for attribute in span['attributes']
+                   if attribute['key'] == 'chunk_size'),
+            ['1', '2']
+        )
+        self.assertEqual(len(by_name['smtp.send']), 3)
+        self.assertEqual({span['parentSpanId'] for span in by_name['smtp.send']}, {span['spanId'] for span in chunks})
+
+    def test_should_report_span_durations(self):
+        notify_about_new_and_modified_dishes.apply().get()
+        stdout = StringIO()
+
+        call_command('trace_report', stdout=stdout)
+
+        self.assertIn('notify.count_dishes', stdout.getvalue())
+
+
+class TraceContextPropagationTestCase(SimpleTestCase):
+    def test_should_continue_trace_from_task_headers(self):
+        headers = {}
+        with tracing.span('publisher') as publisher:
+            tracing.inject_trace_context(headers=headers)
+
+        task = type('Task', (), {'name': 'menu.tasks.send_emails', 'request': Context(**headers)})()
+        tracing.start_task_span(task_id='task-id', task=task)
+        consumer = tracing.get_current_span()
+        tracing.end_task_span(task_id='task-id', state='SUCCESS')
+
+        self.assertEqual(headers['traceparent'], publisher.traceparent)
+        self.assertEqual(consumer.trace_id, publisher.trace_id)
+        self.assertEqual(consumer.parent_id, publisher.span_id)
+        self.assertIsNone(tracing.get_current_span())
@@ -1,9 +1,19 @@
+from django.urls import path
 from rest_framework import routers
 
-from .viewsets import MenuReadOnlyViewSet, MenuManageViewSet, DishManageViewSet
+from .viewsets import (
+    MenuReadOnlyViewSet, MenuManageViewSet, DishManageViewSet, DishReadOnlyViewSet, DishSearchViewSet,
+    SubscriptionViewSet
+)
 
 router = routers.SimpleRouter()
 router.register(r'manage/menu/dish', DishManageViewSet, 'dish-manage')
 router.register(r'manage/menu', MenuManageViewSet, 'menu-manage')
 router.register(r'menu', MenuReadOnlyViewSet, 'menu')
-urlpatterns = router.urls
+router.register(r'dishes/search', DishSearchViewSet, 'dish-search')
+router.register(r'dishes', DishReadOnlyViewSet, 'dish')
+urlpatterns = router.urls + [
+    path('subscription/', SubscriptionViewSet.as_view(
+        {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update'}
+    ), name='subscription'),
+]
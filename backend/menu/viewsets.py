@@ -1,48 +1,162 @@
-from typing import Union, Type, Any
+from typing import Union, Type, Any, List, Optional
 
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Prefetch, QuerySet
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter
 from rest_framework import viewsets, mixins, status
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import DjangoModelPermissions
+from rest_framework.permissions import DjangoModelPermissions, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .filters import DishesCountOrdering, MenuFilterSet
-from .models import Menu, Dish
-from .serializers import MenuSerializer, DishSerializer, MenuDishesSerializer
+from common.compression import PrecompressedResponseMixin
+from common.db import ReplicaReadsMixin
+from common.pagination import KeysetPagination
+
+from .facets import DishFacets
+from .filters import DishFilterSet, DishFullTextSearch, MenuAggregates, MenuAggregatesOrdering, MenuFilterSet
+from .models import Menu, Dish, Subscription
+from .pagination import DishSearchPagination
+from .read_model import MenuReadModel, MenuRecord, menu_read_model
+from .serializers import (
+    MenuSerializer, DishSerializer, DishListSerializer, MenuAggregatesSerializer, MenuDishesSerializer,
+    SubscriptionSerializer
+)
+from .signals import delete_dishes
+from .tasks.delete_menu import delete_menu
+from .tasks.generate_dish_picture_variants import generate_dish_picture_variants
 
 
 @method_decorator(name='list', decorator=swagger_auto_schema(
     manual_parameters=[openapi.Parameter(
         name='ordering',
         in_=openapi.IN_QUERY,
-        description='name, -name, dishes_count, -dishes_count',
+        description='name, -name, dishes_count, -dishes_count, min_price, -min_price, max_price, -max_price, '
+                    'vegetarian_count, -vegetarian_count',
         type=openapi.TYPE_STRING
+    ), openapi.Parameter(
+        name='aggregates',
+        in_=openapi.IN_QUERY,
+        description='Include dishes_count, min_price, max_price and vegetarian_count of every menu',
+        type=openapi.TYPE_BOOLEAN
     )]
 ))
-class MenuReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
-    filter_backends = [DishesCountOrdering, OrderingFilter, DjangoFilterBackend]
+class MenuReadOnlyViewSet(PrecompressedResponseMixin, ReplicaReadsMixin, viewsets.ReadOnlyModelViewSet):
+    filter_backends = [MenuAggregatesOrdering, OrderingFilter, DjangoFilterBackend]
     ordering_fields = ['name']
     filterset_class = MenuFilterSet
 
     def get_queryset(self) -> 'QuerySet[Menu]':
         if self.action == 'list':
-            return Menu.objects.filter(dishes__isnull=False).distinct().order_by('pk')
+            if self.include_aggregates():
+                # The aggregates join every dish anyway, so menus without dishes are dropped by their count.
+                return MenuAggregates.annotate(
+                    Menu.objects.all(), *MenuAggregatesSerializer.Meta.aggregate_fields
+                ).filter(dishes_count__gt=0).order_by('pk')
+            return Menu.objects.published().order_by('pk')
         return Menu.objects.prefetch_related(
-            Prefetch('dishes', queryset=Dish.objects.order_by('pk'))
+            Prefetch('dishes', queryset=Dish.objects.defer('search_vector').order_by('pk'))
         )
 
     def get_serializer_class(self) -> Type[Union[MenuSerializer, MenuDishesSerializer]]:
         if self.action == 'list':
-            return MenuSerializer
+            return MenuAggregatesSerializer if self.include_aggregates() else MenuSerializer
         return MenuDishesSerializer
 
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        menus = self.get_read_model_menus()
+        if menus is None:
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_serializer()
+        return Response([menu.represent(serializer) for menu in menus])
+
+    def get_read_model_menus(self) -> Optional[List[MenuRecord]]:
+        """Filter and order the list in the in-process read model, None when the database must serve it."""
+        catalogue = menu_read_model.get()
+        if catalogue is None:
+            return None
+        filterset = self.filterset_class(self.request.query_params, queryset=Menu.objects.none(), request=self.request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        predicates = MenuReadModel.get_predicates(filterset)
+        if predicates is None:
+            return None
+        # Like the filter backends: an ordering by name replaces one by aggregates.
+        ordering = OrderingFilter().get_ordering(self.request, Menu.objects.none(), self) or \
+            MenuAggregatesOrdering().get_ordering_values(self.request.query_params.get('ordering', '').split(','))
+        return catalogue.get_menus(list(ordering), predicates)
+
+    def include_aggregates(self) -> bool:
+        if getattr(self, 'swagger_fake_view', False) and self.request is None:
+            return False
+        return self.request.query_params.get('aggregates', '').lower() in ('true', '1')
+
+    @swagger_auto_schema(manual_parameters=[openapi.Parameter(
+        name='ids',
+        in_=openapi.IN_QUERY,
+        description='Comma separated ids of at most MENU_BATCH_MAX_SIZE menus',
+        type=openapi.TYPE_STRING,
+        required=True
+    )], responses={status.HTTP_200_OK: MenuDishesSerializer(many=True)})
+    @action(methods=['GET'], detail=False)
+    def batch(self, request: Request) -> Response:
+        ids = self.get_batch_ids(request)
+        menus = {menu.pk: menu for menu in self.get_queryset().filter(pk__in=ids)}
+        serializer = self.get_serializer([menus[pk] for pk in ids if pk in menus], many=True)
+        return Response(serializer.data)
+
+    @staticmethod
+    def get_batch_ids(request: Request) -> List[int]:
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        except ValueError:
+            raise ValidationError({'ids': ['Enter comma separated menu ids.']})
+        if not ids:
+            raise ValidationError({'ids': ['This field is required.']})
+        if len(ids) > settings.MENU_BATCH_MAX_SIZE:
+            raise ValidationError({'ids': [f'Ensure this field has no more than {settings.MENU_BATCH_MAX_SIZE} ids.']})
+        return list(dict.fromkeys(ids))
+
+
+@method_decorator(name='list', decorator=swagger_auto_schema(
+    manual_parameters=[openapi.Parameter(
+        name='q',
+        in_=openapi.IN_QUERY,
+        description='Words to search for in dish names and descriptions, matched by prefix',
+        type=openapi.TYPE_STRING,
+        required=True
+    )]
+))
+class DishSearchViewSet(ReplicaReadsMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    queryset = Dish.objects.select_related('menu').defer('search_vector')
+    serializer_class = DishListSerializer
+    filter_backends = [DjangoFilterBackend, DishFullTextSearch]
+    filterset_class = DishFilterSet
+    pagination_class = DishSearchPagination
+
+
+class DishReadOnlyViewSet(ReplicaReadsMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    queryset = Dish.objects.select_related('menu').defer('search_vector')
+    serializer_class = DishListSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = DishFilterSet
+    pagination_class = KeysetPagination
+    ordering_fields = ['price', 'prepare_time']
+
+    @swagger_auto_schema(responses={status.HTTP_200_OK: openapi.Response('Dish counts per facet value')})
+    @action(methods=['GET'], detail=False, pagination_class=None)
+    def facets(self, request: Request) -> Response:
+        queryset = self.filter_queryset(Dish.objects.all())
+        return Response(DishFacets.get(queryset, request.query_params.dict()))
+
 
 class MenuManageViewSet(mixins.CreateModelMixin,
                         mixins.UpdateModelMixin,
@@ -52,6 +166,27 @@ class MenuManageViewSet(mixins.CreateModelMixin,
     serializer_class = MenuSerializer
     permission_classes = [DjangoModelPermissions]
 
+    @swagger_auto_schema(responses={
+        status.HTTP_202_ACCEPTED: openapi.Response('Deletion of a large menu queued', schema=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={'job_id': openapi.Schema(type=openapi.TYPE_STRING)}
+        )),
+        status.HTTP_204_NO_CONTENT: openapi.Response('Menu deleted')
+    })
+    def destroy(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        instance = self.get_object()
+        if instance.dishes.count() > settings.MENU_ASYNC_DELETE_THRESHOLD:
+            result = delete_menu.delay(instance.pk)
+            return Response({'job_id': result.id}, status=status.HTTP_202_ACCEPTED)
+        self.perform_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_destroy(self, instance: Menu) -> None:
+        with transaction.atomic():
+            # The menu's own post_delete queues the rebuild of its static files.
+            delete_dishes(instance.dishes.all(), rebuild_menus=False)
+            instance.delete()
+
 
 class DishManageViewSet(mixins.CreateModelMixin,
                         mixins.UpdateModelMixin,
@@ -65,7 +200,7 @@ class DishManageViewSet(mixins.CreateModelMixin,
         if self.action == 'picture':
             kwargs['fields'] = ['picture']
         else:
-            kwargs['fields'] = set(DishSerializer.Meta.fields) - {'picture'}
+            kwargs['fields'] = set(DishSerializer.Meta.fields) - {'picture', 'picture_variants'}
         return super().get_serializer(*args, **kwargs)
 
     @action(
@@ -80,8 +215,40 @@ class DishManageViewSet(mixins.CreateModelMixin,
             super().destroy(request, pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def perform_update(self, serializer: DishSerializer) -> None:
+        if self.action != 'picture':
+            super().perform_update(serializer)
+            return
+
+        picture = serializer.validated_data.get('picture')
+        with transaction.atomic():
+            if picture:
+                Dish.lock_picture(Dish.picture.field.storage.get_name_for(picture))
+            serializer.instance.release_picture(save=False)
+            dish = serializer.save(has_picture_variants=False)
+        transaction.on_commit(
+            lambda: generate_dish_picture_variants.delay(dish.pk, dish.picture.name)
+        )
+
     def perform_destroy(self, instance: Dish) -> None:
         if self.action == 'picture':
-            instance.picture.delete()
+            instance.release_picture()
         else:
             super().perform_destroy(instance)
+
+
+class SubscriptionViewSet(mixins.RetrieveModelMixin,
+                          mixins.UpdateModelMixin,
+                          viewsets.GenericViewSet):
+    """Digest preferences of the authenticated user; an empty ``followed_menus`` follows every menu."""
+    queryset = Subscription.objects.all()
+    serializer_class = SubscriptionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self) -> Subscription:
+        if self.action == 'retrieve':
+            # Reading the defaults stores nothing, only the first update creates the row.
+            subscription = Subscription.objects.filter(user=self.request.user).first()
+            return subscription or Subscription(user=self.request.user)
+        subscription, _ = Subscription.objects.get_or_create(user=self.request.user)
+        return subscription
@@ -0,0 +1,7 @@
+"""Role-specific settings profiles.
+
+Each profile extends ``restaurant_website.settings`` and drops the apps and URL modules its
+process never uses, which shortens cold starts of autoscaled containers. Select one with
+``DJANGO_SETTINGS_MODULE=restaurant_website.profiles.<role>``; the base settings remain the
+all-in-one profile used for development and tests.
+"""
@@ -0,0 +1,5 @@
+from restaurant_website.settings import *  # noqa: F401,F403
+from restaurant_website.settings import INSTALLED_APPS
+
+# The web process sends tasks but never schedules them: periodic tasks live in the beat profile.
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'django_celery_beat']
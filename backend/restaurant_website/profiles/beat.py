@@ -0,0 +1,3 @@
+from restaurant_website.profiles.worker import *  # noqa: F401,F403
+
+# Beat only publishes CELERY_BEAT_SCHEDULE messages, so it shares the worker's trimmed apps.
@@ -0,0 +1,2 @@
+# Processes without a web server never route requests.
+urlpatterns = []
@@ -0,0 +1,19 @@
+from restaurant_website.settings import *  # noqa: F401,F403
+from restaurant_website.settings import INSTALLED_APPS, TEMPLATES
+
+# Tasks only need the models, templates and mail: no admin, sessions, API or schema tooling.
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+        'rest_framework',
+        'drf_yasg',
+        'django_celery_beat',
+    )
+]
+MIDDLEWARE = []
+ROOT_URLCONF = 'restaurant_website.profiles.urls'
+TEMPLATES = [{**TEMPLATES[0], 'OPTIONS': {'context_processors': []}}]
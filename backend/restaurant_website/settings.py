@@ -42,15 +42,18 @@ INSTALLED_APPS = [
     'drf_yasg',
     'django_celery_beat',
 
+    'common',
     'menu'
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'common.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'common.db.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -88,6 +91,19 @@ DATABASES = {
         'PORT': 5432,
     }
 }
+# Read replica at POSTGRES_REPLICA_HOST. Without one the alias points at the primary and is unused, except by
+# tests, which mirror it to the test database to route reads through a second connection.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'HOST': os.getenv('POSTGRES_REPLICA_HOST', DATABASES['default']['HOST']),
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_REPLICAS = ['replica'] if os.getenv('POSTGRES_REPLICA_HOST') else []
+DATABASE_ROUTERS = ['common.db.ReplicaRouter']
+# Clients read from the primary for this long after a write, marked by the DATABASE_REPLICA_PIN_COOKIE.
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_REPLICA_PIN_COOKIE = 'primary_pin'
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -127,15 +143,80 @@ STATIC_URL = '/static/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.BasicAuthentication',
+        'common.authentication.CachedBasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ]
+        'common.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.renderers.FastJSONRenderer',
+        'common.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'common.throttling.TokenBucketThrottle',
+    ],
+    # Reverse proxies in front of the API, whose X-Forwarded-For entries identify clients. With none, as
+    # when clients reach runserver directly, the header is client supplied and ignored.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
+# Token buckets of TokenBucketThrottle by '<basename>.<action>', '<basename>' or 'default': the rate of
+# every client, above which it gets 429, and of all clients together, above which requests are shed with 503.
+THROTTLE_RATES = {
+    'default': {'client': '50/s', 'overall': '1000/s'},
+    'menu.retrieve': {'client': '10/s', 'overall': '300/s'},
+    'menu.batch': {'client': '5/s', 'overall': '100/s'},
+    'dish-search.list': {'client': '10/s', 'overall': '200/s'},
+    'dish.facets': {'client': '10/s', 'overall': '200/s'},
+}
+AUTH_CACHE_TIMEOUT = 5 * 60
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media', 'images')
 MEDIA_URL = '/images/'
+DISH_PICTURE_VARIANT_WIDTHS = (150, 480, 1024)
+DISH_PICTURE_VARIANT_QUALITY = 80
+MENU_BATCH_MAX_SIZE = 50
+MENU_ASYNC_DELETE_THRESHOLD = 500
+MENU_DELETE_BATCH_SIZE = 1000
+DISH_FACETS_CACHE_TIMEOUT = 10 * 60
+DISH_FACET_PRICE_BUCKETS = (10, 20, 30, 50)
+DISH_FACET_PREPARE_TIME_BUCKETS = (15, 30, 60)
+MEDIA_SENDFILE_HEADER = os.getenv('MEDIA_SENDFILE_HEADER')
+MEDIA_ACCEL_REDIRECT_LOCATION = '/protected-images/'
+MEDIA_CACHE_MAX_AGE = 60 * 60
+MEDIA_IMMUTABLE_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+STATIC_MENUS_ROOT = os.path.join(BASE_DIR, 'static_menus')
+# Picture URLs in the built menus are absolute against the API's public address, as in its responses.
+STATIC_MENUS_BASE_URL = os.getenv('STATIC_MENUS_BASE_URL', 'http://localhost:8000')
+
+# Digests with more created or modified dishes inline only this many, and attach a CSV of all changes
+# written to DIGEST_ATTACHMENTS_ROOT, which must be shared by the workers sending the mails.
+DIGEST_INLINE_DISHES = 50
+DIGEST_ATTACHMENTS_ROOT = os.path.join(BASE_DIR, 'digest_attachments')
+
+# The menu list is served from an in-process read model of the catalogue, refreshed by a background thread
+# from the modified timestamps and the tombstones of deleted rows every MENU_READ_MODEL_REFRESH_INTERVAL seconds;
+# the database serves it when the model is older than MENU_READ_MODEL_MAX_STALENESS. Rows modified or deleted
+# MENU_READ_MODEL_MODIFIED_MARGIN seconds before a refresh are read again by the next one, and everything is
+# reloaded every MENU_READ_MODEL_RELOAD_INTERVAL seconds. Tombstones are kept for MENU_TOMBSTONE_RETENTION
+# seconds, which must exceed the reload interval.
+MENU_READ_MODEL_ENABLED = os.getenv('MENU_READ_MODEL_ENABLED', '').lower() in ('1', 'true')
+MENU_READ_MODEL_REFRESH_INTERVAL = 5
+MENU_READ_MODEL_MAX_STALENESS = 30
+MENU_READ_MODEL_MODIFIED_MARGIN = 30
+MENU_READ_MODEL_RELOAD_INTERVAL = 60 * 60
+MENU_TOMBSTONE_RETENTION = 24 * 60 * 60
+
+# Admin changelists show the planner's row estimate instead of an exact COUNT(*) above this many rows.
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+OPENAPI_SCHEMA_ROOT = os.path.join(BASE_DIR, 'openapi')
+OPENAPI_SCHEMA_CACHE_MAX_AGE = 5 * 60
+
 SWAGGER_SETTINGS = {
+    'SPEC_URL': 'schema-json',
     'REFETCH_SCHEMA_ON_LOGIN': True,
     'USE_SESSION_AUTH': False,
     'SECURITY_DEFINITIONS': {
@@ -148,6 +229,13 @@ SWAGGER_SETTINGS = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': 'redis://redis:6379/1',
+    }
+}
+
 EMAIL_HOST = 'localhost'
 EMAIL_PORT = '1025'
 
@@ -157,9 +245,41 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# Each workload has its own queue and worker pool, so a large digest fan-out can't starve picture
+# processing or rebuilds. On Redis a lower priority number is consumed first.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_BROKER_TRANSPORT_OPTIONS = {'priority_steps': [0, 3, 6, 9]}
+CELERY_TASK_ROUTES = {
+    'menu.tasks.notify_about_new_and_modified_dishes.notify_about_new_and_modified_dishes': {
+        'queue': 'default', 'priority': 0
+    },
+    'menu.tasks.notify_about_new_and_modified_dishes.send_emails': {'queue': 'email', 'priority': 6},
+    'menu.tasks.generate_dish_picture_variants.generate_dish_picture_variants': {'queue': 'images', 'priority': 0},
+    'menu.tasks.build_static_menus.build_static_menus': {'queue': 'rebuilds', 'priority': 0},
+    'menu.tasks.delete_menu.delete_menu': {'queue': 'rebuilds', 'priority': 6},
+    'menu.tasks.delete_menu.delete_unreferenced_pictures': {'queue': 'rebuilds', 'priority': 9},
+}
+# Started with `manage.py run_worker <pool>`. Long tasks prefetch one message per process, so
+# queued work stays available to idle processes and to higher priority messages.
+WORKER_POOLS = {
+    'default': {'queues': ['default'], 'concurrency': 2, 'prefetch_multiplier': 4},
+    'email': {'queues': ['email'], 'concurrency': 4, 'prefetch_multiplier': 1},
+    'images': {'queues': ['images'], 'concurrency': 2, 'prefetch_multiplier': 1},
+    'rebuilds': {'queues': ['rebuilds'], 'concurrency': 1, 'prefetch_multiplier': 1},
+}
+
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER')  # None, 'file' or 'otlp'
+TRACING_FILE_PATH = os.path.join(BASE_DIR, 'traces.jsonl')
+TRACING_OTLP_ENDPOINT = os.getenv('TRACING_OTLP_ENDPOINT', 'http://otel-collector:4318/v1/traces')
+TRACING_SERVICE_NAME = 'restaurant-website'
+
 CELERY_BEAT_SCHEDULE = {
     'notify-about-new-and-modified-dishes': {
         'task': 'menu.tasks.notify_about_new_and_modified_dishes.notify_about_new_and_modified_dishes',
         'schedule': crontab(minute=0, hour=10)
+    },
+    'prune-tombstones': {
+        'task': 'menu.tasks.prune_tombstones.prune_tombstones',
+        'schedule': crontab(minute=30)
     }
 }
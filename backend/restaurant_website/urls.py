@@ -13,26 +13,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
-from django.conf.urls import url
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
+from django.urls import path, include, re_path
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Menus API",
-        default_version='v1',
-    ),
-    public=True
-)
+from common.views import MediaView, OpenAPISchemaView, SwaggerUIView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/schema.json', OpenAPISchemaView.as_view(), name='schema-json'),
     path('api/', include('menu.urls')),
-    url(r'^api/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui')
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('api/', SwaggerUIView.as_view(), name='schema-swagger-ui'),
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), MediaView.as_view(), name='media')
+]
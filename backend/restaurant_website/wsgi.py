@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_website.settings')
 
 application = get_wsgi_application()
+
+# Load the menu read model, when enabled, before the worker serves requests, and refresh it in the background.
+from menu.read_model import menu_read_model  # noqa: E402
+
+menu_read_model.start()